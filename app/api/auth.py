@@ -1,23 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from repositories.user_repository import UserRepository
-from schemas.user import TokenSchema, UserRegisterSchema, UserSchema, UserCredsSchema
+from schemas.user import (
+    PrincipalSchema,
+    TokenSchema,
+    UserRegisterSchema,
+    UserResponse,
+    UserSchema,
+    UserCredsSchema,
+)
+from schemas.common import MessageResponse
 from utils.auth import (
     create_access_token,
     get_current_user,
+    get_current_principal,
     auth_user,
+    get_token_from_cookie,
     set_access_token_cookie,
     delete_access_token_cookie,
 )
 from database.engine import get_session
 from database.models import User
+from utils.hashing import HasherBusyError
 from config import settings
 
 auth_router = APIRouter()
 
 
-@auth_router.post("/register", status_code=status.HTTP_201_CREATED)
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
+@auth_router.post(
+    "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
+)
 async def register(
     user_data: UserRegisterSchema, session: AsyncSession = Depends(get_session)
 ):
@@ -28,7 +50,17 @@ async def register(
             detail="User with this email already exist",
         )
 
-    new_user = await UserRepository.create_user(session, user_data)
+    try:
+        new_user = await UserRepository.create_user(session, user_data)
+    except HasherBusyError:
+        raise _hasher_busy()
+    except IntegrityError:
+        # Параллельная регистрация с тем же email упёрлась в уникальный индекс
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exist",
+        )
     return new_user
 
 
@@ -42,7 +74,10 @@ async def login(
     print(f"🔐 Логин запрос от: {request.client.host}")
     print(f"📧 Email: {form_data.email}")
 
-    user = await auth_user(form_data.email, form_data.password, session)
+    try:
+        user = await auth_user(form_data.email, form_data.password, session)
+    except HasherBusyError:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,12 +99,17 @@ async def login(
     return TokenSchema(access_token=access_token, token_type="bearer")
 
 
-@auth_router.post("/logout", status_code=status.HTTP_201_CREATED)
-async def logout(response: Response):
-    await delete_access_token_cookie(response)
+@auth_router.post(
+    "/logout", response_model=MessageResponse, status_code=status.HTTP_201_CREATED
+)
+async def logout(request: Request, response: Response):
+    token = await get_token_from_cookie(request)
+    await delete_access_token_cookie(response, token)
     return {"message": "Successfully logged out"}
 
 
-@auth_router.get("/me", status_code=status.HTTP_201_CREATED)
-async def get_me(current_user: User = Depends(get_current_user)):
+@auth_router.get(
+    "/me", response_model=UserResponse, status_code=status.HTTP_201_CREATED
+)
+async def get_me(current_user: PrincipalSchema = Depends(get_current_principal)):
     return current_user
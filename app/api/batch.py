@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, List, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from config import settings
+from schemas.batch import BatchRequest, BatchResponse, BatchSubRequest
+from schemas.user import PrincipalSchema
+from utils.auth import get_current_principal
+
+batch_router = APIRouter()
+
+# Заголовки родительского запроса, которые получают подзапросы
+FORWARDED_HEADERS = {b"cookie", b"authorization", b"accept-language"}
+
+
+def _sub_scope(
+    request: Request, sub: BatchSubRequest, principal: PrincipalSchema
+) -> dict:
+    path, _, query = sub.path.partition("?")
+    parent = request.scope
+    return {
+        "type": "http",
+        # asgi и http_version есть не в каждом scope (например, у тестовых клиентов)
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": sub.method,
+        "scheme": parent["scheme"],
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": parent.get("root_path", ""),
+        "headers": [
+            (name, value)
+            for name, value in parent["headers"]
+            if name in FORWARDED_HEADERS
+        ],
+        "client": parent.get("client"),
+        "server": parent.get("server"),
+        # request.state подзапроса: состояние lifespan + уже известный пользователь
+        "state": {**parent.get("state", {}), "principal": principal},
+    }
+
+
+def _decode_body(headers: List[Tuple[bytes, bytes]], body: bytes) -> Any:
+    if not body:
+        return None
+    content_type = dict(headers).get(b"content-type", b"")
+    if content_type.startswith(b"application/json"):
+        return orjson.loads(body)
+    return body.decode(errors="replace")
+
+
+async def _run_sub_request(
+    request: Request,
+    sub: BatchSubRequest,
+    principal: PrincipalSchema,
+    semaphore: asyncio.Semaphore,
+) -> dict:
+    """Прогнать подзапрос через всё приложение (роутинг, зависимости, middleware)"""
+    status_code = 500
+    headers: List[Tuple[bytes, bytes]] = []
+    body = bytearray()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status_code, headers
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await request.app(_sub_scope(request, sub, principal), receive, send)
+        except Exception:
+            # ServerErrorMiddleware уже отправил 500 и пробрасывает исключение
+            # дальше — падение одного подзапроса не должно ронять весь batch
+            status_code = 500
+        duration_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "status": status_code,
+        "body": _decode_body(headers, bytes(body)),
+        "duration_ms": round(duration_ms, 3),
+    }
+
+
+@batch_router.post("", response_model=BatchResponse)
+async def run_batch(
+    request: Request,
+    batch: BatchRequest,
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """
+    Выполнить несколько GET-запросов к API за один round trip.
+
+    Аутентификация выполняется один раз; подзапросы идут конкурентно
+    (не больше BATCH_CONCURRENCY одновременно), ответы — в порядке запросов.
+    Общей сессии БД у подзапросов нет: AsyncSession нельзя использовать
+    конкурентно, поэтому каждый берёт своё соединение из пула.
+    """
+    for sub in batch.requests:
+        if sub.path.split("?", 1)[0].rstrip("/").startswith("/batch"):
+            raise HTTPException(status_code=400, detail="Nested batch is not allowed")
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    responses = await asyncio.gather(
+        *(
+            _run_sub_request(request, sub, current_user, semaphore)
+            for sub in batch.requests
+        )
+    )
+    return {"responses": responses}
@@ -1,83 +1,258 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-
-from database.engine import get_session
-from database.models import User, Course, UserCourseAssociation, Theme, ThemeProgress
-from utils.auth import get_current_user
+from datetime import datetime
+from typing import List, Optional
+
+from database.engine import (
+    get_session,
+    get_read_session,
+    open_read_session,
+    read_target,
+)
+from database.models import (
+    User,
+    Course,
+    UserCourseAssociation,
+    Theme,
+    ThemeProgress,
+    File as ThemeFile,
+)
+from utils.auth import get_current_user, get_current_principal
+from schemas.user import PrincipalSchema, UserResponse
+from schemas.common import DetailResponse, Page
+from repositories.progress_repository import ProgressRepository
+from repositories.course_repository import CourseRepository
+from repositories.blob_repository import BlobRepository
+from utils.pagination import PageParams, keyset, build_page
+from utils.streaming import get_stream_format, stream_response
+from utils.conditional import latest, not_modified, table_version
+from utils.blob_store import purge_blobs
+from utils.response_cache import (
+    COURSES_TAG,
+    cache_key,
+    course_tag,
+    response_cache,
+    themes_tag,
+)
+from config import settings
 from schemas.course import (
     CourseCreate,
+    CourseListItem,
+    CourseProgressResponse,
+    CourseResponse,
     CourseShortResponse,
     CourseUpdate,
     CourseDetailResponse,
+    GradebookResponse,
 )
 
 courses_router = APIRouter()
 
 
-@courses_router.get("/all")
+def _course_catalog():
+    """Курсы с полями преподавателя — только нужные колонки, без ORM-объектов"""
+    return select(
+        Course.id,
+        Course.name,
+        Course.description,
+        Course.owner_id,
+        Course.created,
+        Course.updated,
+        User.full_name.label("owner_name"),
+        User.email.label("owner_email"),
+        User.is_teacher.label("owner_is_teacher"),
+    ).join(User, User.id == Course.owner_id)
+
+
+def _course_item(row, enrolled_course_ids=None) -> dict:
+    course = {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "owner_id": row.owner_id,
+        "created": row.created,
+        "updated": row.updated,
+        "owner": {
+            "id": row.owner_id,
+            "full_name": row.owner_name,
+            "email": row.owner_email,
+            "is_teacher": row.owner_is_teacher,
+        },
+    }
+    if enrolled_course_ids is not None:
+        course["is_enrolled"] = row.id in enrolled_course_ids
+    return course
+
+
+async def _enrolled_course_ids(session: AsyncSession, user_id: int) -> set:
+    enrolled_result = await session.execute(
+        select(UserCourseAssociation.course_id).filter(
+            UserCourseAssociation.user_id == user_id
+        )
+    )
+    return {course_id for course_id, in enrolled_result.all()}
+
+
+async def _catalog_version(session: AsyncSession, *criteria) -> tuple:
+    """Версия выборки курсов вместе с их преподавателями: (count, last_updated)"""
+    result = await session.execute(
+        select(
+            func.count(Course.id),
+            func.max(func.greatest(Course.updated, User.updated)),
+        )
+        .join(User, User.id == Course.owner_id)
+        .where(*criteria)
+    )
+    count, last_updated = result.one()
+    return count, last_updated
+
+
+async def _user_version(
+    session: AsyncSession,
+    current_user: PrincipalSchema,
+    count: int,
+    last_updated: Optional[datetime],
+) -> tuple:
+    """
+    Версия списка курсов для пользователя: курсы и записи студента.
+    Возвращает (version, last_modified).
+    """
+    version = (current_user.id, count, last_updated)
+    if not current_user.is_teacher:
+        enrolled_count, enrolled_updated = await table_version(
+            session,
+            UserCourseAssociation,
+            UserCourseAssociation.user_id == current_user.id,
+        )
+        version += (enrolled_count, enrolled_updated)
+        last_updated = latest(last_updated, enrolled_updated)
+    return version, last_updated
+
+
+async def _courses_version(
+    session: AsyncSession, current_user: PrincipalSchema, *criteria
+) -> tuple:
+    count, last_updated = await _catalog_version(session, *criteria)
+    return await _user_version(session, current_user, count, last_updated)
+
+
+async def _load_catalog_entry(session: AsyncSession, page: PageParams) -> dict:
+    query = keyset(_course_catalog(), Course.id, page.cursor, page.limit)
+    result = await session.execute(query)
+    courses_page = build_page(
+        result.all(), page.limit, key=lambda row: (row.id, row.id)
+    )
+    courses_page["items"] = [_course_item(row) for row in courses_page["items"]]
+    # Версия после страницы: при гонке с записью ETag окажется новее тела
+    return {"version": await _catalog_version(session), "page": courses_page}
+
+
+async def _stream_courses(request: Request, current_user: PrincipalSchema):
+    """Весь каталог курсов по строкам с серверного курсора"""
+    # Своя сессия: генератор живёт дольше обработчика запроса
+    async with await open_read_session(request) as session:
+        enrolled_course_ids = None
+        if not current_user.is_teacher:
+            enrolled_course_ids = await _enrolled_course_ids(session, current_user.id)
+
+        result = await session.stream(
+            _course_catalog()
+            .order_by(Course.id)
+            .execution_options(yield_per=settings.STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield _course_item(row, enrolled_course_ids)
+
+
+@courses_router.get("/all", response_model=Page[CourseListItem])
 async def get_all_courses(
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    stream_format: Optional[str] = Depends(get_stream_format),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить все курсы с информацией о записи пользователя"""
-    # Базовый запрос для всех курсов
-    query = (
-        select(Course)
-        .options(selectinload(Course.owner))
+    if stream_format:
+        return stream_response(_stream_courses(request, current_user), stream_format)
+
+    # Страница каталога общая для всех пользователей и кешируется целиком
+    # вместе со своей версией — ETag описывает именно отданное тело
+    entry = await response_cache.get_or_load(
+        cache_key(request),
+        [COURSES_TAG],
+        settings.CACHE_TTL_COURSES,
+        lambda: _load_catalog_entry(db, page),
+        read_target(db),
     )
-    
-    result = await db.execute(query)
-    courses = result.scalars().all()
-    
-    # Если пользователь не авторизован или это преподаватель, возвращаем просто курсы
-    if not current_user or current_user.is_teacher:
-        return courses
-    
-    # Для студента проверяем, на какие курсы он записан
-    enrolled_result = await db.execute(
-        select(UserCourseAssociation.course_id)
-        .filter(UserCourseAssociation.user_id == current_user.id)
+
+    count, last_updated = entry["version"]
+    version, last_modified = await _user_version(
+        db,
+        current_user,
+        count,
+        datetime.fromisoformat(last_updated) if last_updated else None,
     )
-    enrolled_course_ids = {course_id for course_id, in enrolled_result.all()}
-    
-    # Добавляем флаг is_enrolled к каждому курсу
-    for course in courses:
-        course.is_enrolled = course.id in enrolled_course_ids
-    
-    return courses
+    cached = not_modified(request, response, version, last_modified)
+    if cached:
+        return cached
 
+    courses_page = entry["page"]
+    # Флаг записи персональный — накладываем поверх общего ответа
+    if current_user and not current_user.is_teacher:
+        enrolled_course_ids = await _enrolled_course_ids(db, current_user.id)
+        for course in courses_page["items"]:
+            course["is_enrolled"] = course["id"] in enrolled_course_ids
 
-@courses_router.get("/my")
+    return courses_page
+
+
+@courses_router.get("/my", response_model=List[CourseListItem])
 async def my_courses(
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     if current_user.is_teacher:
-        # Для преподавателя - только его курсы
-        result = await db.execute(
-            select(Course)
-            .options(selectinload(Course.owner))
-            .filter(Course.owner_id == current_user.id)
+        criteria = (Course.owner_id == current_user.id,)
+    else:
+        criteria = (
+            Course.id.in_(
+                select(UserCourseAssociation.course_id).filter(
+                    UserCourseAssociation.user_id == current_user.id
+                )
+            ),
         )
-        return result.scalars().all()
+    version, last_modified = await _courses_version(db, current_user, *criteria)
+    cached = not_modified(request, response, version, last_modified)
+    if cached:
+        return cached
+
+    if current_user.is_teacher:
+        # Для преподавателя - только его курсы
+        query = _course_catalog().filter(Course.owner_id == current_user.id)
     else:
         # Для студента - только курсы, на которые он записан
-        result = await db.execute(
-            select(Course)
-            .options(selectinload(Course.owner))
+        query = (
+            _course_catalog()
             .join(UserCourseAssociation, Course.id == UserCourseAssociation.course_id)
             .filter(UserCourseAssociation.user_id == current_user.id)
         )
-        return result.scalars().all()
+    result = await db.execute(query)
+    return [_course_item(row) for row in result.all()]
 
 
-@courses_router.get("/{course_id}/students")
+@courses_router.get("/{course_id}/students", response_model=Page[UserResponse])
 async def get_course_students(
     course_id: int,
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить студентов конкретного курса"""
     # Проверяем что пользователь владелец курса
@@ -91,32 +266,73 @@ async def get_course_students(
         raise HTTPException(status_code=403, detail="Access denied")
 
     # Получаем студентов курса
-    result = await db.execute(
-        select(User)
+    query = keyset(
+        select(User.id, User.email, User.full_name, User.is_teacher)
         .join(UserCourseAssociation, User.id == UserCourseAssociation.user_id)
         .filter(UserCourseAssociation.course_id == course_id)
-        .filter(User.is_teacher == False)  # только студентов
+        .filter(User.is_teacher == False),  # только студентов
+        User.id,
+        page.cursor,
+        page.limit,
+        sort_column=User.full_name,
+    )
+    result = await db.execute(query)
+
+    return build_page(
+        result.all(),
+        page.limit,
+        key=lambda student: (student.full_name, student.id),
     )
-    students = result.scalars().all()
 
-    return students
 
+async def _load_course(session: AsyncSession, course_id: int) -> dict:
+    result = await session.execute(
+        select(
+            Course.id,
+            Course.name,
+            Course.description,
+            Course.owner_id,
+            Course.created,
+            Course.updated,
+        ).filter(Course.id == course_id)
+    )
+    course = result.one_or_none()
+
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    return course._asdict()
 
-@courses_router.get("/{course_id}")
+
+@courses_router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
+    request: Request,
+    response: Response,
     course_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    result = await db.execute(select(Course).filter(Course.id == course_id))
-    course = result.scalar_one_or_none()
+    course = await response_cache.get_or_load(
+        cache_key(request),
+        [course_tag(course_id)],
+        settings.CACHE_TTL_COURSE,
+        lambda: _load_course(db, course_id),
+        read_target(db),
+    )
 
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    # Из кеша updated приходит строкой ISO 8601
+    cached = not_modified(
+        request,
+        response,
+        (course["id"], course["updated"]),
+        datetime.fromisoformat(course["updated"]),
+    )
+    if cached:
+        return cached
 
     return course
 
 
-@courses_router.post("/{course_id}/enroll")
+@courses_router.post("/{course_id}/enroll", response_model=DetailResponse)
 async def enroll_course(
     course_id: int,
     db: AsyncSession = Depends(get_session),
@@ -145,11 +361,11 @@ async def enroll_course(
     return {"detail": "Enrolled successfully"}
 
 
-@courses_router.post("")
+@courses_router.post("", response_model=CourseResponse)
 async def create_course(
     course_data: CourseCreate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     if current_user.is_teacher == True:
         new_course = Course(
@@ -161,6 +377,7 @@ async def create_course(
         db.add(new_course)
         await db.commit()
         await db.refresh(new_course)
+        await response_cache.invalidate(COURSES_TAG)
 
         return new_course
     raise HTTPException(
@@ -168,12 +385,12 @@ async def create_course(
     )
 
 
-@courses_router.patch("/{course_id}")
+@courses_router.patch("/{course_id}", response_model=CourseResponse)
 async def update_course(
     course_id: int,
     course_data: CourseUpdate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     result = await db.execute(select(Course).filter(Course.id == course_id))
     course = result.scalar_one_or_none()
@@ -193,15 +410,16 @@ async def update_course(
 
     await db.commit()
     await db.refresh(course)
+    await response_cache.invalidate(COURSES_TAG, course_tag(course_id))
 
     return course
 
 
-@courses_router.delete("/{course_id}")
+@courses_router.delete("/{course_id}", response_model=DetailResponse)
 async def delete_course(
     course_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     result = await db.execute(select(Course).filter(Course.id == course_id))
     course = result.scalar_one_or_none()
@@ -214,17 +432,26 @@ async def delete_course(
             status_code=403, detail="You are not the owner of this course"
         )
 
+    unused_blobs = await BlobRepository.release(
+        db,
+        ThemeFile.theme_id.in_(select(Theme.id).where(Theme.course_id == course_id)),
+    )
     await db.delete(course)
     await db.commit()
+    await response_cache.invalidate(
+        COURSES_TAG, course_tag(course_id), themes_tag(course_id)
+    )
+    await purge_blobs(db, unused_blobs)
 
     return {"detail": "Course deleted successfully"}
 
 
-@courses_router.get("/{course_id}/students")
+@courses_router.get("/{course_id}/students", response_model=Page[UserResponse])
 async def get_course_students(
     course_id: int,
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить студентов конкретного курса"""
     # Проверяем что пользователь владелец курса
@@ -238,22 +465,31 @@ async def get_course_students(
         raise HTTPException(status_code=403, detail="Access denied")
 
     # Получаем студентов курса
-    result = await db.execute(
-        select(User)
+    query = keyset(
+        select(User.id, User.email, User.full_name, User.is_teacher)
         .join(UserCourseAssociation, User.id == UserCourseAssociation.user_id)
         .filter(UserCourseAssociation.course_id == course_id)
-        .filter(User.is_teacher == False)  # только студентов
+        .filter(User.is_teacher == False),  # только студентов
+        User.id,
+        page.cursor,
+        page.limit,
+        sort_column=User.full_name,
     )
-    students = result.scalars().all()
+    result = await db.execute(query)
 
-    return students
+    return build_page(
+        result.all(),
+        page.limit,
+        key=lambda student: (student.full_name, student.id),
+    )
 
 
-@courses_router.get("/{course_id}/students")
+@courses_router.get("/{course_id}/students", response_model=Page[UserResponse])
 async def get_course_students(
     course_id: int,
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить студентов конкретного курса"""
     # Проверяем что пользователь владелец курса
@@ -267,58 +503,163 @@ async def get_course_students(
         raise HTTPException(status_code=403, detail="Access denied")
 
     # Получаем студентов курса
-    result = await db.execute(
-        select(User)
+    query = keyset(
+        select(User.id, User.email, User.full_name, User.is_teacher)
         .join(UserCourseAssociation, User.id == UserCourseAssociation.user_id)
         .filter(UserCourseAssociation.course_id == course_id)
-        .filter(User.is_teacher == False)  # только студентов
+        .filter(User.is_teacher == False),  # только студентов
+        User.id,
+        page.cursor,
+        page.limit,
+        sort_column=User.full_name,
     )
-    students = result.scalars().all()
+    result = await db.execute(query)
 
-    return students
+    return build_page(
+        result.all(),
+        page.limit,
+        key=lambda student: (student.full_name, student.id),
+    )
 
 
-@courses_router.get("/{course_id}/progress")
-async def get_course_progress(
+def _gradebook_student(row, themes) -> dict:
+    completed = set(row.completed_theme_ids or [])
+    total_count = len(themes)
+    return {
+        "student_id": row.id,
+        "full_name": row.full_name,
+        "email": row.email,
+        "completed": [theme.id in completed for theme in themes],
+        "completed_count": len(completed),
+        "progress_percentage": (
+            len(completed) / total_count * 100 if total_count > 0 else 0
+        ),
+        "homeworks": row.homeworks or [],
+    }
+
+
+async def _stream_gradebook(request: Request, course_id: int, themes):
+    async with await open_read_session(request) as session:
+        result = await CourseRepository.stream_gradebook_rows(session, course_id)
+        async for row in result:
+            yield _gradebook_student(row, themes)
+
+
+@courses_router.get("/{course_id}/gradebook", response_model=GradebookResponse)
+async def get_course_gradebook(
+    request: Request,
     course_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    stream_format: Optional[str] = Depends(get_stream_format),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
-    """Получить прогресс по курсу"""
-    # Получаем все темы курса
-    result = await session.execute(
-        select(Theme).filter(Theme.course_id == course_id)
+    """Прогресс и оценки всех студентов курса (для преподавателя)"""
+    course_result = await db.execute(select(Course).filter(Course.id == course_id))
+    course = course_result.scalar_one_or_none()
+
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if course.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    themes_result = await db.execute(
+        select(Theme.id, Theme.name, Theme.is_homework)
+        .filter(Theme.course_id == course_id)
+        .order_by(Theme.id)
     )
-    themes = result.scalars().all()
-    
-    # Получаем прогресс пользователя по этим темам
-    result = await session.execute(
-        select(ThemeProgress).filter(
-            ThemeProgress.user_id == current_user.id,
-            ThemeProgress.theme_id.in_([theme.id for theme in themes])
+    themes = themes_result.all()
+
+    if stream_format:
+        # Экспорт: строки студентов без пагинации, по мере чтения курсора
+        return stream_response(
+            _stream_gradebook(request, course_id, themes), stream_format
         )
+
+    rows = await CourseRepository.get_gradebook_rows(
+        db, course_id, page.cursor, page.limit
     )
-    user_progress = result.scalars().all()
-    
-    # Создаем словарь для быстрого доступа
-    progress_dict = {progress.theme_id: progress for progress in user_progress}
-    
-    # Формируем ответ
-    completed_count = sum(1 for progress in user_progress if progress.is_completed)
-    total_count = len(themes)
-    progress_percentage = (completed_count / total_count * 100) if total_count > 0 else 0
-    
+    students_page = build_page(rows, page.limit, key=lambda row: (row.id, row.id))
+    students = [_gradebook_student(row, themes) for row in students_page["items"]]
+
     return {
+        "course_id": course_id,
+        "themes": [
+            {"id": theme.id, "name": theme.name, "is_homework": theme.is_homework}
+            for theme in themes
+        ],
+        "items": students,
+        "next_cursor": students_page["next_cursor"],
+    }
+
+
+@courses_router.get(
+    "/{course_id}/progress",
+    response_model=CourseProgressResponse,
+    response_model_exclude_none=True,
+)
+async def get_course_progress(
+    request: Request,
+    response: Response,
+    course_id: int,
+    details: bool = Query(False),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Получить прогресс по курсу (details=true — с разбивкой по темам)"""
+    completed_count, total_count = await ProgressRepository.get_course_progress(
+        session, current_user.id, course_id
+    )
+    progress_percentage = (completed_count / total_count * 100) if total_count > 0 else 0
+
+    version = (current_user.id, completed_count, total_count)
+    last_modified = None
+    if details:
+        # Названия тем и отметки о прохождении меняются без изменения счётчиков
+        themes_version = await table_version(
+            session, Theme, Theme.course_id == course_id
+        )
+        progress_version = await table_version(
+            session,
+            ThemeProgress,
+            ThemeProgress.user_id == current_user.id,
+            ThemeProgress.theme_id.in_(
+                select(Theme.id).filter(Theme.course_id == course_id)
+            ),
+        )
+        version += themes_version + progress_version
+        last_modified = latest(themes_version[1], progress_version[1])
+
+    cached = not_modified(request, response, version, last_modified)
+    if cached:
+        return cached
+
+    progress = {
         "completed_count": completed_count,
         "total_count": total_count,
         "progress_percentage": progress_percentage,
-        "themes_progress": [
-            {
-                "theme_id": theme.id,
-                "theme_name": theme.name,
-                "is_completed": progress_dict.get(theme.id) and progress_dict[theme.id].is_completed,
-                "is_homework": theme.is_homework
-            }
-            for theme in themes
-        ]
-    }
\ No newline at end of file
+    }
+    if not details:
+        return progress
+
+    # Темы курса вместе с отметкой о прохождении одним запросом
+    result = await session.execute(
+        select(Theme.id, Theme.name, Theme.is_homework, ThemeProgress.is_completed)
+        .outerjoin(
+            ThemeProgress,
+            (ThemeProgress.theme_id == Theme.id)
+            & (ThemeProgress.user_id == current_user.id),
+        )
+        .filter(Theme.course_id == course_id)
+    )
+    progress["themes_progress"] = [
+        {
+            "theme_id": theme_id,
+            "theme_name": theme_name,
+            "is_completed": bool(is_completed),
+            "is_homework": is_homework,
+        }
+        for theme_id, theme_name, is_homework, is_completed in result.all()
+    ]
+    return progress
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.engine import get_read_session
+from repositories.dashboard_repository import DashboardRepository
+from schemas.dashboard import StudentDashboard, TeacherDashboard
+from schemas.user import PrincipalSchema
+from utils.auth import get_current_principal
+
+dashboard_router = APIRouter()
+
+
+@dashboard_router.get("/student", response_model=StudentDashboard)
+async def get_student_dashboard(
+    session: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Всё для главной страницы студента одним ответом"""
+    if current_user.is_teacher:
+        raise HTTPException(status_code=403, detail="Only for students")
+
+    return await DashboardRepository.get_student_dashboard(session, current_user.id)
+
+
+@dashboard_router.get("/teacher", response_model=TeacherDashboard)
+async def get_teacher_dashboard(
+    session: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Всё для главной страницы преподавателя одним ответом"""
+    if not current_user.is_teacher:
+        raise HTTPException(status_code=403, detail="Only for teachers")
+
+    return await DashboardRepository.get_teacher_dashboard(session, current_user.id)
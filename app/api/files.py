@@ -3,21 +3,47 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
+    status,
     File as FastAPIFile,
 )
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pathlib import Path
 import os
 import uuid
 
-from database.engine import get_session
+from database.engine import get_session, get_read_session
 from database.models import Homework, Theme, Course, User, File as ThemeFile
-from utils.auth import get_current_user
+from utils.auth import get_current_principal
+from repositories.homework_repository import HomeworkRepository
+from schemas.user import PrincipalSchema
+from schemas.file import (
+    FileItemResponse,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
+    UploadedFileResponse,
+)
+from schemas.common import MessageResponse
+from utils.conditional import not_modified, table_version
+from utils.disk_io import DiskIO
+from utils.multipart_upload import StoredFile, check_content_length, receive_files
+from utils.blob_store import STAGING_DIR, purge_blobs, store_blobs
+from utils.upload_sessions import (
+    claim_completed,
+    create_upload_session,
+    get_status,
+    load_session,
+    remove_session,
+    write_chunk,
+)
+from repositories.blob_repository import BlobRepository
+from config import settings
 
 
 files_router = APIRouter()
@@ -28,18 +54,80 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
 
 
-@files_router.post("/theme/{theme_id}/uploadfiles")
+@files_router.post(
+    "/theme/{theme_id}/uploadfiles",
+    response_model=List[UploadedFileResponse],
+    # Тело разбирается вручную (receive_files), схему описываем для OpenAPI
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "files": {
+                                "type": "array",
+                                "items": {"type": "string", "format": "binary"},
+                            }
+                        },
+                        "required": ["files"],
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_files(
+    request: Request,
     theme_id: int,
-    files: List[UploadFile] = FastAPIFile(...),
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """
     Загрузить файлы для темы
     - Преподаватель: может загружать файлы для любых тем своих курсов (is_homework=False)
     - Студент: может загружать файлы только для домашних заданий (theme.is_homework=True)
     """
+    check_content_length(request, MAX_FILE_SIZE * settings.UPLOAD_MAX_FILES)
+
+    theme, theme_dir, is_homework = await _upload_target(db, theme_id, current_user)
+    # Тело может идти минутами: не держим соединение с БД открытой транзакцией.
+    # expire_on_commit=False — theme и current_user остаются загруженными,
+    # _save_file_records начнёт новую транзакцию
+    await db.commit()
+
+    # Файлы пишутся в STAGING_DIR по мере чтения тела запроса
+    stored_files = await receive_files(
+        request,
+        STAGING_DIR,
+        max_file_size=MAX_FILE_SIZE,
+        max_files=settings.UPLOAD_MAX_FILES,
+    )
+    if not stored_files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    try:
+        saved_files = await _save_file_records(
+            db, theme, theme_dir, stored_files, is_homework, current_user
+        )
+    except BaseException:
+        # Без записей в БД принятые файлы никому не нужны (перенесённые
+        # в хранилище store_blobs уже не лежат в STAGING_DIR)
+        for stored in stored_files:
+            await DiskIO.unlink(stored.path)
+        raise
+
+    return saved_files
+
+
+async def _upload_target(
+    db: AsyncSession, theme_id: int, current_user: PrincipalSchema
+) -> Tuple[Theme, Path, bool]:
+    """
+    Тема, каталог из URL скачивания и is_homework для загрузки файла
+    текущим пользователем; 404/403, если загружать нельзя.
+    """
     # Получаем тему вместе с курсом
     result = await db.execute(
         select(Theme)
@@ -69,45 +157,38 @@ async def upload_files(
         is_homework = True
         fPath = "homeworks"
 
-    saved_files = []
-
-    # Создаем директорию для файлов
+    # Каталог из URL скачивания; сами файлы лежат в хранилище blobs
     if current_user.is_teacher:
         theme_dir = UPLOAD_DIR / fPath / str(theme_id)
     else:
         theme_dir = UPLOAD_DIR / fPath / str(current_user.id) / str(theme_id)
 
-    theme_dir.mkdir(parents=True, exist_ok=True)
-
-    for upload in files:
-        file_id = uuid.uuid4().hex
-        safe_name = f"{file_id}_{upload.filename}"
-        dest_path = theme_dir / safe_name
-
-        total_size = 0
-        try:
-            with dest_path.open("wb") as out:
-                while True:
-                    chunk = await upload.read(1024 * 1024)  # 1 MB
-                    if not chunk:
-                        break
-                    total_size += len(chunk)
-                    if total_size > MAX_FILE_SIZE:
-                        out.close()
-                        dest_path.unlink(missing_ok=True)
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"File {upload.filename} exceeds 100 MB limit",
-                        )
-                    out.write(chunk)
-        finally:
-            await upload.close()
-
-        rel_path = dest_path.as_posix()
+    return theme, theme_dir, is_homework
+
+
+async def _save_file_records(
+    db: AsyncSession,
+    theme: Theme,
+    theme_dir: Path,
+    stored_files: List[StoredFile],
+    is_homework: bool,
+    current_user: PrincipalSchema,
+) -> list:
+    """Записи о загруженных файлах (и ДЗ студента, если его ещё нет)"""
+    theme_id = theme.id
+    saved_files = []
+
+    await store_blobs(db, stored_files)
+
+    for stored in stored_files:
+        # Уникальный адрес файла, даже если содержимое и имя совпадают
+        rel_path = (theme_dir / f"{uuid.uuid4().hex}_{stored.filename}").as_posix()
         db_file = ThemeFile(
             theme_id=theme_id,
             is_homework=is_homework,
             file_path=rel_path,
+            blob_sha256=stored.sha256,
+            original_filename=stored.filename,
         )
 
         # Для студентских файлов домашнего задания связываем с домашним заданием
@@ -123,12 +204,14 @@ async def upload_files(
 
 
             if not homework:
-                homework = Homework(
-                    theme_id=theme_id,
-                    student_id=current_user.id,
-                    title=theme.name or "Homework",
-                    text="",  # Текст будет добавлен позже
-                    status="draft",
+                homework = HomeworkRepository.build_homework(
+                    {
+                        "theme_id": theme_id,
+                        "student_id": current_user.id,
+                        "title": theme.name or "Homework",
+                        "text": "",  # Текст будет добавлен позже
+                        "status": "draft",
+                    }
                 )
                 db.add(homework)
                 await db.flush()
@@ -140,9 +223,11 @@ async def upload_files(
         saved_files.append(
             {
                 "id": db_file.id,
-                "filename": upload.filename,
+                "filename": stored.filename,
                 "url": "/" + rel_path.lstrip("/"),
                 "is_homework": is_homework,
+                "size": stored.size,
+                "sha256": stored.sha256,
             }
         )
 
@@ -150,46 +235,160 @@ async def upload_files(
     return saved_files
 
 
-@files_router.get("/theme/{theme_id}/getfiles")
-async def get_theme_files(
+@files_router.post(
+    "/theme/{theme_id}/uploads",
+    response_model=ResumableUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_resumable_upload(
     theme_id: int,
-    is_homework: Optional[bool] = Query(False),
+    upload: ResumableUploadCreate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
-    result = await db.execute(
-        select(Theme)
-        .options(selectinload(Theme.course).selectinload(Course.owner))
-        .filter(Theme.id == theme_id)
+    """
+    Начать докачиваемую загрузку одного файла (для больших файлов и
+    нестабильной сети). Дальше:
+    - PUT /files/uploads/{upload_id}?offset=N — кусок файла с позиции N
+      (тело — сырые байты); куски можно слать параллельно и повторять
+    - GET /files/uploads/{upload_id} — сколько уже принято (offset, ranges)
+    - POST /files/uploads/{upload_id}/complete — создать файл темы
+    - DELETE /files/uploads/{upload_id} — отменить загрузку
+    Права те же, что у uploadfiles. Студенту — те же 100 МБ на файл,
+    преподавателю — до RESUMABLE_MAX_SIZE; незавершённых загрузок
+    у пользователя не больше RESUMABLE_MAX_SESSIONS_PER_USER.
+    """
+    await _upload_target(db, theme_id, current_user)
+    await db.commit()
+    max_size = settings.RESUMABLE_MAX_SIZE if current_user.is_teacher else MAX_FILE_SIZE
+    return await create_upload_session(
+        current_user.id, theme_id, upload.filename, upload.size, max_size
     )
-    theme = result.scalar_one_or_none()
 
-    if not theme:
+
+@files_router.get("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    session = await load_session(upload_id, current_user.id)
+    return await get_status(session)
+
+
+@files_router.put(
+    "/uploads/{upload_id}",
+    response_model=ResumableUploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/octet-stream": {
+                    "schema": {"type": "string", "format": "binary"}
+                }
+            },
+        }
+    },
+)
+async def put_upload_chunk(
+    request: Request,
+    upload_id: str,
+    offset: int = Query(..., ge=0),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Записать кусок файла с позиции offset"""
+    session = await load_session(upload_id, current_user.id)
+    return await write_chunk(session, offset, request)
+
+
+@files_router.post(
+    "/uploads/{upload_id}/complete", response_model=UploadedFileResponse
+)
+async def complete_resumable_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Завершить загрузку: файл темы создаётся так же, как в uploadfiles"""
+    session = await load_session(upload_id, current_user.id)
+    # Права проверяем заново: за время загрузки тему могли удалить
+    theme, theme_dir, is_homework = await _upload_target(
+        db, session.theme_id, current_user
+    )
+    # claim_completed хеширует весь файл — транзакцию на это время не держим
+    await db.commit()
+
+    stored = await claim_completed(session)
+    try:
+        saved_files = await _save_file_records(
+            db, theme, theme_dir, [stored], is_homework, current_user
+        )
+    except BaseException:
+        await DiskIO.unlink(stored.path)
+        raise
+
+    return saved_files[0]
+
+
+@files_router.delete("/uploads/{upload_id}", response_model=MessageResponse)
+async def abort_resumable_upload(
+    upload_id: str,
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    session = await load_session(upload_id, current_user.id)
+    await remove_session(session)
+    return {"message": "Upload aborted"}
+
+
+@files_router.get(
+    "/theme/{theme_id}/getfiles", response_model=List[FileItemResponse]
+)
+async def get_theme_files(
+    request: Request,
+    response: Response,
+    theme_id: int,
+    is_homework: Optional[bool] = Query(False),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    result = await db.execute(select(Theme.id).filter(Theme.id == theme_id))
+
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Theme not found")
 
+    version = await table_version(
+        db,
+        ThemeFile,
+        ThemeFile.theme_id == theme_id,
+        ThemeFile.is_homework == is_homework,
+    )
+    cached = not_modified(request, response, version, version[1])
+    if cached:
+        return cached
+
     files_result = await db.execute(
-        select(ThemeFile).filter(
+        select(
+            ThemeFile.id, ThemeFile.file_path, ThemeFile.original_filename
+        ).filter(
             ThemeFile.theme_id == theme_id,
             ThemeFile.is_homework == is_homework,
         )
     )
-    files = files_result.scalars().all()
 
     return [
         {
-            "id": f.id,
-            "filename": os.path.basename(f.file_path),
-            "url": "/" + f.file_path.lstrip("/"),
+            "id": file_id,
+            "filename": original_filename or os.path.basename(file_path),
+            "url": "/" + file_path.lstrip("/"),
         }
-        for f in files
+        for file_id, file_path, original_filename in files_result.all()
     ]
 
 
-@files_router.delete("/{file_id}")
+@files_router.delete("/{file_id}", response_model=MessageResponse)
 async def delete_theme_file(
     file_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """
     Удалить файл темы по ID
@@ -240,17 +439,19 @@ async def delete_theme_file(
             )
 
     try:
-        # Удаляем физический файл с диска
-        file_path = Path(file.file_path)
-        if file_path.exists() and file_path.is_file():
-            file_path.unlink()
+        unused_blobs = await BlobRepository.release(db, ThemeFile.id == file.id)
+        if file.blob_sha256 is None:
+            # Файл из старой схемы хранения — удаляем физический файл с диска
+            await DiskIO.unlink(Path(file.file_path))
 
         # Удаляем запись из базы данных
         await db.delete(file)
         await db.commit()
 
-        return {"message": "File deleted successfully"}
-
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting file: {str(e)}")
+
+    # Содержимое удаляется, только если на него больше никто не ссылается
+    await purge_blobs(db, unused_blobs)
+    return {"message": "File deleted successfully"}
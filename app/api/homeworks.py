@@ -4,29 +4,33 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import Optional
 
-from database.engine import get_session
+from database.engine import get_session, get_read_session
 from database.models import Course, Theme, User
 from schemas.homework import (
     HomeworkSchema,
+    HomeworkResponse,
+    HomeworkSubmissionResponse,
     HomeworkCreate,
     HomeworkSubmissionCreate,
     HomeworkSubmissionUpdate,
     HomeworkFilter,
 )
-from schemas.user import StudentHomeworkSchema
+from schemas.user import StudentHomeworkSchema, PrincipalSchema
+from schemas.common import MessageResponse, Page
 from repositories.homework_repository import HomeworkRepository
 from repositories.course_repository import CourseRepository
-from utils.auth import get_current_user
+from utils.auth import get_current_principal
+from utils.pagination import PageParams
 
 homeworks_router = APIRouter()
 
 
-@homeworks_router.post("/{theme_id}")
+@homeworks_router.post("/{theme_id}", response_model=HomeworkResponse)
 async def create_homework(
     theme_id: int,
     homework_data: HomeworkCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Создать домашнее задание (для студентов)"""
     if current_user.is_teacher:
@@ -62,11 +66,11 @@ async def create_homework(
     return homework
 
 
-@homeworks_router.post("/submissions")
+@homeworks_router.post("/submissions", response_model=HomeworkSubmissionResponse)
 async def submit_homework(
     submission_data: HomeworkSubmissionCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Отправить решение ДЗ (текст)"""
     if current_user.is_teacher:
@@ -81,34 +85,36 @@ async def submit_homework(
 2
 
 
-@homeworks_router.get("/my")
+@homeworks_router.get("/my", response_model=Page[HomeworkSchema])
 async def get_my_homeworks(
     theme_id: Optional[int] = Query(None),
-    skip: int = 0,
-    limit: int = 10,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить мои отправленные ДЗ (для студентов)"""
     if current_user.is_teacher:
         raise HTTPException(status_code=403, detail="Only for students")
 
     homeworks = await HomeworkRepository.get_homeworks_with_filters(
-        session, student_id=current_user.id, theme_id=theme_id, skip=skip, limit=limit
+        session,
+        student_id=current_user.id,
+        theme_id=theme_id,
+        cursor=page.cursor,
+        limit=page.limit,
     )
     return homeworks
 
 
-@homeworks_router.get("/")
+@homeworks_router.get("/", response_model=Page[HomeworkSchema])
 async def get_homeworks_for_review(
     course_id: Optional[int] = Query(None),
     theme_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
     student_id: Optional[int] = Query(None),
-    skip: int = 0,
-    limit: int = 10,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Получить ДЗ для проверки (для преподавателей)"""
     if not current_user.is_teacher:
@@ -121,18 +127,18 @@ async def get_homeworks_for_review(
         theme_id=theme_id,
         status=status,
         student_id=student_id,
-        skip=skip,
-        limit=limit,
+        cursor=page.cursor,
+        limit=page.limit,
     )
     return homeworks
 
 
-@homeworks_router.put("/{homework_id}/grade")
+@homeworks_router.put("/{homework_id}/grade", response_model=MessageResponse)
 async def grade_homework(
     homework_id: int,
     grade_data: HomeworkSubmissionUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Оценить ДЗ (для преподавателей)"""
     if not current_user.is_teacher:
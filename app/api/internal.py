@@ -0,0 +1,52 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from config import settings
+from database.engine import get_pool_status
+from utils.progress_buffer import progress_buffer
+from utils.response_cache import response_cache
+from utils.single_flight import single_flight
+
+
+async def require_internal_token(
+    x_internal_token: Optional[str] = Header(default=None),
+) -> None:
+    """Доступ к служебным эндпоинтам по общему секрету (для мониторинга)"""
+    if not settings.INTERNAL_API_TOKEN:
+        # Секрет не задан — эндпоинтов как будто нет
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if x_internal_token is None or not secrets.compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token"
+        )
+
+
+internal_router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@internal_router.get("/pool")
+async def pool_status():
+    """Состояние пула соединений с БД"""
+    return get_pool_status()
+
+
+@internal_router.get("/progress-buffer")
+async def progress_buffer_status():
+    """Состояние буфера отложенной записи прогресса"""
+    return progress_buffer.stats()
+
+
+@internal_router.get("/response-cache")
+async def response_cache_status():
+    """Статистика кеша ответов"""
+    return response_cache.stats()
+
+
+@internal_router.get("/single-flight")
+async def single_flight_status():
+    """Сколько одинаковых конкурентных чтений было склеено"""
+    return single_flight.stats()
@@ -0,0 +1,25 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.engine import get_read_session
+from repositories.search_repository import SearchRepository
+from schemas.search import SearchPage
+from schemas.user import PrincipalSchema
+from utils.auth import get_current_principal
+from utils.pagination import PageParams
+
+search_router = APIRouter()
+
+
+@search_router.get("", response_model=SearchPage)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    scope: Literal["courses", "themes"] = "courses",
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Поиск по курсам или темам с ранжированием и подсветкой совпадений"""
+    return await SearchRepository.search(db, q, scope, page.cursor, page.limit)
@@ -1,45 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from database.engine import get_session
-from database.models import Theme, Course, User, ThemeProgress
-from utils.auth import get_current_user
-from schemas.theme import ThemeCreate, ThemeUpdate, ThemeResponse
-from datetime import datetime
+from database.engine import get_session, get_read_session, read_target
+from database.models import Theme, Course, User, ThemeProgress, File as ThemeFile
+from utils.auth import get_current_principal
+from schemas.user import PrincipalSchema
+from schemas.theme import (
+    ThemeCreate,
+    ThemeUpdate,
+    ThemeResponse,
+    ThemeProgressBulkUpdate,
+    ThemeProgressBulkResponse,
+)
+from schemas.common import DetailResponse, MessageResponse, Page
+from repositories.progress_repository import ProgressRepository
+from repositories.blob_repository import BlobRepository
+from utils.progress_buffer import progress_buffer
+from utils.pagination import PageParams, keyset, build_page
+from utils.conditional import not_modified, table_version
+from utils.response_cache import cache_key, response_cache, themes_tag
+from utils.blob_store import purge_blobs
+from config import settings
 
 themes_router = APIRouter()
 
 
-@themes_router.get("/{course_id}")
+@themes_router.get("/{course_id}", response_model=Page[ThemeResponse])
 async def get_themes(
+    request: Request,
+    response: Response,
     course_id: int,
-    db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
-    result = await db.execute(select(Theme).filter(Theme.course_id == course_id))
-    themes = result.scalars().all()
+    # Версия хранится в кеше вместе со страницей: ETag всегда описывает
+    # именно то тело, которое уйдёт клиенту
+    entry = await response_cache.get_or_load(
+        cache_key(request),
+        [themes_tag(course_id)],
+        settings.CACHE_TTL_THEMES,
+        lambda: _load_themes_entry(db, course_id, page),
+        read_target(db),
+    )
+
+    count, last_updated = entry["version"]
+    cached = not_modified(
+        request,
+        response,
+        (count, last_updated),
+        datetime.fromisoformat(last_updated) if last_updated else None,
+    )
+    if cached:
+        return cached
 
-    if not themes:
+    return entry["page"]
+
+
+async def _load_themes_entry(
+    session: AsyncSession, course_id: int, page: PageParams
+) -> dict:
+    result = await session.execute(
+        keyset(
+            select(
+                Theme.id, Theme.course_id, Theme.name, Theme.text, Theme.is_homework
+            ).filter(Theme.course_id == course_id),
+            Theme.id,
+            page.cursor,
+            page.limit,
+        )
+    )
+    themes = result.all()
+
+    if not themes and not page.cursor:
         # Проверяем, существует ли курс
-        course_result = await db.execute(select(Course).filter(Course.id == course_id))
-        course = course_result.scalar_one_or_none()
-        if not course:
+        course_result = await session.execute(
+            select(Course.id).filter(Course.id == course_id)
+        )
+        if course_result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="Course not found")
 
-    return themes
+    # Версия читается после страницы: при гонке с записью ETag окажется
+    # новее тела, и клиент просто получит полный ответ ещё раз
+    version = await table_version(session, Theme, Theme.course_id == course_id)
+    themes_page = build_page(
+        themes, page.limit, key=lambda theme: (theme.id, theme.id)
+    )
+    themes_page["items"] = [theme._asdict() for theme in themes_page["items"]]
+    return {"version": version, "page": themes_page}
+
+
+# Объявлен до POST /{course_id}, иначе "mark-completed" попадёт в course_id
+@themes_router.post("/mark-completed", response_model=ThemeProgressBulkResponse)
+async def mark_themes_completed(
+    data: ThemeProgressBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: PrincipalSchema = Depends(get_current_principal),
+):
+    """Отметить несколько тем как пройденные одним запросом"""
+    marked = await ProgressRepository.mark_completed(
+        session, current_user.id, data.theme_ids
+    )
+    await session.commit()
+
+    marked_ids = set(marked)
+    return {
+        "marked": sorted(marked_ids),
+        "not_found": sorted(set(data.theme_ids) - marked_ids),
+    }
 
 
 # ТОЛЬКО ПРЕПОД
 @themes_router.post(
     "/{course_id}",
+    response_model=ThemeResponse,
 )
 async def create_theme(
     course_id: int,
     theme_data: ThemeCreate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     course_result = await db.execute(select(Course).filter(Course.id == course_id))
     course = course_result.scalar_one_or_none()
@@ -57,16 +141,17 @@ async def create_theme(
     db.add(new_theme)
     await db.commit()
     await db.refresh(new_theme)
+    await response_cache.invalidate(themes_tag(course_id))
 
     return new_theme
 
 
-@themes_router.patch("/theme/{theme_id}")
+@themes_router.patch("/theme/{theme_id}", response_model=ThemeResponse)
 async def update_theme(
     theme_id: int,
     theme_data: ThemeUpdate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(Theme)
@@ -99,15 +184,16 @@ async def update_theme(
     await db.refresh(
         theme
     )  # обновляем объект после коммита, чтобы вернуть актуальные данные
+    await response_cache.invalidate(themes_tag(theme.course_id))
 
     return theme
 
 
-@themes_router.delete("/theme/{theme_id}")
+@themes_router.delete("/theme/{theme_id}", response_model=DetailResponse)
 async def delete_theme(
     theme_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(Theme)
@@ -129,49 +215,35 @@ async def delete_theme(
             status_code=403, detail="You are not the owner of this course"
         )
 
+    course_id = theme.course_id
+    await ProgressRepository.on_theme_removed(db, theme)
+    unused_blobs = await BlobRepository.release(db, ThemeFile.theme_id == theme_id)
     await db.delete(theme)
     await db.commit()
+    await response_cache.invalidate(themes_tag(course_id))
+    await purge_blobs(db, unused_blobs)
 
     return {"detail": "Theme deleted successfully"}
 
 
 
-@themes_router.post("/{theme_id}/mark-completed")
+@themes_router.post("/{theme_id}/mark-completed", response_model=MessageResponse)
 async def mark_theme_completed(
     theme_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """Отметить тему как пройденную"""
-    # Проверяем существование темы
-    result = await session.execute(select(Theme).filter(Theme.id == theme_id))
-    theme = result.scalar_one_or_none()
-    
-    if not theme:
-        raise HTTPException(status_code=404, detail="Theme not found")
-    
-    # Проверяем, не отмечена ли тема уже как пройденная
-    result = await session.execute(
-        select(ThemeProgress).filter(
-            ThemeProgress.user_id == current_user.id,
-            ThemeProgress.theme_id == theme_id
-        )
+    if settings.PROGRESS_WRITE_BEHIND:
+        # Запись уйдёт в БД пачкой; события для несуществующих тем отбрасываются
+        progress_buffer.add(current_user.id, theme_id)
+        return {"message": "Theme marked as completed"}
+
+    marked = await ProgressRepository.mark_completed(
+        session, current_user.id, [theme_id]
     )
-    existing_progress = result.scalar_one_or_none()
-    
-    if existing_progress:
-        # Если уже отмечена, обновляем
-        existing_progress.is_completed = True
-        existing_progress.completed_at = datetime.now()
-    else:
-        # Если нет, создаем новую запись
-        progress = ThemeProgress(
-            user_id=current_user.id,
-            theme_id=theme_id,
-            is_completed=True,
-            completed_at=datetime.now()
-        )
-        session.add(progress)
-    
+    if not marked:
+        raise HTTPException(status_code=404, detail="Theme not found")
+
     await session.commit()
-    return {"message": "Theme marked as completed"}
\ No newline at end of file
+    return {"message": "Theme marked as completed"}
@@ -3,14 +3,16 @@ from fastapi.responses import FileResponse
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Tuple
 from pathlib import Path
 import os
 import uuid
 
 from database.engine import get_session
 from database.models import Theme, Course, User, File as ThemeFile
-from utils.auth import get_current_user
+from utils.auth import get_current_principal
+from schemas.user import PrincipalSchema
+from utils.blob_store import blob_path
 
 
 upload_router = APIRouter()
@@ -21,12 +23,38 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
 
 
+async def _resolve_file(
+    db: AsyncSession, theme_id: int, url_path: Path
+) -> Tuple[Path, str]:
+    """
+    Файл на диске и имя для сохранения по пути из URL.
+    Новые файлы лежат в хранилище blobs, старые — по самому пути из URL.
+    """
+    result = await db.execute(
+        select(ThemeFile.blob_sha256, ThemeFile.original_filename).filter(
+            ThemeFile.theme_id == theme_id,
+            ThemeFile.file_path == url_path.as_posix(),
+        )
+    )
+    row = result.first()
+    if row is not None and row.blob_sha256 is not None:
+        file_path = blob_path(row.blob_sha256)
+        download_name = row.original_filename or url_path.name
+    else:
+        file_path = url_path
+        download_name = url_path.name
+
+    if not file_path.exists() or not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_path, download_name
+
+
 @upload_router.get("/uploads/themes/{theme_id}/{filename}")
 async def download_theme_file(
     theme_id: int,
     filename: str,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """
     Скачивание файла темы:
@@ -46,15 +74,14 @@ async def download_theme_file(
     if not theme:
         raise HTTPException(status_code=404, detail="Theme not found")
 
-    file_path = UPLOAD_DIR / "themes" / str(theme_id) / filename
-
-    if not file_path.exists() or not file_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
+    file_path, download_name = await _resolve_file(
+        db, theme_id, UPLOAD_DIR / "themes" / str(theme_id) / filename
+    )
 
     # filename в заголовке — то, что увидит пользователь при сохранении
     return FileResponse(
         path=file_path,
-        filename=filename,
+        filename=download_name,
         media_type="application/octet-stream",
     )
 
@@ -65,7 +92,7 @@ async def download_theme_file(
     theme_id: int,
     filename: str,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: PrincipalSchema = Depends(get_current_principal),
 ):
     """
     Скачивание файла темы:
@@ -85,14 +112,15 @@ async def download_theme_file(
     if not theme:
         raise HTTPException(status_code=404, detail="Theme not found")
 
-    file_path = UPLOAD_DIR / "homeworks" / str(user_id) / str(theme_id) / filename
-
-    if not file_path.exists() or not file_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
+    file_path, download_name = await _resolve_file(
+        db,
+        theme_id,
+        UPLOAD_DIR / "homeworks" / str(user_id) / str(theme_id) / filename,
+    )
 
     # filename в заголовке — то, что увидит пользователь при сохранении
     return FileResponse(
         path=file_path,
-        filename=filename,
+        filename=download_name,
         media_type="application/octet-stream",
     )
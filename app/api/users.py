@@ -5,42 +5,65 @@ from sqlalchemy.future import select
 
 from database.engine import get_session
 from database.models import Theme, Course, User
-from utils.auth import get_current_user
+from utils.auth import get_current_principal
+from utils.pagination import PageParams, keyset, build_page
 from schemas.theme import ThemeCreate, ThemeUpdate, ThemeResponse
+from schemas.user import PrincipalSchema, UserResponse
+from schemas.common import Page
 
 users_router = APIRouter()
 
-@users_router.get("/profile")
+@users_router.get("/profile", response_model=UserResponse)
 async def get_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: PrincipalSchema = Depends(get_current_principal)
 ):
     """Получить профиль текущего пользователя"""
     return current_user
 
-@users_router.get("/students")
+@users_router.get("/students", response_model=Page[UserResponse])
 async def get_students_list(
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 50
+    current_user: PrincipalSchema = Depends(get_current_principal),
+    page: PageParams = Depends(),
 ):
     """Получить список студентов (для преподавателей)"""
     if not current_user.is_teacher:
         raise HTTPException(status_code=403, detail="Only for teachers")
     
     result = await db.execute(
-        select(User).filter(User.is_teacher == False).offset(skip).limit(limit)
+        keyset(
+            select(User.id, User.email, User.full_name, User.is_teacher)
+            .filter(User.is_teacher == False),
+            User.id,
+            page.cursor,
+            page.limit,
+            sort_column=User.full_name,
+        )
+    )
+    return build_page(
+        result.all(),
+        page.limit,
+        key=lambda user: (user.full_name, user.id),
     )
-    return result.scalars().all()
 
-@users_router.get("/teachers")
+@users_router.get("/teachers", response_model=Page[UserResponse])
 async def get_teachers_list(
     db: AsyncSession = Depends(get_session),
-    skip: int = 0,
-    limit: int = 50
+    page: PageParams = Depends(),
 ):
     """Получить список преподавателей"""
     result = await db.execute(
-        select(User).filter(User.is_teacher == True).offset(skip).limit(limit)
+        keyset(
+            select(User.id, User.email, User.full_name, User.is_teacher)
+            .filter(User.is_teacher == True),
+            User.id,
+            page.cursor,
+            page.limit,
+            sort_column=User.full_name,
+        )
     )
-    return result.scalars().all()
\ No newline at end of file
+    return build_page(
+        result.all(),
+        page.limit,
+        key=lambda user: (user.full_name, user.id),
+    )
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+import sys
+import time
+
+from jose import jwt
+from sqlalchemy import select
+
+from config import settings
+from database.engine import engine, session_maker
+from database.models import RevokedToken
+from utils.auth import _token_digest, create_access_token, verify_token
+
+ROUNDS = 20000
+
+
+async def _per_request(fn, rounds: int = ROUNDS) -> float:
+    """Среднее время одного вызова, мкс"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+async def main(with_db: bool) -> None:
+    token = await create_access_token({"user_id": 1})
+    digest = _token_digest(token)
+
+    async def uncached():
+        # Как до кеша: разбор и проверка подписи JWT на каждый запрос
+        jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
+
+    async def cached():
+        await verify_token(token)
+
+    await verify_token(token)
+    print(f"🔑 jwt.decode на запрос:       {await _per_request(uncached):8.1f} мкс")
+    print(f"⚡ verify_token из кеша:        {await _per_request(cached):8.1f} мкс")
+
+    if with_db:
+        # Прежняя проверка отзыва: запрос в revoked_tokens на каждый запрос
+        async def db_lookup():
+            async with session_maker() as session:
+                await session.execute(
+                    select(RevokedToken.token_hash).where(
+                        RevokedToken.token_hash == digest,
+                        RevokedToken.expires_at > time.time(),
+                    )
+                )
+
+        cost = await _per_request(db_lookup, rounds=ROUNDS // 20)
+        print(f"🐘 запрос в revoked_tokens:     {cost:8.1f} мкс")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    # Ручной запуск из app/: python -m benchmarks.auth [--db]
+    # --db дополнительно меряет запрос в БД (нужна база из DB_URL)
+    asyncio.run(main("--db" in sys.argv))
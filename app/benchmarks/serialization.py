@@ -0,0 +1,103 @@
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from api.courses import _course_item
+from database.models import Course, User
+from schemas.course import CourseListItem
+
+ROWS = 10000
+ROUNDS = 5
+
+
+def _rows() -> list:
+    """Строки каталога в том виде, в каком их отдаёт _course_catalog()"""
+    now = datetime(2026, 10, 18, 12, 0)
+    return [
+        dict(
+            id=i,
+            name=f"Курс {i}",
+            description="Описание курса " * 5,
+            owner_id=i % 50 + 1,
+            created=now,
+            updated=now,
+            owner_name=f"Преподаватель {i % 50 + 1}",
+            owner_email=f"teacher{i % 50 + 1}@example.com",
+            owner_is_teacher=True,
+        )
+        for i in range(1, ROWS + 1)
+    ]
+
+
+def _orm_courses(rows: list) -> List[Course]:
+    """Прежний путь: ORM-объекты с загруженным преподавателем"""
+    owners = {}
+    courses = []
+    for row in rows:
+        owner = owners.setdefault(
+            row["owner_id"],
+            User(
+                id=row["owner_id"],
+                email=row["owner_email"],
+                full_name=row["owner_name"],
+                hashed_password="$argon2id$" + "x" * 90,
+                is_teacher=True,
+            ),
+        )
+        course = Course(
+            id=row["id"],
+            name=row["name"],
+            description=row["description"],
+            owner_id=row["owner_id"],
+            created=row["created"],
+            updated=row["updated"],
+        )
+        course.owner = owner
+        courses.append(course)
+    return courses
+
+
+class _Row(dict):
+    __getattr__ = dict.__getitem__
+
+
+def _app(response_class, payload) -> TestClient:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/courses", response_model=List[CourseListItem])
+    async def courses():
+        return payload
+
+    return TestClient(app)
+
+
+def _per_request(client: TestClient) -> float:
+    """Среднее время ответа, мс"""
+    client.get("/courses")
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        response = client.get("/courses")
+    assert response.status_code == 200
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main() -> None:
+    rows = _rows()
+    dicts = [_course_item(_Row(row)) for row in rows]
+    print(f"📦 {ROWS} курсов в одном ответе, среднее по {ROUNDS} запросам")
+    cases = {
+        "ORM-объекты + JSONResponse": _app(JSONResponse, _orm_courses(rows)),
+        "ORM-объекты + ORJSONResponse": _app(ORJSONResponse, _orm_courses(rows)),
+        "словари + ORJSONResponse": _app(ORJSONResponse, dicts),
+    }
+    for name, client in cases.items():
+        print(f"⏱️ {name:30} {_per_request(client):8.1f} мс")
+
+
+if __name__ == "__main__":
+    # Ручной запуск из app/: python -m benchmarks.serialization
+    main()
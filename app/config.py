@@ -5,9 +5,104 @@ load_dotenv()
 
 class Settings:
     DB_URL = os.getenv("DB_URL")
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # Режим совместимости с PgBouncer (transaction pooling): без prepared statements
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # Реплики для чтения (через запятую); пусто — всё читается с primary
+    DB_REPLICA_URLS = [
+        url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # Сколько секунд недоступная реплика исключается из ротации
+    DB_REPLICA_RETRY_SECONDS = int(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+    # Сколько секунд после записи пользователь читает с primary (read-your-writes)
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+    # Отложенная запись прогресса (write-behind) для mark-completed
+    PROGRESS_WRITE_BEHIND = os.getenv("PROGRESS_WRITE_BEHIND", "false").lower() == "true"
+    PROGRESS_FLUSH_INTERVAL_MS = int(os.getenv("PROGRESS_FLUSH_INTERVAL_MS", "500"))
+    PROGRESS_FLUSH_MAX_EVENTS = int(os.getenv("PROGRESS_FLUSH_MAX_EVENTS", "1000"))
+    # Куда сохраняются события, которые не удалось записать при остановке
+    PROGRESS_SPILL_PATH = os.getenv("PROGRESS_SPILL_PATH", "progress_spill.jsonl")
+
+    # Размер страницы для списочных эндпоинтов
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+    # Сколько строк за раз забирается с серверного курсора при стриминге
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+    # Фоновое восстановление недостающих homework_submissions при старте
+    REPAIR_ON_STARTUP = os.getenv("REPAIR_ON_STARTUP", "true").lower() == "true"
+    REPAIR_BATCH_SIZE = int(os.getenv("REPAIR_BATCH_SIZE", "1000"))
     
     SECRET_KEY = os.getenv("SECRET_KEY")
     ALGORITHM = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+
+    # Пул для хеширования паролей (argon2): "thread" или "process"
+    HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")
+    HASH_WORKERS = int(os.getenv("HASH_WORKERS", "4"))
+    HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "32"))
+
+    # Кеш аутентифицированных пользователей (in-process)
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+
+    # Кеш проверенных JWT (записи живут не дольше exp токена)
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "50000"))
+    # Где хранятся токены, отозванные при выходе: "db" (таблица revoked_tokens)
+    # или "redis" (REDIS_URL); список общий для всех воркеров.
+    # "db": воркер проверяет по копии в памяти и перечитывает её раз в
+    # TOKEN_DENYLIST_REFRESH_SECONDS — столько отозванный токен ещё может
+    # проходить в других воркерах; истёкшие строки удаляются раз в SWEEP_SECONDS
+    TOKEN_DENYLIST_BACKEND = os.getenv("TOKEN_DENYLIST_BACKEND", "db")
+    TOKEN_DENYLIST_REFRESH_SECONDS = float(
+        os.getenv("TOKEN_DENYLIST_REFRESH_SECONDS", "5")
+    )
+    TOKEN_DENYLIST_SWEEP_SECONDS = int(os.getenv("TOKEN_DENYLIST_SWEEP_SECONDS", "3600"))
+
+    # Кеш ответов: "off", "redis" (общий для воркеров) или "memory" (в процессе).
+    # "memory" только для одного воркера: инвалидация видна лишь процессу,
+    # который обработал запись, остальные отдают старое до истечения TTL
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "off")
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # TTL по маршрутам, секунды
+    CACHE_TTL_COURSES = int(os.getenv("CACHE_TTL_COURSES", "30"))
+    CACHE_TTL_COURSE = int(os.getenv("CACHE_TTL_COURSE", "60"))
+    CACHE_TTL_THEMES = int(os.getenv("CACHE_TTL_THEMES", "60"))
+
+    # Запись загружаемых файлов: размер чанка, потоки для дискового I/O и fsync
+    # ("none" — на усмотрение ОС, "close" — перед закрытием файла, "chunk" — каждый чанк)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    UPLOAD_IO_WORKERS = int(os.getenv("UPLOAD_IO_WORKERS", "4"))
+    UPLOAD_FSYNC = os.getenv("UPLOAD_FSYNC", "none")
+    UPLOAD_MAX_FILES = int(os.getenv("UPLOAD_MAX_FILES", "10"))
+    # Докачиваемые загрузки: максимальный размер файла преподавателя (студентов
+    # ограничивает тот же MAX_FILE_SIZE, что и uploadfiles), одного PUT-куска,
+    # число незавершённых сессий на пользователя и сколько секунд без новых
+    # кусков хранится незавершённая сессия
+    RESUMABLE_MAX_SIZE = int(os.getenv("RESUMABLE_MAX_SIZE", str(2 * 1024**3)))
+    RESUMABLE_CHUNK_MAX_SIZE = int(
+        os.getenv("RESUMABLE_CHUNK_MAX_SIZE", str(16 * 1024 * 1024))
+    )
+    RESUMABLE_MAX_SESSIONS_PER_USER = int(
+        os.getenv("RESUMABLE_MAX_SESSIONS_PER_USER", "5")
+    )
+    RESUMABLE_SESSION_TTL = int(os.getenv("RESUMABLE_SESSION_TTL", str(24 * 60 * 60)))
+
+    # Служебные эндпоинты /internal/* доступны только с заголовком
+    # X-Internal-Token: <INTERNAL_API_TOKEN>; пустое значение их отключает
+    INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+
+    # /batch: максимум подзапросов и сколько из них выполняется одновременно
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
     
 settings = Settings()
\ No newline at end of file
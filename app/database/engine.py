@@ -1,13 +1,103 @@
-from typing import Annotated
-from fastapi import Depends
+import asyncio
+import time
+import uuid
+from typing import Annotated, List, Optional
+from fastapi import Depends, Request
 from database.models import Base
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from config import settings
 
-engine = create_async_engine(settings.DB_URL, echo=True)
-session_maker = async_sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
-)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который дополнительно считает время ожидания соединения"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+
+def _connect_args() -> dict:
+    if settings.DB_PGBOUNCER:
+        # PgBouncer в режиме transaction не держит prepared statements между
+        # транзакциями: отключаем оба кеша и делаем имена уникальными
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=_connect_args(),
+    )
+
+
+def _create_session_maker(bind) -> async_sessionmaker:
+    return async_sessionmaker(bind=bind, class_=AsyncSession, expire_on_commit=False)
+
+
+engine = _create_engine(settings.DB_URL)
+session_maker = _create_session_maker(engine)
+
+
+class ReplicaSet:
+    """Реплики для чтения: round-robin с временным исключением недоступных"""
+
+    def __init__(self, urls: List[str]):
+        self.engines = [_create_engine(url) for url in urls]
+        self.session_makers = [_create_session_maker(e) for e in self.engines]
+        self._next = 0
+        self._down_until = [0.0] * len(urls)
+
+    def candidates(self) -> List[int]:
+        count = len(self.session_makers)
+        if not count:
+            return []
+
+        start = self._next
+        self._next = (self._next + 1) % count
+        now = time.monotonic()
+        order = [(start + i) % count for i in range(count)]
+        return [i for i in order if self._down_until[i] <= now]
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+
+
+replicas = ReplicaSet(settings.DB_REPLICA_URLS)
+
+# Кука с временем (unix), до которого пользователь читает с primary
+STICKY_PRIMARY_COOKIE = "db_primary_until"
 
 
 async def get_session():
@@ -18,6 +108,122 @@ async def get_session():
 SessionDep = Depends(get_session)
 
 
+def _is_sticky_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def _open_replica_session() -> Optional[AsyncSession]:
+    for index in replicas.candidates():
+        session = replicas.session_makers[index]()
+        try:
+            # Сразу берём соединение, чтобы при недоступной реплике перейти к следующей
+            await session.connection()
+            return session
+        except (OSError, asyncio.TimeoutError, SQLAlchemyError) as e:
+            await session.close()
+            replicas.mark_down(index)
+            print(f"❌ Реплика #{index} недоступна: {e}")
+    return None
+
+
+async def open_read_session(request: Request) -> AsyncSession:
+    """Сессия только для чтения: реплика, если она есть и доступна, иначе primary"""
+    session = None
+    if not _is_sticky_to_primary(request):
+        session = await _open_replica_session()
+    if session is not None:
+        session.info["read_target"] = "replica"
+    else:
+        session = session_maker()
+        session.info["read_target"] = "primary"
+    return session
+
+
+def read_target(session: Optional[AsyncSession]) -> str:
+    """Откуда читает сессия: "replica" или "primary" (сессии записи — primary)"""
+    if session is None:
+        return "primary"
+    return session.info.get("read_target", "primary")
+
+
+async def get_read_session(request: Request):
+    async with await open_read_session(request) as session:
+        yield session
+
+
+ReadSessionDep = Depends(get_read_session)
+
+
+class ReadYourWritesMiddleware:
+    """
+    После успешной записи ставит cookie, по которой чтения этого клиента
+    DB_REPLICA_STICKY_SECONDS идут на primary.
+
+    Чистый ASGI: в отличие от BaseHTTPMiddleware тело ответа не проходит
+    через промежуточный поток, а стриминг и фоновые задачи работают как есть.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in ("GET", "HEAD", "OPTIONS")
+            or not replicas.engines
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", _sticky_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _sticky_cookie() -> str:
+    cookie = Response()
+    cookie.set_cookie(
+        key=STICKY_PRIMARY_COOKIE,
+        value=str(time.time() + settings.DB_REPLICA_STICKY_SECONDS),
+        max_age=settings.DB_REPLICA_STICKY_SECONDS,
+        httponly=True,
+        path="/",
+    )
+    return cookie.headers["set-cookie"]
+
+
+def _pool_status(pool: InstrumentedPool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "wait_count": pool.wait_count,
+        "wait_time_total": pool.wait_time_total,
+        "wait_time_avg": (
+            pool.wait_time_total / pool.wait_count if pool.wait_count else 0.0
+        ),
+        "wait_time_max": pool.wait_time_max,
+    }
+
+
+def get_pool_status() -> dict:
+    return {
+        "primary": _pool_status(engine.sync_engine.pool),
+        "replicas": [
+            _pool_status(replica.sync_engine.pool) for replica in replicas.engines
+        ],
+    }
+
+
 async def create_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
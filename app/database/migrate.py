@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from database.engine import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Ключ pg_advisory_xact_lock: миграции выполняет только один воркер
+MIGRATIONS_LOCK_ID = 72_410_001
+
+
+def _alembic_config(connection: Connection) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    return config
+
+
+def _is_schema_current(connection: Connection, config: Config) -> bool:
+    head = ScriptDirectory.from_config(config).get_current_head()
+    current = MigrationContext.configure(connection).get_current_revision()
+    return current == head
+
+
+def _upgrade(connection: Connection) -> None:
+    config = _alembic_config(connection)
+    if _is_schema_current(connection, config):
+        return
+
+    inspector = inspect(connection)
+    if not inspector.has_table("alembic_version") and inspector.has_table("users"):
+        # Схема от старого запуска через create_all без истории миграций.
+        # Данные не трогаем: решение за оператором
+        raise RuntimeError(
+            "Database has tables but no alembic_version. If the schema matches "
+            "the initial migration, run `alembic stamp 0001` and restart to apply "
+            "the rest; otherwise migrate the data manually."
+        )
+
+    command.upgrade(config, "head")
+
+
+def _check_current(connection: Connection) -> bool:
+    return _is_schema_current(connection, _alembic_config(connection))
+
+
+async def run_migrations() -> None:
+    # Быстрый путь без блокировки: схема уже актуальна
+    async with engine.connect() as conn:
+        if await conn.run_sync(_check_current):
+            return
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"),
+            {"lock_id": MIGRATIONS_LOCK_ID},
+        )
+        # Повторная проверка внутри _upgrade: другой воркер мог уже всё применить
+        await conn.run_sync(_upgrade)
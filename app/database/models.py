@@ -12,10 +12,14 @@ from sqlalchemy import (
     ARRAY,
     JSON,
     Table,
+    Index,
+    UniqueConstraint,
+    Computed,
+    LargeBinary,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from typing import List, Optional
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 
 from utils.time import get_moscow_time
 
@@ -31,6 +35,10 @@ class Base(DeclarativeBase):
 
 class UserCourseAssociation(Base):
     __tablename__ = "user_course_association"
+    __table_args__ = (
+        # PK (user_id, course_id) не покрывает выборку студентов курса
+        Index("ix_user_course_association_course_id", "course_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), primary_key=True)
@@ -41,7 +49,7 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     full_name: Mapped[str] = mapped_column(String(100))
-    email: Mapped[str] = mapped_column(String(100))
+    email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(256))
     is_teacher: Mapped[bool] = mapped_column(Boolean)
 
@@ -67,11 +75,30 @@ class User(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_courses_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     name: Mapped[str] = mapped_column(String(200))
     description: Mapped[Optional[str]] = mapped_column(Text)
+    # Полнотекстовый индекс (см. repositories/search_repository.py), не грузится по умолчанию
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     owner: Mapped["User"] = relationship(
         "User", back_populates="owned_courses", foreign_keys=[owner_id]
@@ -86,12 +113,30 @@ class Course(Base):
 
 class Theme(Base):
     __tablename__ = "themes"
+    __table_args__ = (
+        Index("ix_themes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_themes_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"))
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), index=True)
     name: Mapped[str] = mapped_column(Text)
     text: Mapped[str] = mapped_column(Text)
     is_homework: Mapped[bool] = mapped_column(Boolean, default=False)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(text, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     course: Mapped["Course"] = relationship("Course", back_populates="themes")
     homeworks: Mapped[List["Homework"]] = relationship(
@@ -104,6 +149,10 @@ class Theme(Base):
 
 class ThemeProgress(Base):
     __tablename__ = "theme_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "theme_id", name="uq_theme_progress_user_theme"),
+        Index("ix_theme_progress_theme_id", "theme_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -115,8 +164,27 @@ class ThemeProgress(Base):
     theme: Mapped["Theme"] = relationship("Theme")
 
 
+class CourseProgress(Base):
+    """Денормализованный прогресс пользователя по курсу"""
+
+    __tablename__ = "course_progress"
+    __table_args__ = (Index("ix_course_progress_course_id", "course_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True
+    )
+    completed_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class Homework(Base):
     __tablename__ = "homeworks"
+    __table_args__ = (
+        Index("ix_homeworks_theme_id_student_id", "theme_id", "student_id"),
+        Index("ix_homeworks_student_id", "student_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -138,7 +206,7 @@ class HomeworkSubmission(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
     homework_id: Mapped[int] = mapped_column(
-        ForeignKey("homeworks.id", ondelete="CASCADE")
+        ForeignKey("homeworks.id", ondelete="CASCADE"), unique=True, index=True
     )
     submitted_at: Mapped[DateTime] = mapped_column(
         DateTime, default=lambda: get_moscow_time()
@@ -154,10 +222,41 @@ class HomeworkSubmission(Base):
 
 class File(Base):
     __tablename__ = "theme_files"
+    __table_args__ = (
+        Index("ix_theme_files_theme_id_is_homework", "theme_id", "is_homework"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     theme_id: Mapped[int] = mapped_column(ForeignKey("themes.id", ondelete="CASCADE"))
     is_homework: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Путь из URL скачивания. У файлов в хранилище blobs это только адрес:
+    # содержимое лежит в blob_sha256, а имя для пользователя — original_filename
     file_path: Mapped[str] = mapped_column(Text)
+    blob_sha256: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey("blobs.sha256"), index=True
+    )
+    original_filename: Mapped[Optional[str]] = mapped_column(Text)
 
     theme: Mapped["Theme"] = relationship("Theme", back_populates="files")
+
+
+class Blob(Base):
+    """Содержимое загруженного файла, общее для всех его копий"""
+
+    __tablename__ = "blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    # Число строк theme_files с этим blob; при 0 файл удаляется
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class RevokedToken(Base):
+    """Отозванные при выходе JWT — общий для всех воркеров список"""
+
+    __tablename__ = "revoked_tokens"
+
+    # sha256 токена, сам токен не храним
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), primary_key=True)
+    # exp токена (unix time): после него запись не нужна
+    expires_at: Mapped[float] = mapped_column(Float, index=True)
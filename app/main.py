@@ -1,7 +1,10 @@
+import asyncio
 import uvicorn
 from fastapi import FastAPI, UploadFile
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from database.engine import create_db, drop_db
+from database.engine import ReadYourWritesMiddleware
+from database.migrate import run_migrations
 from fastapi.middleware.cors import CORSMiddleware
 from api.auth import auth_router
 from api.courses import courses_router
@@ -9,19 +12,46 @@ from api.themes import themes_router
 from api.homeworks import homeworks_router
 from api.files import files_router
 from api.uploads import upload_router
+from api.internal import internal_router
+from api.search import search_router
+from api.dashboard import dashboard_router
+from api.batch import batch_router
+from utils.hashing import Hasher
+from utils.disk_io import DiskIO
+from utils.progress_buffer import progress_buffer
+from utils.repair import repair_homework_submissions
+from utils.response_cache import response_cache
+from utils.token_denylist import token_denylist
+from config import settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    run_param = True
-    if run_param:
-        await drop_db()
-    await create_db()
+    await run_migrations()
+    await token_denylist.start()
+    if settings.PROGRESS_WRITE_BEHIND:
+        await progress_buffer.start()
+    repair_task = None
+    if settings.REPAIR_ON_STARTUP:
+        repair_task = asyncio.create_task(repair_homework_submissions())
     yield
+    if repair_task is not None and not repair_task.done():
+        repair_task.cancel()
+    if settings.PROGRESS_WRITE_BEHIND:
+        await progress_buffer.stop()
+    await response_cache.close()
+    await token_denylist.close()
+    Hasher.shutdown()
+    DiskIO.shutdown()
 
 
-app = FastAPI(title="my app", lifespan=lifespan)
+app = FastAPI(
+    title="my app", lifespan=lifespan, default_response_class=ORJSONResponse
+)
 
+if settings.DB_REPLICA_URLS:
+    # Без реплик все чтения и так идут в primary — прилипание не нужно
+    app.add_middleware(ReadYourWritesMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +79,10 @@ app.include_router(themes_router, prefix="/themes", tags=["themes"])
 app.include_router(homeworks_router, prefix="/homeworks", tags=["homeworks"])
 app.include_router(files_router, prefix="/files", tags=["files"])
 app.include_router(upload_router, tags=["uploads"])
+app.include_router(search_router, prefix="/search", tags=["search"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+app.include_router(batch_router, prefix="/batch", tags=["batch"])
+app.include_router(internal_router, prefix="/internal", tags=["internal"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("full_name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("hashed_password", sa.String(length=256), nullable=False),
+        sa.Column("is_teacher", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_courses_owner_id", "courses", ["owner_id"])
+
+    op.create_table(
+        "user_course_association",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "course_id"),
+    )
+    op.create_index(
+        "ix_user_course_association_course_id",
+        "user_course_association",
+        ["course_id"],
+    )
+
+    op.create_table(
+        "themes",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("is_homework", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_themes_course_id", "themes", ["course_id"])
+
+    op.create_table(
+        "theme_progress",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("theme_id", sa.Integer(), nullable=False),
+        sa.Column("is_completed", sa.Boolean(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["theme_id"], ["themes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "theme_id", name="uq_theme_progress_user_theme"
+        ),
+    )
+    op.create_index("ix_theme_progress_theme_id", "theme_progress", ["theme_id"])
+
+    op.create_table(
+        "homeworks",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("theme_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["student_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["theme_id"], ["themes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_homeworks_theme_id_student_id", "homeworks", ["theme_id", "student_id"]
+    )
+    op.create_index("ix_homeworks_student_id", "homeworks", ["student_id"])
+
+    op.create_table(
+        "homework_submissions",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("homework_id", sa.Integer(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=True),
+        sa.Column("teacher_comment", sa.Text(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(
+            ["homework_id"], ["homeworks.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_homework_submissions_homework_id",
+        "homework_submissions",
+        ["homework_id"],
+        unique=True,
+    )
+
+    op.create_table(
+        "theme_files",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("theme_id", sa.Integer(), nullable=False),
+        sa.Column("is_homework", sa.Boolean(), nullable=False),
+        sa.Column("file_path", sa.Text(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["theme_id"], ["themes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_theme_files_theme_id_is_homework",
+        "theme_files",
+        ["theme_id", "is_homework"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("theme_files")
+    op.drop_table("homework_submissions")
+    op.drop_table("homeworks")
+    op.drop_table("theme_progress")
+    op.drop_table("themes")
+    op.drop_table("user_course_association")
+    op.drop_table("courses")
+    op.drop_table("users")
@@ -0,0 +1,55 @@
+"""course progress aggregate
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "course_progress",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.Column("total_count", sa.Integer(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "course_id"),
+    )
+    op.create_index("ix_course_progress_course_id", "course_progress", ["course_id"])
+
+    # Заполняем агрегат по уже накопленному прогрессу
+    op.execute(
+        """
+        INSERT INTO course_progress
+            (user_id, course_id, completed_count, total_count, created, updated)
+        SELECT
+            tp.user_id,
+            t.course_id,
+            count(*) FILTER (WHERE tp.is_completed),
+            (SELECT count(*) FROM themes t2 WHERE t2.course_id = t.course_id),
+            timezone('Europe/Moscow', now()),
+            timezone('Europe/Moscow', now())
+        FROM theme_progress tp
+        JOIN themes t ON t.id = tp.theme_id
+        GROUP BY tp.user_id, t.course_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("course_progress")
@@ -0,0 +1,85 @@
+"""full text search for courses and themes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column(
+        "courses",
+        sa.Column(
+            "search_vector",
+            TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "themes",
+        sa.Column(
+            "search_vector",
+            TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(text, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+    op.create_index(
+        "ix_courses_search_vector",
+        "courses",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_themes_search_vector",
+        "themes",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_courses_name_trgm",
+        "courses",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_themes_name_trgm",
+        "themes",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_themes_name_trgm", table_name="themes")
+    op.drop_index("ix_courses_name_trgm", table_name="courses")
+    op.drop_index("ix_themes_search_vector", table_name="themes")
+    op.drop_index("ix_courses_search_vector", table_name="courses")
+    op.drop_column("themes", "search_vector")
+    op.drop_column("courses", "search_vector")
@@ -0,0 +1,58 @@
+"""content-addressed blob store for uploaded files
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+
+    # Существующие файлы остаются на старых путях (blob_sha256 IS NULL),
+    # перенос в хранилище — python -m utils.migrate_blobs
+    op.add_column(
+        "theme_files", sa.Column("blob_sha256", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "theme_files", sa.Column("original_filename", sa.Text(), nullable=True)
+    )
+    op.create_foreign_key(
+        "theme_files_blob_sha256_fkey",
+        "theme_files",
+        "blobs",
+        ["blob_sha256"],
+        ["sha256"],
+    )
+    op.create_index(
+        "ix_theme_files_blob_sha256", "theme_files", ["blob_sha256"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_theme_files_blob_sha256", table_name="theme_files")
+    op.drop_constraint(
+        "theme_files_blob_sha256_fkey", "theme_files", type_="foreignkey"
+    )
+    op.drop_column("theme_files", "original_filename")
+    op.drop_column("theme_files", "blob_sha256")
+    op.drop_table("blobs")
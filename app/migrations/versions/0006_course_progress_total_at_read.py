@@ -0,0 +1,35 @@
+"""count course themes at read time instead of course_progress.total_count
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_column("course_progress", "total_count")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "course_progress",
+        sa.Column("total_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE course_progress cp
+        SET total_count = (SELECT count(*) FROM themes t WHERE t.course_id = cp.course_id)
+        """
+    )
+    op.alter_column("course_progress", "total_count", server_default=None)
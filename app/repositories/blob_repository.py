@@ -0,0 +1,81 @@
+from typing import Iterable, List
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Blob, File as ThemeFile
+from utils.time import get_moscow_time
+
+
+class BlobRepository:
+    async def lock(session: AsyncSession, hashes: Iterable[str]) -> None:
+        """
+        Блокировка blob по хешу до конца транзакции. Под ней проверяется и
+        меняется наличие файла на диске: загрузка не может решить, что файл
+        уже есть, пока очистка его удаляет. Хеши берутся в одном порядке,
+        чтобы две загрузки одинаковых наборов файлов не ждали друг друга.
+        """
+        for sha256 in sorted(set(hashes)):
+            await session.execute(
+                select(func.pg_advisory_xact_lock(func.hashtextextended(sha256, 0)))
+            )
+
+    async def acquire(session: AsyncSession, sha256: str, size: int) -> None:
+        """Ещё одна ссылка на blob (строка создаётся при первой)"""
+        now = get_moscow_time()
+        stmt = insert(Blob).values(
+            sha256=sha256, size=size, ref_count=1, created=now, updated=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={"ref_count": Blob.ref_count + 1, "updated": now},
+        )
+        await session.execute(stmt)
+
+    async def release(session: AsyncSession, *criteria) -> List[str]:
+        """
+        Снять ссылки строк theme_files, подходящих под criteria, — вызывать
+        до их удаления. Возвращает хеши blob, на которые ссылок не осталось:
+        их файлы удаляются после commit (utils.blob_store.purge_blobs).
+        """
+        refs = await session.execute(
+            select(ThemeFile.blob_sha256, func.count())
+            .where(ThemeFile.blob_sha256.is_not(None), *criteria)
+            .group_by(ThemeFile.blob_sha256)
+        )
+
+        unused = []
+        for sha256, count in refs.all():
+            result = await session.execute(
+                update(Blob)
+                .where(Blob.sha256 == sha256)
+                .values(
+                    ref_count=Blob.ref_count - count, updated=get_moscow_time()
+                )
+                .returning(Blob.ref_count)
+            )
+            if result.scalar_one() <= 0:
+                unused.append(sha256)
+        return unused
+
+    async def delete_if_unused(session: AsyncSession, sha256: str) -> bool:
+        """Удалить строку blob без ссылок; вызывать под lock()"""
+        result = await session.execute(
+            delete(Blob)
+            .where(Blob.sha256 == sha256, Blob.ref_count <= 0)
+            .returning(Blob.sha256)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def get_unused(session: AsyncSession) -> List[str]:
+        result = await session.execute(
+            select(Blob.sha256).where(Blob.ref_count <= 0)
+        )
+        return list(result.scalars().all())
+
+    async def get_existing(session: AsyncSession, hashes: Iterable[str]) -> set:
+        result = await session.execute(
+            select(Blob.sha256).where(Blob.sha256.in_(list(hashes)))
+        )
+        return set(result.scalars().all())
@@ -1,7 +1,76 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func
 from typing import List, Optional
-from database.models import Course, User, Theme, UserCourseAssociation
+from utils.pagination import keyset, build_page
+from repositories.search_repository import prefix_tsquery
+from config import settings
+from database.models import (
+    Course,
+    User,
+    Theme,
+    UserCourseAssociation,
+    ThemeProgress,
+    Homework,
+    HomeworkSubmission,
+)
+
+
+def _course_students(course_id: int) -> Select:
+    return (
+        select(User.id, User.full_name, User.email)
+        .join(UserCourseAssociation, User.id == UserCourseAssociation.user_id)
+        .where(
+            UserCourseAssociation.course_id == course_id,
+            User.is_teacher == False,
+        )
+    )
+
+
+def _gradebook_query(course_id: int, students: Select) -> Select:
+    page = students.subquery()
+
+    completed_theme_ids = (
+        select(func.array_agg(ThemeProgress.theme_id))
+        .join(Theme, Theme.id == ThemeProgress.theme_id)
+        .where(
+            ThemeProgress.user_id == page.c.id,
+            ThemeProgress.is_completed == True,
+            Theme.course_id == course_id,
+        )
+        .scalar_subquery()
+    )
+
+    homeworks = (
+        select(
+            func.json_agg(
+                func.json_build_object(
+                    "homework_id",
+                    Homework.id,
+                    "theme_id",
+                    Homework.theme_id,
+                    "status",
+                    Homework.status,
+                    "score",
+                    HomeworkSubmission.score,
+                )
+            )
+        )
+        .select_from(Homework)
+        .join(Theme, Theme.id == Homework.theme_id)
+        .outerjoin(
+            HomeworkSubmission, HomeworkSubmission.homework_id == Homework.id
+        )
+        .where(Homework.student_id == page.c.id, Theme.course_id == course_id)
+        .scalar_subquery()
+    )
+
+    return select(
+        page.c.id,
+        page.c.full_name,
+        page.c.email,
+        completed_theme_ids.label("completed_theme_ids"),
+        homeworks.label("homeworks"),
+    ).order_by(page.c.id)
 
 
 class CourseRepository:
@@ -22,15 +91,18 @@ class CourseRepository:
     async def get_courses_with_filters(
         session: AsyncSession,
         search: Optional[str] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 10,
-    ) -> List[Course]:
+    ) -> dict:
         query = select(Course)
-        if search:
-            query = query.where(Course.name.ilike(f"%{search}%"))
-        query = query.offset(skip).limit(limit)
+        tsquery = prefix_tsquery(search) if search else None
+        if tsquery is not None:
+            query = query.where(Course.search_vector.op("@@")(tsquery))
+        query = keyset(query, Course.id, cursor, limit, sort_column=Course.name)
         result = await session.execute(query)
-        return result.scalars().all()
+        return build_page(
+            result.scalars().all(), limit, key=lambda course: (course.name, course.id)
+        )
 
     async def get_user_courses(
         session: AsyncSession, user_id: int, is_teacher: bool
@@ -62,3 +134,26 @@ class CourseRepository:
         )
         result = await session.execute(query)
         return result.scalar_one_or_none() is not None
+
+    async def get_gradebook_rows(
+        session: AsyncSession,
+        course_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> list:
+        """
+        Страница студентов курса с пройденными темами и оценками за ДЗ —
+        одним запросом, агрегаты считаются коррелированными подзапросами.
+        """
+        students = keyset(_course_students(course_id), User.id, cursor, limit)
+        result = await session.execute(_gradebook_query(course_id, students))
+        return result.all()
+
+    async def stream_gradebook_rows(session: AsyncSession, course_id: int):
+        """То же для всех студентов курса — через серверный курсор"""
+        students = _course_students(course_id).order_by(User.id)
+        query = _gradebook_query(course_id, students).execution_options(
+            yield_per=settings.STREAM_BATCH_SIZE
+        )
+        return await session.stream(query)
+
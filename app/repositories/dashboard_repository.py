@@ -0,0 +1,193 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import (
+    Course,
+    CourseProgress,
+    Homework,
+    Theme,
+    ThemeProgress,
+    User,
+    UserCourseAssociation,
+)
+
+
+def _group_by_course(rows, item) -> Dict[int, List[dict]]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.course_id].append(item(row))
+    return grouped
+
+
+async def _homework_counts(session: AsyncSession, *criteria) -> Dict[int, tuple]:
+    """course_id -> (ожидают проверки, проверено)"""
+    result = await session.execute(
+        select(
+            Theme.course_id,
+            func.count().filter(Homework.status == "pending"),
+            func.count().filter(Homework.status == "graded"),
+        )
+        .select_from(Homework)
+        .join(Theme, Theme.id == Homework.theme_id)
+        .where(*criteria)
+        .group_by(Theme.course_id)
+    )
+    return {course_id: (pending, graded) for course_id, pending, graded in result.all()}
+
+
+def _theme_outline(row) -> dict:
+    return {
+        "id": row.id,
+        "course_id": row.course_id,
+        "name": row.name,
+        "is_homework": row.is_homework,
+        "is_completed": getattr(row, "is_completed", None),
+    }
+
+
+class DashboardRepository:
+    async def get_student_dashboard(session: AsyncSession, user_id: int) -> dict:
+        """
+        Курсы студента с прогрессом, счётчиками ДЗ и оглавлением тем —
+        три запроса независимо от числа курсов.
+        """
+        enrolled: Select = select(UserCourseAssociation.course_id).where(
+            UserCourseAssociation.user_id == user_id
+        )
+
+        courses_result = await session.execute(
+            select(
+                Course.id,
+                Course.name,
+                Course.description,
+                Course.owner_id,
+                User.full_name.label("owner_name"),
+                func.coalesce(CourseProgress.completed_count, 0).label(
+                    "completed_count"
+                ),
+            )
+            .join(User, User.id == Course.owner_id)
+            .outerjoin(
+                CourseProgress,
+                (CourseProgress.course_id == Course.id)
+                & (CourseProgress.user_id == user_id),
+            )
+            .where(Course.id.in_(enrolled))
+            .order_by(Course.id)
+        )
+
+        themes_result = await session.execute(
+            select(
+                Theme.id,
+                Theme.course_id,
+                Theme.name,
+                Theme.is_homework,
+                func.coalesce(ThemeProgress.is_completed, False).label("is_completed"),
+            )
+            .outerjoin(
+                ThemeProgress,
+                (ThemeProgress.theme_id == Theme.id)
+                & (ThemeProgress.user_id == user_id),
+            )
+            .where(Theme.course_id.in_(enrolled))
+            .order_by(Theme.course_id, Theme.id)
+        )
+        themes = _group_by_course(themes_result.all(), _theme_outline)
+
+        homework_counts = await _homework_counts(
+            session, Homework.student_id == user_id
+        )
+
+        courses = []
+        for row in courses_result.all():
+            course_themes = themes.get(row.id, [])
+            themes_count = len(course_themes)
+            pending, graded = homework_counts.get(row.id, (0, 0))
+            courses.append(
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "description": row.description,
+                    "owner_id": row.owner_id,
+                    "owner_name": row.owner_name,
+                    "themes_count": themes_count,
+                    "completed_count": row.completed_count,
+                    "progress_percentage": (
+                        row.completed_count / themes_count * 100
+                        if themes_count > 0
+                        else 0
+                    ),
+                    "pending_homeworks": pending,
+                    "graded_homeworks": graded,
+                    "themes": course_themes,
+                }
+            )
+        return {"courses": courses}
+
+    async def get_teacher_dashboard(session: AsyncSession, teacher_id: int) -> dict:
+        """
+        Курсы преподавателя со студентами, оглавлением тем и числом ДЗ
+        на проверке — четыре запроса независимо от числа курсов.
+        """
+        owned: Select = select(Course.id).where(Course.owner_id == teacher_id)
+
+        courses_result = await session.execute(
+            select(Course.id, Course.name, Course.description)
+            .where(Course.owner_id == teacher_id)
+            .order_by(Course.id)
+        )
+
+        themes_result = await session.execute(
+            select(Theme.id, Theme.course_id, Theme.name, Theme.is_homework)
+            .where(Theme.course_id.in_(owned))
+            .order_by(Theme.course_id, Theme.id)
+        )
+        themes = _group_by_course(themes_result.all(), _theme_outline)
+
+        students_result = await session.execute(
+            select(
+                UserCourseAssociation.course_id,
+                User.id,
+                User.email,
+                User.full_name,
+                User.is_teacher,
+            )
+            .join(User, User.id == UserCourseAssociation.user_id)
+            .where(
+                UserCourseAssociation.course_id.in_(owned),
+                User.is_teacher == False,
+            )
+            .order_by(UserCourseAssociation.course_id, User.full_name, User.id)
+        )
+        students = _group_by_course(
+            students_result.all(),
+            lambda row: {
+                "id": row.id,
+                "email": row.email,
+                "full_name": row.full_name,
+                "is_teacher": row.is_teacher,
+            },
+        )
+
+        homework_counts = await _homework_counts(session, Theme.course_id.in_(owned))
+
+        courses = []
+        for row in courses_result.all():
+            course_students = students.get(row.id, [])
+            course_themes = themes.get(row.id, [])
+            courses.append(
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "description": row.description,
+                    "themes_count": len(course_themes),
+                    "students_count": len(course_students),
+                    "pending_homeworks": homework_counts.get(row.id, (0, 0))[0],
+                    "themes": course_themes,
+                    "students": course_students,
+                }
+            )
+        return {"courses": courses}
@@ -1,13 +1,50 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import DateTime, Integer, Text, and_, exists, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from database.models import Homework, HomeworkSubmission, Theme, Course, User
+from utils.pagination import keyset, build_page
+from utils.time import get_moscow_time
+
+
+def _homework_item(row) -> dict:
+    submission = None
+    if row.submission_id is not None:
+        submission = {
+            "id": row.submission_id,
+            "homework_id": row.id,
+            "submitted_at": row.submitted_at,
+            "score": row.score,
+            "teacher_comment": row.teacher_comment,
+        }
+    return {
+        "id": row.id,
+        "student_id": row.student_id,
+        "theme_id": row.theme_id,
+        "course_id": row.course_id,
+        "title": row.title,
+        "text": row.text,
+        "status": row.status,
+        "created": row.created,
+        "student_name": row.student_name,
+        "course_name": row.course_name,
+        "theme_name": row.theme_name,
+        "submission": submission,
+    }
 
 
 class HomeworkRepository:
-    async def create_homework(session: AsyncSession, homework_data: dict) -> Homework:
+    def build_homework(homework_data: dict) -> Homework:
+        """Новое ДЗ сразу с пустой submission — листинг рассчитывает на её наличие"""
         homework = Homework(**homework_data)
+        homework.submission = HomeworkSubmission(
+            user_id=homework.student_id, score=0, teacher_comment=""
+        )
+        return homework
+
+    async def create_homework(session: AsyncSession, homework_data: dict) -> Homework:
+        homework = HomeworkRepository.build_homework(homework_data)
         session.add(homework)
         await session.commit()
         await session.refresh(homework)
@@ -27,18 +64,35 @@ class HomeworkRepository:
         course_id: Optional[int] = None,
         theme_id: Optional[int] = None,
         status: Optional[str] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 10,
-    ) -> List[Homework]:
+    ) -> dict:
+        # Плоская выборка колонок: одна строка на ДЗ вместо графа ORM-объектов
         query = (
-            select(Homework)
-            .options(
-                selectinload(Homework.theme).selectinload(Theme.course),
-                selectinload(Homework.submission),  # ОБЯЗАТЕЛЬНО загружаем submission
-                selectinload(Homework.student),
+            select(
+                Homework.id,
+                Homework.student_id,
+                Homework.theme_id,
+                Homework.title,
+                Homework.text,
+                Homework.status,
+                Homework.created,
+                Theme.course_id,
+                Theme.name.label("theme_name"),
+                Course.name.label("course_name"),
+                User.full_name.label("student_name"),
+                HomeworkSubmission.id.label("submission_id"),
+                HomeworkSubmission.submitted_at,
+                HomeworkSubmission.score,
+                HomeworkSubmission.teacher_comment,
+            )
+            .select_from(Homework)
+            .join(Theme, Theme.id == Homework.theme_id)
+            .join(Course, Course.id == Theme.course_id)
+            .join(User, User.id == Homework.student_id)
+            .outerjoin(
+                HomeworkSubmission, HomeworkSubmission.homework_id == Homework.id
             )
-            .join(Theme)
-            .join(Course)
         )
 
         if teacher_id:
@@ -52,33 +106,67 @@ class HomeworkRepository:
         if status:
             query = query.where(Homework.status == status)
 
-        query = query.offset(skip).limit(limit)
+        query = keyset(query, Homework.id, cursor, limit)
         result = await session.execute(query)
 
-        homeworks = result.scalars().all()
-
-        # ДОПОЛНИТЕЛЬНО: Убедимся, что у каждого homework есть submission
-        for homework in homeworks:
-            if not homework.submission:
-                print(
-                    f"WARNING: Homework {homework.id} has no submission, creating one"
-                )
-                # Создаем submission если ее нет
-                submission = HomeworkSubmission(
-                    homework_id=homework.id,
-                    user_id=homework.student_id,
-                    score=0,
-                    teacher_comment="",
-                )
-                session.add(submission)
+        homeworks_page = build_page(
+            result.all(), limit, key=lambda row: (row.id, row.id)
+        )
+        homeworks_page["items"] = [
+            _homework_item(row) for row in homeworks_page["items"]
+        ]
+        return homeworks_page
 
-        try:
-            await session.commit()
-        except Exception as e:
-            print(f"Error creating missing submissions: {e}")
-            await session.rollback()
+    async def has_missing_submissions(session: AsyncSession) -> bool:
+        """Есть ли ДЗ без submission"""
+        query = select(
+            select(Homework.id)
+            .where(~exists().where(HomeworkSubmission.homework_id == Homework.id))
+            .exists()
+        )
+        return bool(await session.scalar(query))
 
-        return homeworks
+    async def backfill_missing_submissions(
+        session: AsyncSession, batch_size: int = 1000
+    ) -> int:
+        """
+        Создать пустые submission для ДЗ, у которых их нет (одна пачка).
+        Идемпотентно: повторный запуск ничего не меняет.
+        """
+        now = get_moscow_time()
+        missing = (
+            select(
+                Homework.id,
+                Homework.student_id,
+                literal(0, Integer),
+                literal("", Text),
+                literal(now, DateTime),
+                literal(now, DateTime),
+                literal(now, DateTime),
+            )
+            .where(~exists().where(HomeworkSubmission.homework_id == Homework.id))
+            .order_by(Homework.id)
+            .limit(batch_size)
+        )
+        stmt = (
+            insert(HomeworkSubmission)
+            .from_select(
+                [
+                    "homework_id",
+                    "user_id",
+                    "score",
+                    "teacher_comment",
+                    "submitted_at",
+                    "created",
+                    "updated",
+                ],
+                missing,
+            )
+            .on_conflict_do_nothing(index_elements=["homework_id"])
+        )
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
 
     async def update_submission_grade(
         session: AsyncSession,
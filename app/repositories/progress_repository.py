@@ -0,0 +1,206 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Select,
+    column,
+    func,
+    literal,
+    literal_column,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import CourseProgress, Theme, ThemeProgress, User
+from utils.time import get_moscow_time
+
+
+async def _upsert_progress(
+    session: AsyncSession, rows: Select
+) -> List[Tuple[int, int, bool]]:
+    """
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE по theme_progress.
+    Возвращает (user_id, theme_id, inserted) для каждой затронутой строки.
+    """
+    stmt = insert(ThemeProgress).from_select(
+        ["theme_id", "user_id", "is_completed", "completed_at", "created", "updated"],
+        rows,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_theme_progress_user_theme",
+        set_={
+            "is_completed": True,
+            "completed_at": stmt.excluded.completed_at,
+            "updated": stmt.excluded.updated,
+        },
+    ).returning(
+        ThemeProgress.user_id,
+        ThemeProgress.theme_id,
+        # xmax = 0 только у только что вставленной строки
+        literal_column("xmax = 0"),
+    )
+
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def _bump_course_progress(
+    session: AsyncSession, completed: List[Tuple[int, int]]
+) -> None:
+    """Увеличить completed_count агрегатов на число впервые пройденных тем"""
+    if not completed:
+        return
+
+    completed_values = values(
+        column("user_id", Integer), column("theme_id", Integer), name="completed"
+    ).data(completed)
+
+    now = get_moscow_time()
+    rows = (
+        select(
+            completed_values.c.user_id,
+            Theme.course_id,
+            func.count(),
+            literal(now, DateTime),
+            literal(now, DateTime),
+        )
+        .select_from(completed_values)
+        .join(Theme, Theme.id == completed_values.c.theme_id)
+        .group_by(completed_values.c.user_id, Theme.course_id)
+    )
+
+    stmt = insert(CourseProgress).from_select(
+        ["user_id", "course_id", "completed_count", "created", "updated"],
+        rows,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "course_id"],
+        set_={
+            "completed_count": CourseProgress.completed_count
+            + stmt.excluded.completed_count,
+            "updated": stmt.excluded.updated,
+        },
+    )
+    await session.execute(stmt)
+
+
+class ProgressRepository:
+    async def mark_completed(
+        session: AsyncSession, user_id: int, theme_ids: Iterable[int]
+    ) -> List[int]:
+        """
+        Отметить темы пройденными одним INSERT ... ON CONFLICT DO UPDATE
+        и обновить агрегат course_progress в той же транзакции.
+        Несуществующие темы пропускаются; возвращаются id отмеченных тем.
+        """
+        theme_ids = list(theme_ids)
+        if not theme_ids:
+            return []
+
+        now = get_moscow_time()
+        rows = select(
+            Theme.id,
+            literal(user_id, Integer),
+            true(),
+            literal(datetime.now(), DateTime),
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).where(Theme.id.in_(theme_ids))
+
+        marked = await _upsert_progress(session, rows)
+        await _bump_course_progress(
+            session, [(u, t) for u, t, inserted in marked if inserted]
+        )
+        return [theme_id for _, theme_id, _ in marked]
+
+    async def mark_completed_batch(
+        session: AsyncSession, events: Dict[Tuple[int, int], datetime]
+    ) -> int:
+        """
+        Применить пачку событий {(user_id, theme_id): completed_at} одним upsert.
+        События для удалённых тем и пользователей отбрасываются.
+        """
+        if not events:
+            return 0
+
+        events_values = values(
+            column("user_id", Integer),
+            column("theme_id", Integer),
+            column("completed_at", DateTime),
+            name="events",
+        ).data(
+            [
+                (user_id, theme_id, completed_at)
+                for (user_id, theme_id), completed_at in events.items()
+            ]
+        )
+
+        now = get_moscow_time()
+        rows = (
+            select(
+                events_values.c.theme_id,
+                events_values.c.user_id,
+                true(),
+                events_values.c.completed_at,
+                literal(now, DateTime),
+                literal(now, DateTime),
+            )
+            .select_from(events_values)
+            .join(Theme, Theme.id == events_values.c.theme_id)
+            .join(User, User.id == events_values.c.user_id)
+        )
+
+        marked = await _upsert_progress(session, rows)
+        await _bump_course_progress(
+            session, [(u, t) for u, t, inserted in marked if inserted]
+        )
+        return len(marked)
+
+    async def get_course_progress(
+        session: AsyncSession, user_id: int, course_id: int
+    ) -> Tuple[int, int]:
+        """
+        (completed_count, total_count): пройденные — из агрегата, всего тем —
+        подсчётом по индексу themes.course_id на момент чтения
+        """
+        completed_count = (
+            select(CourseProgress.completed_count)
+            .where(
+                CourseProgress.user_id == user_id,
+                CourseProgress.course_id == course_id,
+            )
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            select(
+                func.coalesce(completed_count, 0), func.count(Theme.id)
+            ).where(Theme.course_id == course_id)
+        )
+        completed, total = result.one()
+        return completed, total
+
+    async def on_theme_removed(session: AsyncSession, theme: Theme) -> None:
+        """Вызывается до удаления темы: её прогресс удалится каскадом"""
+        # Блокировка строки темы конфликтует с FOR KEY SHARE, которую берут
+        # вставки в theme_progress: ждём идущие отметки этой темы, а новые
+        # дождутся удаления и тему уже не найдут — счётчик не разъедется
+        await session.execute(
+            select(Theme.id).where(Theme.id == theme.id).with_for_update()
+        )
+        completed_by = select(ThemeProgress.user_id).where(
+            ThemeProgress.theme_id == theme.id, ThemeProgress.is_completed == True
+        )
+        await session.execute(
+            update(CourseProgress)
+            .where(
+                CourseProgress.course_id == theme.course_id,
+                CourseProgress.user_id.in_(completed_by),
+            )
+            .values(completed_count=CourseProgress.completed_count - 1)
+        )
@@ -0,0 +1,153 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Course, Theme
+from utils.pagination import keyset, build_page
+
+# Должна совпадать с конфигурацией в выражениях search_vector (миграция 0003)
+TS_CONFIG = literal_column("'russian'::regconfig")
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15"
+SNIPPET_LENGTH = 200
+
+# scope -> (модель, колонка с основным текстом)
+SEARCH_TARGETS = {
+    "courses": (Course, Course.description),
+    "themes": (Theme, Theme.text),
+}
+
+
+def prefix_tsquery(text: str):
+    """
+    tsquery с префиксным поиском по каждому слову ("пит курс" -> "пит:* & курс:*").
+    None, если в строке нет ни одного слова.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return func.to_tsquery(TS_CONFIG, " & ".join(f"{word}:*" for word in words))
+
+
+def _item(row, scope: str) -> dict:
+    item = {
+        "id": row.id,
+        "name": row.name,
+        "rank": row.rank,
+        "name_highlight": row.name_highlight,
+        "snippet": row.snippet,
+    }
+    if scope == "themes":
+        item["course_id"] = row.course_id
+    return item
+
+
+async def _fts_page(
+    session: AsyncSession,
+    scope: str,
+    tsquery,
+    cursor: Optional[str],
+    limit: int,
+) -> dict:
+    model, body_column = SEARCH_TARGETS[scope]
+    rank = func.ts_rank_cd(model.search_vector, tsquery, type_=Float)
+
+    # Сначала отбираем страницу по индексу, подсветку считаем только для неё
+    page = keyset(
+        select(model.id, rank.label("rank")).where(
+            model.search_vector.op("@@")(tsquery)
+        ),
+        model.id,
+        cursor,
+        limit,
+        sort_column=-rank,
+    ).subquery()
+
+    query = (
+        select(
+            model.id,
+            model.name,
+            page.c.rank,
+            func.ts_headline(TS_CONFIG, model.name, tsquery, HEADLINE_OPTIONS).label(
+                "name_highlight"
+            ),
+            func.ts_headline(
+                TS_CONFIG, func.coalesce(body_column, ""), tsquery, HEADLINE_OPTIONS
+            ).label("snippet"),
+            *([model.course_id] if scope == "themes" else []),
+        )
+        .join(page, page.c.id == model.id)
+        .order_by(page.c.rank.desc(), model.id)
+    )
+    result = await session.execute(query)
+    return build_page(result.all(), limit, key=lambda row: (-row.rank, row.id))
+
+
+async def _trigram_page(
+    session: AsyncSession,
+    scope: str,
+    text: str,
+    cursor: Optional[str],
+    limit: int,
+) -> dict:
+    model, body_column = SEARCH_TARGETS[scope]
+    similarity = func.similarity(model.name, text, type_=Float)
+
+    query = keyset(
+        select(
+            model.id,
+            model.name,
+            similarity.label("rank"),
+            model.name.label("name_highlight"),
+            func.left(func.coalesce(body_column, ""), SNIPPET_LENGTH).label("snippet"),
+            *([model.course_id] if scope == "themes" else []),
+        ).where(model.name.op("%")(text)),
+        model.id,
+        cursor,
+        limit,
+        sort_column=-similarity,
+    )
+    result = await session.execute(query)
+    return build_page(result.all(), limit, key=lambda row: (-row.rank, row.id))
+
+
+def _finish(page: dict, mode: str, scope: str) -> dict:
+    return {
+        "items": [_item(row, scope) for row in page["items"]],
+        "next_cursor": f"{mode}.{page['next_cursor']}" if page["next_cursor"] else None,
+        "mode": mode,
+    }
+
+
+class SearchRepository:
+    async def search(
+        session: AsyncSession,
+        text: str,
+        scope: str = "courses",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> dict:
+        """
+        Ранжированный полнотекстовый поиск с подсветкой; если по словам ничего
+        не нашлось — нечёткий поиск по названию через pg_trgm (опечатки).
+        Режим зашит в курсор ("fts.<...>" / "trgm.<...>"), чтобы страницы не смешивались.
+        """
+        mode = "fts"
+        if cursor:
+            mode, _, cursor = cursor.partition(".")
+            if mode not in ("fts", "trgm"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+
+        tsquery = prefix_tsquery(text)
+        if mode == "fts" and tsquery is not None:
+            page = await _fts_page(session, scope, tsquery, cursor, limit)
+            if page["items"] or cursor:
+                return _finish(page, "fts", scope)
+
+        page = await _trigram_page(session, scope, text, cursor, limit)
+        return _finish(page, "trgm", scope)
+
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Literal
+
+from config import settings
+
+
+class BatchSubRequest(BaseModel):
+    # Только чтение: подзапросы выполняются конкурентно и без транзакции
+    method: Literal["GET"] = "GET"
+    path: str = Field(pattern=r"^/", max_length=2048)
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_REQUESTS
+    )
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    body: Any = None
+    duration_ms: float
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Страница keyset-пагинации"""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class DetailResponse(BaseModel):
+    detail: str
+
+
+class MessageResponse(BaseModel):
+    message: str
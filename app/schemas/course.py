@@ -1,5 +1,8 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
+
+from schemas.user import UserResponse
 
 class ThemeResponse(BaseModel):
     id: int
@@ -39,3 +42,65 @@ class CourseDetailResponse(CourseBase):
 
     class Config:
         from_attributes = True
+
+
+
+class CourseResponse(CourseBase):
+    id: int
+    owner_id: int
+    created: datetime
+    updated: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CourseListItem(CourseResponse):
+    """Курс в каталоге: с преподавателем и (для студента) флагом записи"""
+
+    owner: UserResponse
+    is_enrolled: Optional[bool] = None
+
+
+class ThemeProgressItem(BaseModel):
+    theme_id: int
+    theme_name: str
+    is_completed: bool
+    is_homework: bool
+
+
+class CourseProgressResponse(BaseModel):
+    completed_count: int
+    total_count: int
+    progress_percentage: float
+    themes_progress: Optional[List[ThemeProgressItem]] = None
+
+
+class GradebookTheme(BaseModel):
+    id: int
+    name: str
+    is_homework: bool
+
+
+class GradebookHomework(BaseModel):
+    homework_id: int
+    theme_id: int
+    status: str
+    score: Optional[int] = None
+
+
+class GradebookStudent(BaseModel):
+    student_id: int
+    full_name: str
+    email: str
+    completed: List[bool]
+    completed_count: int
+    progress_percentage: float
+    homeworks: List[GradebookHomework]
+
+
+class GradebookResponse(BaseModel):
+    course_id: int
+    themes: List[GradebookTheme]
+    items: List[GradebookStudent]
+    next_cursor: Optional[str] = None
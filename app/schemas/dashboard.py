@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from schemas.user import UserResponse
+
+
+class ThemeOutline(BaseModel):
+    id: int
+    course_id: int
+    name: str
+    is_homework: bool
+    is_completed: Optional[bool] = None
+
+
+class StudentDashboardCourse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    owner_id: int
+    owner_name: str
+    themes_count: int
+    completed_count: int
+    progress_percentage: float
+    pending_homeworks: int
+    graded_homeworks: int
+    themes: List[ThemeOutline]
+
+
+class StudentDashboard(BaseModel):
+    courses: List[StudentDashboardCourse]
+
+
+class TeacherDashboardCourse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    themes_count: int
+    students_count: int
+    pending_homeworks: int
+    themes: List[ThemeOutline]
+    students: List[UserResponse]
+
+
+class TeacherDashboard(BaseModel):
+    courses: List[TeacherDashboardCourse]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -20,3 +20,30 @@ class FileSchema(FileBase):
     theme_id: Optional[int] = None
     homework_id: Optional[int] = None
     created: datetime
+
+
+class FileItemResponse(BaseModel):
+    id: int
+    filename: str
+    url: str
+
+
+class UploadedFileResponse(FileItemResponse):
+    is_homework: bool
+    size: int
+    sha256: str
+
+
+class ResumableUploadCreate(BaseModel):
+    filename: str = Field(min_length=1, max_length=255)
+    size: int = Field(gt=0)
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: str
+    theme_id: int
+    filename: str
+    size: int
+    offset: int
+    ranges: List[List[int]]
+    expires_at: datetime
@@ -18,17 +18,32 @@ class HomeworkUpdate(HomeworkBase):
     pass
 
 
-class HomeworkSchema(HomeworkBase):
+class HomeworkResponse(HomeworkBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
     student_id: int
     theme_id: int
+    status: str = "pending"
     created: datetime
+
+
+class HomeworkSubmissionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    homework_id: int
+    submitted_at: datetime
+    score: Optional[int] = None
+    teacher_comment: Optional[str] = None
+
+
+class HomeworkSchema(HomeworkResponse):
+    course_id: Optional[int] = None
     student_name: Optional[str] = None
     course_name: Optional[str] = None
     theme_name: Optional[str] = None
-    submission: Optional["HomeworkSubmissionSchema"] = None
+    submission: Optional[HomeworkSubmissionResponse] = None
     files: List["FileSchema"] = []
 
 
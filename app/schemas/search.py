@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+from schemas.common import Page
+
+
+class SearchItem(BaseModel):
+    id: int
+    name: str
+    rank: float
+    name_highlight: str
+    snippet: Optional[str] = None
+    course_id: Optional[int] = None
+
+
+class SearchPage(Page[SearchItem]):
+    mode: Literal["fts", "trgm"]
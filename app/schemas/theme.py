@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class ThemeBase(BaseModel):
     name: str
@@ -19,6 +19,16 @@ class ThemeUpdate(BaseModel):
 class ThemeResponse(ThemeBase):
     id: int
     course_id: int
+    is_homework: bool = False
 
     class Config:
         from_attributes = True
+
+
+class ThemeProgressBulkUpdate(BaseModel):
+    theme_ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class ThemeProgressBulkResponse(BaseModel):
+    marked: List[int]
+    not_found: List[int]
@@ -27,6 +27,28 @@ class UserSchema(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class PrincipalSchema(BaseModel):
+    """Облегчённое представление текущего пользователя (без ORM-сессии)"""
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    email: str
+    full_name: str
+    is_teacher: bool
+
+
+class UserResponse(BaseModel):
+    """Публичные поля пользователя — без хеша пароля"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    full_name: str
+    is_teacher: bool
+
+
 class TokenSchema(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+
+from api.batch import batch_router
+from config import settings
+from database.models import User
+from schemas.user import PrincipalSchema
+from utils import auth
+from utils.auth import create_access_token, get_current_principal, user_cache
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    """/batch и несколько маршрутов для подзапросов; считает сессии БД"""
+    opened = []
+
+    @asynccontextmanager
+    async def fake_session_maker():
+        opened.append(1)
+        yield None
+
+    async def load_user(session, user_id):
+        # В кеш не кладём: каждый запрос без request.state.principal откроет сессию
+        return User(
+            id=user_id, email="s@example.com", full_name="Студент", is_teacher=False
+        )
+
+    monkeypatch.setattr(auth, "session_maker", fake_session_maker)
+    monkeypatch.setattr(auth, "_load_user", load_user)
+    user_cache.clear()
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(batch_router, prefix="/batch")
+
+    @app.get("/items/{number}")
+    async def item(number: int):
+        # Первые подзапросы отвечают последними
+        await asyncio.sleep(0.01 * (5 - number))
+        return {"number": number}
+
+    @app.get("/whoami")
+    async def whoami(user: PrincipalSchema = Depends(get_current_principal)):
+        return {"id": user.id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    token = asyncio.run(create_access_token({"user_id": 7}))
+    client = TestClient(app, cookies={"access_token": token})
+    return client, opened
+
+
+def _batch(client, *paths):
+    return client.post("/batch", json={"requests": [{"path": p} for p in paths]})
+
+
+def test_batch_keeps_request_order(batch_client):
+    client, _ = batch_client
+
+    response = _batch(client, *(f"/items/{n}" for n in range(5)))
+
+    assert response.status_code == 200
+    bodies = [sub["body"] for sub in response.json()["responses"]]
+    assert bodies == [{"number": n} for n in range(5)]
+
+
+def test_batch_rejects_too_many_requests(batch_client):
+    client, _ = batch_client
+
+    paths = ["/items/1"] * (settings.BATCH_MAX_REQUESTS + 1)
+
+    assert _batch(client, *paths).status_code == 422
+    assert _batch(client, *paths[:-1]).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/batch", "/batch/", "/batch?x=1"])
+def test_batch_rejects_nested_batch(batch_client, path):
+    client, _ = batch_client
+
+    response = _batch(client, "/items/1", path)
+
+    assert response.status_code == 400
+
+
+def test_sub_requests_reuse_parent_principal(batch_client):
+    client, opened = batch_client
+
+    response = _batch(client, "/whoami", "/whoami", "/whoami")
+
+    assert [sub["body"] for sub in response.json()["responses"]] == [{"id": 7}] * 3
+    # Сессию открыл только родительский запрос, подзапросы взяли
+    # пользователя из request.state
+    assert len(opened) == 1
+
+
+def test_failing_sub_request_does_not_fail_batch(batch_client):
+    client, _ = batch_client
+
+    response = _batch(client, "/items/1", "/boom", "/missing")
+
+    assert response.status_code == 200
+    statuses = [sub["status"] for sub in response.json()["responses"]]
+    assert statuses == [200, 500, 404]
@@ -0,0 +1,167 @@
+import hashlib
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from database.engine import session_maker
+from database.models import Blob, Course, File as ThemeFile, Theme, User
+from main import app
+from utils.auth import create_access_token
+from utils.blob_store import STAGING_DIR, blob_path, store_blobs
+from utils.migrate_blobs import collect_garbage, migrate_files_to_blobs
+from utils.multipart_upload import StoredFile
+
+CONTENT = b"lecture notes\n" * 100
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def no_blob_file():
+    """База пересоздаётся перед тестом, файлы хранилища — нет"""
+    blob_path(SHA256).unlink(missing_ok=True)
+
+
+async def _create_theme() -> tuple:
+    """Курс преподавателя с одной темой; (token, theme_id)"""
+    async with session_maker() as session:
+        teacher = User(
+            email="teacher@example.com",
+            full_name="Преподаватель",
+            hashed_password="x",
+            is_teacher=True,
+        )
+        session.add(teacher)
+        await session.flush()
+        course = Course(owner_id=teacher.id, name="Курс", description="")
+        session.add(course)
+        await session.flush()
+        theme = Theme(course_id=course.id, name="Тема", text="")
+        session.add(theme)
+        await session.commit()
+        token = await create_access_token({"user_id": teacher.id})
+        return token, theme.id
+
+
+def _client(token: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        cookies={"access_token": token},
+    )
+
+
+async def _upload(client, theme_id: int, filename: str) -> dict:
+    response = await client.post(
+        f"/files/theme/{theme_id}/uploadfiles",
+        files=[("files", (filename, CONTENT, "text/plain"))],
+    )
+    assert response.status_code == 200, response.text
+    [uploaded] = response.json()
+    return uploaded
+
+
+async def _blobs() -> dict:
+    async with session_maker() as session:
+        result = await session.execute(select(Blob.sha256, Blob.ref_count))
+        return dict(result.all())
+
+
+def test_identical_uploads_share_one_blob(postgres):
+    async def scenario():
+        token, theme_id = await _create_theme()
+        async with _client(token) as client:
+            first = await _upload(client, theme_id, "a.txt")
+            second = await _upload(client, theme_id, "b.txt")
+            downloads = [await client.get(f["url"]) for f in (first, second)]
+        return first, second, downloads, await _blobs()
+
+    first, second, downloads, blobs = postgres.run(scenario())
+
+    assert first["sha256"] == second["sha256"] == SHA256
+    assert first["url"] != second["url"]
+    assert blobs == {SHA256: 2}
+    assert blob_path(SHA256).read_bytes() == CONTENT
+    assert [d.content for d in downloads] == [CONTENT, CONTENT]
+    # Имя при скачивании — исходное, а не адрес с uuid
+    assert 'filename="b.txt"' in downloads[1].headers["content-disposition"]
+
+
+def test_blob_is_removed_with_its_last_reference(postgres):
+    async def scenario():
+        token, theme_id = await _create_theme()
+        async with _client(token) as client:
+            first = await _upload(client, theme_id, "a.txt")
+            second = await _upload(client, theme_id, "b.txt")
+
+            assert (await client.delete(f"/files/{first['id']}")).status_code == 200
+            after_first = await _blobs(), blob_path(SHA256).exists()
+            still_served = await client.get(second["url"])
+
+            assert (await client.delete(f"/files/{second['id']}")).status_code == 200
+            after_last = await _blobs(), blob_path(SHA256).exists()
+        return after_first, still_served, after_last
+
+    after_first, still_served, after_last = postgres.run(scenario())
+
+    assert after_first == ({SHA256: 1}, True)
+    assert still_served.content == CONTENT
+    assert after_last == ({}, False)
+
+
+def test_rolled_back_upload_leaves_orphan_for_garbage_collection(postgres):
+    staged = STAGING_DIR / f"{uuid.uuid4().hex}.part"
+    staged.write_bytes(CONTENT)
+    stored = StoredFile(filename="a.txt", path=staged, size=len(CONTENT), sha256=SHA256)
+
+    async def scenario():
+        async with session_maker() as session:
+            await store_blobs(session, [stored])
+            # Запись theme_files не удалась — транзакция откатывается
+            await session.rollback()
+        orphaned = blob_path(SHA256).exists(), await _blobs()
+        collected = await collect_garbage()
+        return orphaned, collected
+
+    orphaned, collected = postgres.run(scenario())
+
+    assert orphaned == (True, {})
+    assert collected["orphans"] == 1
+    assert not blob_path(SHA256).exists()
+
+
+def test_migration_relinks_legacy_file_and_keeps_its_url(postgres):
+    async def scenario():
+        token, theme_id = await _create_theme()
+        # Файл из старой схемы: лежит по пути из URL, blob_sha256 пустой
+        legacy_dir = Path("uploads") / "themes" / str(theme_id)
+        legacy = legacy_dir / f"{uuid.uuid4().hex}_notes.txt"
+        legacy.parent.mkdir(parents=True, exist_ok=True)
+        legacy.write_bytes(CONTENT)
+        async with session_maker() as session:
+            row = ThemeFile(theme_id=theme_id, file_path=legacy.as_posix())
+            session.add(row)
+            await session.commit()
+            file_id = row.id
+
+        async with _client(token) as client:
+            before = await client.get("/" + legacy.as_posix())
+            migrated = await migrate_files_to_blobs()
+            after = await client.get("/" + legacy.as_posix())
+
+        async with session_maker() as session:
+            row = await session.get(ThemeFile, file_id)
+        return legacy, before, migrated, after, row, await _blobs()
+
+    legacy, before, migrated, after, row, blobs = postgres.run(scenario())
+
+    assert before.content == CONTENT
+    assert migrated == {"migrated": 1, "missing": 0}
+    assert (row.blob_sha256, row.original_filename) == (SHA256, "notes.txt")
+    assert blobs == {SHA256: 1}
+    assert not legacy.exists()
+    assert after.status_code == 200
+    assert after.content == CONTENT
+    assert 'filename="notes.txt"' in after.headers["content-disposition"]
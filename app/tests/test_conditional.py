@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from utils.conditional import latest, make_etag, not_modified
+
+UPDATED = datetime(2026, 10, 18, 15, 0)
+
+
+def _client(version: dict) -> TestClient:
+    """Эндпоинт, отвечающий по текущей версии данных из version["value"]"""
+    app = FastAPI()
+    app.state.built = 0
+
+    @app.get("/items")
+    async def items(request: Request, response: Response):
+        cached = not_modified(request, response, version["value"], UPDATED)
+        if cached:
+            return cached
+        app.state.built += 1
+        return {"items": [1, 2, 3]}
+
+    client = TestClient(app)
+    client.app_state = app.state
+    return client
+
+
+def test_matching_etag_returns_304_without_body():
+    version = {"value": (3, UPDATED)}
+    client = _client(version)
+
+    first = client.get("/items")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    # 15:00 по Москве = 12:00 по Гринвичу
+    assert first.headers["Last-Modified"] == "Sun, 18 Oct 2026 12:00:00 GMT"
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    second = client.get("/items", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert client.app_state.built == 1
+
+    # Сильная форма того же тега и список тегов тоже совпадают
+    strong = etag.removeprefix("W/")
+    listed = client.get("/items", headers={"If-None-Match": f'"other", {strong}'})
+    assert listed.status_code == 304
+
+
+def test_changed_version_or_query_returns_full_response():
+    version = {"value": (3, UPDATED)}
+    client = _client(version)
+    etag = client.get("/items").headers["ETag"]
+
+    # Другая страница — другой ETag
+    other_page = client.get("/items?cursor=abc", headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+    assert other_page.headers["ETag"] != etag
+
+    # Удаление строки меняет count, даже если max(updated) прежний
+    version["value"] = (2, UPDATED)
+    changed = client.get("/items", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json() == {"items": [1, 2, 3]}
+
+
+def test_etag_and_latest_helpers():
+    assert make_etag(1, "a") == make_etag(1, "a")
+    assert make_etag(1, "a") != make_etag(1, "b")
+    assert latest(None, UPDATED, datetime(2020, 1, 1)) == UPDATED
+    assert latest(None, None) is None
@@ -0,0 +1,163 @@
+import httpx
+from sqlalchemy import event
+
+from database.engine import engine, session_maker
+from database.models import (
+    Course,
+    CourseProgress,
+    Homework,
+    Theme,
+    ThemeProgress,
+    User,
+    UserCourseAssociation,
+)
+from main import app
+from repositories.dashboard_repository import DashboardRepository
+from utils.auth import create_access_token
+
+THEMES_PER_COURSE = 3
+
+
+async def _create_users() -> tuple:
+    async with session_maker() as session:
+        teacher = User(
+            email="teacher@example.com",
+            full_name="Преподаватель",
+            hashed_password="x",
+            is_teacher=True,
+        )
+        student = User(
+            email="student@example.com",
+            full_name="Студент",
+            hashed_password="x",
+            is_teacher=False,
+        )
+        session.add_all([teacher, student])
+        await session.commit()
+        return teacher.id, student.id
+
+
+async def _add_courses(teacher_id: int, student_id: int, courses: int) -> None:
+    """Курсы преподавателя с темами; студент записан, прошёл тему, сдал ДЗ"""
+    async with session_maker() as session:
+        for number in range(courses):
+            course = Course(
+                owner_id=teacher_id, name=f"Курс {number}", description="Описание"
+            )
+            session.add(course)
+            await session.flush()
+            themes = [
+                Theme(
+                    course_id=course.id,
+                    name=f"Тема {i}",
+                    text="",
+                    is_homework=i == THEMES_PER_COURSE - 1,
+                )
+                for i in range(THEMES_PER_COURSE)
+            ]
+            session.add_all(themes)
+            await session.flush()
+            session.add_all(
+                [
+                    UserCourseAssociation(user_id=student_id, course_id=course.id),
+                    ThemeProgress(
+                        user_id=student_id, theme_id=themes[0].id, is_completed=True
+                    ),
+                    CourseProgress(
+                        user_id=student_id, course_id=course.id, completed_count=1
+                    ),
+                    Homework(
+                        student_id=student_id,
+                        theme_id=themes[-1].id,
+                        title="ДЗ",
+                        text="",
+                        status="pending",
+                    ),
+                ]
+            )
+        await session.commit()
+
+
+async def _count_statements(load) -> int:
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        async with session_maker() as session:
+            await load(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return len(statements)
+
+
+async def _dashboard_statements(teacher_id: int, student_id: int) -> tuple:
+    student = await _count_statements(
+        lambda session: DashboardRepository.get_student_dashboard(session, student_id)
+    )
+    teacher = await _count_statements(
+        lambda session: DashboardRepository.get_teacher_dashboard(session, teacher_id)
+    )
+    return student, teacher
+
+
+def test_dashboard_statements_do_not_grow_with_courses(postgres):
+    async def scenario():
+        teacher_id, student_id = await _create_users()
+        await _add_courses(teacher_id, student_id, 1)
+        one = await _dashboard_statements(teacher_id, student_id)
+        await _add_courses(teacher_id, student_id, 9)
+        many = await _dashboard_statements(teacher_id, student_id)
+        return one, many
+
+    one, many = postgres.run(scenario())
+
+    # Число запросов не зависит от числа курсов: без N+1
+    assert one == many == (3, 4)
+
+
+async def _get(user_id: int, url: str) -> httpx.Response:
+    token = await create_access_token({"user_id": user_id})
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        cookies={"access_token": token},
+    ) as client:
+        return await client.get(url)
+
+
+def test_dashboard_shape_matches_frontend(postgres):
+    async def scenario():
+        teacher_id, student_id = await _create_users()
+        await _add_courses(teacher_id, student_id, 2)
+        student = await _get(student_id, "/dashboard/student")
+        teacher = await _get(teacher_id, "/dashboard/teacher")
+        return student_id, student, teacher
+
+    student_id, student, teacher = postgres.run(scenario())
+
+    assert student.status_code == teacher.status_code == 200
+
+    # front/js/student.js: список «Мои курсы» с прогрессом
+    course = student.json()["courses"][0]
+    used_by_student_js = {"id", "name", "description", "themes_count"}
+    assert used_by_student_js | {"progress_percentage"} <= set(course)
+    assert course["themes_count"] == THEMES_PER_COURSE
+    assert round(course["progress_percentage"]) == 33
+    assert course["pending_homeworks"] == 1
+
+    # front/js/teacher.js: курсы, темы и студенты по курсам
+    courses = teacher.json()["courses"]
+    assert len(courses) == 2
+    for course in courses:
+        assert {"id", "name", "description", "themes", "students"} <= set(course)
+        course_ids = {theme["course_id"] for theme in course["themes"]}
+        assert len(course["themes"]) == THEMES_PER_COURSE
+        assert course_ids == {course["id"]}
+        assert {"id", "name"} <= set(course["themes"][0])
+        [enrolled] = course["students"]
+        assert enrolled["id"] == student_id
+        assert {"id", "email", "full_name"} <= set(enrolled)
+        assert "hashed_password" not in enrolled
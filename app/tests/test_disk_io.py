@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from utils.disk_io import AsyncFileWriter
+
+
+def test_atomic_writer_renames_into_place_after_close(tmp_path):
+    target = tmp_path / "lecture.pdf"
+    hasher = hashlib.sha256()
+
+    async def scenario():
+        async with AsyncFileWriter(
+            target, fsync="close", atomic=True, hasher=hasher
+        ) as writer:
+            await writer.write(b"hello ")
+            # Пока файл не закрыт, под целевым именем его нет
+            assert not target.exists()
+            assert (tmp_path / ".lecture.pdf.part").exists()
+            await writer.write(b"world")
+        return writer
+
+    writer = asyncio.run(scenario())
+
+    assert target.read_bytes() == b"hello world"
+    assert writer.size == 11
+    assert hasher.hexdigest() == hashlib.sha256(b"hello world").hexdigest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["lecture.pdf"]
+
+
+def test_atomic_writer_keeps_existing_file_and_cleans_up_on_error(tmp_path):
+    target = tmp_path / "lecture.pdf"
+    target.write_bytes(b"old")
+
+    async def scenario():
+        async with AsyncFileWriter(target, atomic=True) as writer:
+            await writer.write(b"partial")
+            raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+
+    assert target.read_bytes() == b"old"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["lecture.pdf"]
+
+
+def test_plain_writer_removes_partial_file_on_error(tmp_path):
+    target = tmp_path / "notes.txt"
+
+    async def scenario():
+        async with AsyncFileWriter(target, fsync="chunk") as writer:
+            await writer.write(b"partial")
+            raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(scenario())
+
+    assert not target.exists()
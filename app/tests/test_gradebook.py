@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from api.courses import _gradebook_student
+from database.models import User
+from repositories.course_repository import _course_students, _gradebook_query
+from utils.pagination import keyset
+
+
+def _theme(theme_id):
+    return SimpleNamespace(id=theme_id, name=f"Тема {theme_id}", is_homework=False)
+
+
+def test_gradebook_student_marks_completed_themes_in_course_order():
+    themes = [_theme(1), _theme(2), _theme(3), _theme(4)]
+    row = SimpleNamespace(
+        id=7,
+        full_name="Студент",
+        email="student@example.com",
+        completed_theme_ids=[3, 1],
+        homeworks=[{"homework_id": 5, "theme_id": 3, "status": "checked", "score": 9}],
+    )
+
+    student = _gradebook_student(row, themes)
+
+    assert student["completed"] == [True, False, True, False]
+    assert student["completed_count"] == 2
+    assert student["progress_percentage"] == 50
+    assert student["homeworks"] == row.homeworks
+
+
+def test_gradebook_student_without_progress_or_themes():
+    row = SimpleNamespace(
+        id=7,
+        full_name="Студент",
+        email="student@example.com",
+        completed_theme_ids=None,
+        homeworks=None,
+    )
+
+    student = _gradebook_student(row, [])
+
+    assert student["completed"] == []
+    assert student["progress_percentage"] == 0
+    assert student["homeworks"] == []
+
+
+def test_gradebook_page_is_a_single_statement():
+    students = keyset(_course_students(42), User.id, None, 50)
+    sql = str(
+        _gradebook_query(42, students).compile(dialect=postgresql.dialect())
+    )
+
+    # Агрегаты — коррелированные подзапросы в одном SELECT, без N+1 по студентам
+    assert sql.count("array_agg(") == 1
+    assert sql.count("json_agg(") == 1
+    assert "LIMIT" in sql
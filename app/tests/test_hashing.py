@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.auth import auth_router
+from config import settings
+from database.engine import get_session
+from repositories.user_repository import UserRepository
+from utils.hashing import Hasher, HasherBusyError
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setattr(settings, "HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "HASH_QUEUE_SIZE", 1)
+    monkeypatch.setattr(Hasher, "_executor", None)
+    monkeypatch.setattr(Hasher, "_in_flight", 0)
+    yield
+    Hasher.shutdown()
+
+
+def test_hasher_rejects_when_queue_is_full(small_pool):
+    release = threading.Event()
+
+    async def scenario():
+        # Один выполняется, один ждёт в очереди — третий не принимается
+        running = [
+            asyncio.create_task(Hasher._run(release.wait, 5)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(HasherBusyError):
+            await Hasher._run(release.wait, 5)
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        # Места освободились — задачи снова принимаются
+        assert await Hasher._run(release.wait, 5) is True
+
+    asyncio.run(scenario())
+    assert Hasher._in_flight == 0
+
+
+def test_login_returns_503_with_retry_after_when_busy(small_pool, monkeypatch):
+    class StoredUser:
+        id = 1
+        hashed_password = "$argon2id$stub"
+
+    async def get_user_by_email(session, email):
+        return StoredUser()
+
+    monkeypatch.setattr(UserRepository, "get_user_by_email", get_user_by_email)
+    # Пул занят другими входами
+    monkeypatch.setattr(
+        Hasher, "_in_flight", settings.HASH_WORKERS + settings.HASH_QUEUE_SIZE
+    )
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/auth")
+    app.dependency_overrides[get_session] = lambda: None
+
+    response = TestClient(app).post(
+        "/auth/login", json={"email": "student@example.com", "password": "secret"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
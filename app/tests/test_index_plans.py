@@ -0,0 +1,164 @@
+import httpx
+from sqlalchemy import event, text
+
+import main
+from api.courses import _load_catalog_entry
+from api.themes import _load_themes_entry
+from database.engine import engine, get_read_session, session_maker
+from repositories.homework_repository import HomeworkRepository
+from repositories.user_repository import UserRepository
+from schemas.user import PrincipalSchema
+from utils.auth import get_current_principal
+from utils.pagination import PageParams, encode_cursor
+
+# Данные порядка небольшой школы: с ними планировщик сам выбирает между
+# Seq Scan и индексом, настройки enable_* не трогаем
+SEED = """
+INSERT INTO users (id, full_name, email, hashed_password, is_teacher, created, updated)
+SELECT g, 'Пользователь ' || g, 'user' || g || '@example.com', 'x', g <= 500,
+       now(), now()
+FROM generate_series(1, 20000) g;
+
+INSERT INTO courses (id, owner_id, name, description, created, updated)
+SELECT g, g % 500 + 1, 'Курс ' || g, 'Описание курса ' || g, now(), now()
+FROM generate_series(1, 2000) g;
+
+-- Темы курса создаются подряд, поэтому лежат рядом
+INSERT INTO themes (id, course_id, name, text, is_homework, created, updated)
+SELECT g, (g - 1) / 20 + 1, 'Тема ' || g, 'Текст темы ' || g, g % 5 = 0, now(), now()
+FROM generate_series(1, 40000) g;
+
+INSERT INTO user_course_association (user_id, course_id, created, updated)
+SELECT 500 + g % 19500 + 1, g * 7 % 2000 + 1, now(), now()
+FROM generate_series(1, 60000) g
+ON CONFLICT DO NOTHING;
+
+INSERT INTO homeworks (id, student_id, theme_id, title, text, status, created, updated)
+SELECT g, 500 + g % 19500 + 1, g % 40000 + 1, 'ДЗ ' || g, 'Ответ ' || g,
+       (ARRAY['pending', 'checked', 'rejected'])[g % 3 + 1], now(), now()
+FROM generate_series(1, 200000) g;
+
+INSERT INTO homework_submissions
+    (user_id, homework_id, submitted_at, score, teacher_comment, created, updated)
+SELECT student_id, id, now(), 0, '', now(), now() FROM homeworks;
+
+INSERT INTO theme_files
+    (theme_id, is_homework, file_path, original_filename, created, updated)
+SELECT g % 40000 + 1, g % 2 = 0, 'uploads/' || g || '.pdf', g || '.pdf', now(), now()
+FROM generate_series(1, 40000) g;
+"""
+
+
+def _capture_statements():
+    """Запросы, которые код реально отправил в базу, с их параметрами"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    return statements, lambda: event.remove(
+        engine.sync_engine, "before_cursor_execute", capture
+    )
+
+
+async def _page_query(loader):
+    """Первый запрос загрузчика — сама страница; версия считается отдельно"""
+    statements, stop = _capture_statements()
+    try:
+        async with session_maker() as session:
+            await loader(session)
+    finally:
+        stop()
+    return statements[:1]
+
+
+async def _route_queries(url):
+    statements, stop = _capture_statements()
+
+    async def read_session():
+        async with session_maker() as session:
+            yield session
+
+    main.app.dependency_overrides[get_read_session] = read_session
+    main.app.dependency_overrides[get_current_principal] = lambda: PrincipalSchema(
+        id=1, email="user1@example.com", full_name="Пользователь 1", is_teacher=True
+    )
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get(url)
+            assert response.status_code == 200, response.text
+    finally:
+        main.app.dependency_overrides.clear()
+        stop()
+    return statements
+
+
+def _homeworks(**filters):
+    return lambda session: HomeworkRepository.get_homeworks_with_filters(
+        session, **filters
+    )
+
+
+def _page(cursor=None):
+    return PageParams(cursor=cursor, limit=20)
+
+
+# Запросы горячих путей в том виде, в каком их строят репозитории и обработчики
+HOT_PATHS = {
+    "users.by_email": lambda: _page_query(
+        lambda session: UserRepository.get_user_by_email(
+            session, "user12345@example.com"
+        )
+    ),
+    "themes.page": lambda: _page_query(
+        lambda session: _load_themes_entry(session, 777, _page())
+    ),
+    "themes.next_page": lambda: _page_query(
+        lambda session: _load_themes_entry(
+            session, 777, _page(encode_cursor(15530, 15530))
+        )
+    ),
+    "courses.page": lambda: _page_query(
+        lambda session: _load_catalog_entry(session, _page())
+    ),
+    "courses.next_page": lambda: _page_query(
+        lambda session: _load_catalog_entry(session, _page(encode_cursor(1500, 1500)))
+    ),
+    "homeworks.all": lambda: _page_query(_homeworks()),
+    "homeworks.teacher": lambda: _page_query(_homeworks(teacher_id=17)),
+    "homeworks.student": lambda: _page_query(_homeworks(student_id=4321)),
+    "homeworks.course": lambda: _page_query(_homeworks(course_id=777)),
+    "homeworks.theme": lambda: _page_query(_homeworks(theme_id=777)),
+    "homeworks.teacher_status": lambda: _page_query(
+        _homeworks(teacher_id=17, status="checked")
+    ),
+    "files.getfiles": lambda: _route_queries("/files/theme/777/getfiles"),
+}
+
+
+async def _explain_hot_paths() -> dict:
+    async with engine.begin() as conn:
+        for statement in SEED.split(";"):
+            if statement.strip():
+                await conn.execute(text(statement))
+        await conn.execute(text("ANALYZE"))
+
+    plans = {}
+    for name, run in HOT_PATHS.items():
+        statements = await run()
+        assert statements, name
+        async with engine.connect() as conn:
+            for number, (statement, parameters) in enumerate(statements):
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plans[f"{name}[{number}]"] = "\n".join(row[0] for row in result)
+    return plans
+
+
+def test_hot_queries_use_indexes(postgres):
+    plans = postgres.run(_explain_hot_paths())
+    slow = {name: plan for name, plan in plans.items() if "Seq Scan" in plan}
+    assert not slow, "\n\n".join(f"{name}:\n{plan}" for name, plan in slow.items())
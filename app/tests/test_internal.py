@@ -0,0 +1,36 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.internal import internal_router
+from config import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(internal_router, prefix="/internal")
+    return TestClient(app)
+
+
+def test_internal_endpoints_are_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "")
+    assert client.get("/internal/single-flight").status_code == 404
+
+
+def test_internal_endpoints_require_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+
+    assert client.get("/internal/single-flight").status_code == 403
+    assert (
+        client.get(
+            "/internal/single-flight", headers={"X-Internal-Token": "wrong"}
+        ).status_code
+        == 403
+    )
+
+    response = client.get(
+        "/internal/single-flight", headers={"X-Internal-Token": "s3cret"}
+    )
+    assert response.status_code == 200
+    assert "coalesced" in response.json()
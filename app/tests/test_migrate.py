@@ -0,0 +1,60 @@
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from database import migrate
+
+
+@pytest.fixture
+def upgrades(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        migrate.command, "upgrade", lambda config, revision: calls.append(revision)
+    )
+    return calls
+
+
+@pytest.fixture
+def connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        yield connection
+    engine.dispose()
+
+
+def _head(connection) -> str:
+    config = migrate._alembic_config(connection)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def test_upgrade_empty_database_runs_migrations(connection, upgrades):
+    migrate._upgrade(connection)
+
+    assert upgrades == ["head"]
+
+
+def test_upgrade_skips_database_stamped_at_head(connection, upgrades):
+    connection.execute(
+        text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)")
+    )
+    connection.execute(
+        text("INSERT INTO alembic_version VALUES (:head)"),
+        {"head": _head(connection)},
+    )
+
+    migrate._upgrade(connection)
+
+    assert upgrades == []
+
+
+def test_upgrade_refuses_unstamped_legacy_schema(connection, upgrades):
+    connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY)"))
+    connection.execute(text("INSERT INTO users (id) VALUES (1)"))
+
+    with pytest.raises(RuntimeError, match="alembic stamp"):
+        migrate._upgrade(connection)
+
+    assert upgrades == []
+    # Данные старой схемы на месте
+    assert inspect(connection).has_table("users")
+    assert connection.execute(text("SELECT count(*) FROM users")).scalar() == 1
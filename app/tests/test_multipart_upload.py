@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import HTTPException, Request
+
+from config import settings
+from utils.disk_io import AsyncFileWriter
+from utils.multipart_upload import receive_files
+
+BOUNDARY = "test-boundary"
+
+
+def _body(*files) -> bytes:
+    parts = []
+    for name, content in files:
+        parts.append(
+            (
+                f"--{BOUNDARY}\r\n"
+                f'Content-Disposition: form-data; name="files"; filename="{name}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode()
+            + content
+            + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def _request(body: bytes, piece_size: int = 5) -> Request:
+    """Request, тело которого приходит мелкими фрагментами, как из сети"""
+    pieces = [body[i : i + piece_size] for i in range(0, len(body), piece_size)]
+    messages = [
+        {"type": "http.request", "body": piece, "more_body": True} for piece in pieces
+    ] + [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/upload",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())
+        ],
+    }
+    return Request(scope, receive)
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16)
+    sizes = []
+    original_write = AsyncFileWriter.write
+
+    async def write(self, data):
+        sizes.append(len(data))
+        await original_write(self, data)
+
+    monkeypatch.setattr(AsyncFileWriter, "write", write)
+    return sizes
+
+
+def test_part_data_is_written_in_upload_chunks(tmp_path, writes):
+    first, second = bytes(range(40)), b"tail"
+    request = _request(_body(("a.bin", first), ("b.bin", second)))
+
+    stored = asyncio.run(receive_files(request, tmp_path, max_file_size=100))
+
+    assert [(f.filename, f.size, f.sha256) for f in stored] == [
+        ("a.bin", 40, hashlib.sha256(first).hexdigest()),
+        ("b.bin", 4, hashlib.sha256(second).hexdigest()),
+    ]
+    assert [f.path.read_bytes() for f in stored] == [first, second]
+    # Фрагменты по 5 байт склеены до UPLOAD_CHUNK_SIZE, остаток дописан
+    # в конце части
+    assert writes[-1] == 4
+    assert sum(writes[:-1]) == 40
+    assert all(size >= 16 for size in writes[:-2])
+    assert len(writes) <= 4
+
+
+def test_size_limit_counts_buffered_data(tmp_path, writes):
+    request = _request(_body(("big.bin", b"x" * 101)))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(receive_files(request, tmp_path, max_file_size=100))
+
+    assert error.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from database.models import Course, User
+from utils.pagination import build_page, decode_cursor, encode_cursor, keyset
+
+
+def test_cursor_round_trip_with_integer_and_datetime_keys():
+    assert decode_cursor(encode_cursor(15, 15), Course.id) == (15, 15)
+
+    created = datetime(2026, 10, 18, 12, 30, 5)
+    assert decode_cursor(encode_cursor(created, 3), Course.created) == (created, 3)
+
+    name = "Иванов Иван"
+    assert decode_cursor(encode_cursor(name, 9), User.full_name) == (name, 9)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        "Zm9v",  # "foo" — не JSON
+        encode_cursor("x", 1)[:-3],  # обрезанный
+        "WzFd",  # [1] — не хватает id
+        "WyJhIiwgImIiXQ",  # ["a", "b"] — id не число
+    ],
+)
+def test_invalid_cursor_is_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, Course.id)
+    assert error.value.status_code == 400
+
+
+def test_invalid_datetime_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor("yesterday", 1), Course.created)
+    assert error.value.status_code == 400
+
+
+def test_build_page_sets_next_cursor_only_when_more_rows_exist():
+    rows = [(1, "a"), (2, "b"), (3, "c")]
+
+    page = build_page(rows, 2, key=lambda row: (row[0], row[0]))
+    assert page["items"] == rows[:2]
+    assert decode_cursor(page["next_cursor"], Course.id) == (2, 2)
+
+    last = build_page(rows[2:], 2, key=lambda row: (row[0], row[0]))
+    assert last == {"items": [(3, "c")], "next_cursor": None}
+
+
+def test_keyset_continues_after_cursor_row():
+    cursor = encode_cursor("Петров", 5)
+    query = keyset(select(User), User.id, cursor, 10, sort_column=User.full_name)
+    compiled = query.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "(users.full_name, users.id) > (" in sql
+    assert "ORDER BY users.full_name, users.id" in sql
+    # На одну строку больше — чтобы узнать, есть ли следующая страница
+    assert 11 in compiled.params.values()
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from repositories.progress_repository import ProgressRepository
+from utils import progress_buffer as progress_buffer_module
+from utils.progress_buffer import ProgressBuffer
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Записанные батчи; available=False имитирует недоступную БД"""
+    state = {"available": True, "batches": []}
+
+    async def mark_completed_batch(session, batch):
+        if not state["available"]:
+            raise ConnectionError("database is down")
+        state["batches"].append(dict(batch))
+
+    monkeypatch.setattr(progress_buffer_module, "session_maker", FakeSession)
+    monkeypatch.setattr(
+        ProgressRepository, "mark_completed_batch", mark_completed_batch
+    )
+    return state
+
+
+def _buffer(tmp_path, max_events=10):
+    return ProgressBuffer(
+        flush_interval=60, max_events=max_events, spill_path=tmp_path / "spill.jsonl"
+    )
+
+
+def test_flush_writes_deduplicated_batches(tmp_path, database):
+    buffer = _buffer(tmp_path, max_events=2)
+    buffer.add(1, 10)
+    buffer.add(1, 10)
+    buffer.add(1, 11)
+    buffer.add(2, 10)
+
+    asyncio.run(buffer.flush())
+
+    assert [sorted(batch) for batch in database["batches"]] == [
+        [(1, 10), (1, 11)],
+        [(2, 10)],
+    ]
+    assert buffer.deduplicated == 1
+    assert buffer.flushed == 3
+    assert buffer.stats()["depth"] == 0
+
+
+def test_failed_flush_requeues_without_overwriting_newer_events(tmp_path, database):
+    buffer = _buffer(tmp_path)
+    buffer.add(1, 10)
+    first_completed_at = buffer._events[(1, 10)]
+    database["available"] = False
+
+    async def scenario():
+        await buffer.flush()
+        assert buffer.flush_errors == 1
+        assert buffer._events[(1, 10)] == first_completed_at
+
+        database["available"] = True
+        await buffer.flush()
+
+    asyncio.run(scenario())
+
+    assert database["batches"] == [{(1, 10): first_completed_at}]
+    assert buffer.stats()["depth"] == 0
+
+
+def test_stop_spills_to_disk_and_start_reloads(tmp_path, database):
+    database["available"] = False
+    buffer = _buffer(tmp_path)
+    buffer.add(1, 10)
+    buffer.add(2, 20)
+    completed_at = dict(buffer._events)
+
+    asyncio.run(buffer.stop(attempts=2))
+
+    assert buffer.stats()["depth"] == 0
+    assert buffer.spill_path.exists()
+
+    database["available"] = True
+    restarted = _buffer(tmp_path)
+
+    async def scenario():
+        await restarted.start()
+        assert not restarted.spill_path.exists()
+        assert restarted._events == completed_at
+        await restarted.stop()
+
+    asyncio.run(scenario())
+
+    assert database["batches"] == [completed_at]
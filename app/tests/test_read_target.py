@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+
+import database.engine as engine_module
+import main
+from database.engine import (
+    STICKY_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    read_target,
+    session_maker,
+)
+from utils.response_cache import ResponseCache
+
+
+def test_single_flight_does_not_mix_replica_and_primary_reads():
+    cache = ResponseCache(backend=None)
+    release = asyncio.Event()
+    loads = []
+
+    def loader(target):
+        async def load():
+            loads.append(target)
+            await release.wait()
+            return {"target": target}
+
+        return load
+
+    async def scenario():
+        requests = [
+            asyncio.create_task(
+                cache.get_or_load("k", [], 60, loader(target), read_target=target)
+            )
+            for target in ("replica", "replica", "primary")
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*requests)
+
+    results = asyncio.run(scenario())
+
+    # Два чтения с реплики склеились, прилипший к primary запрос читал сам
+    assert sorted(loads) == ["primary", "replica"]
+    assert [result["target"] for result in results] == [
+        "replica",
+        "replica",
+        "primary",
+    ]
+
+
+def test_read_target_defaults_to_primary():
+    assert read_target(None) == "primary"
+    assert read_target(session_maker()) == "primary"
+
+
+def _sticky_app():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/read")
+    async def read():
+        return {"ok": True}
+
+    @app.post("/write")
+    async def write():
+        async def chunks():
+            yield b"a"
+            yield b"b"
+
+        return StreamingResponse(chunks())
+
+    @app.post("/fail")
+    async def fail():
+        raise HTTPException(status_code=400)
+
+    return app
+
+
+def _requests(app):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return [await c.get("/read"), await c.post("/write"), await c.post("/fail")]
+
+    return asyncio.run(scenario())
+
+
+def test_successful_write_makes_reads_sticky(monkeypatch):
+    monkeypatch.setattr(engine_module.replicas, "engines", [object()])
+
+    read, write, fail = _requests(_sticky_app())
+
+    assert STICKY_PRIMARY_COOKIE in write.cookies
+    assert write.content == b"ab"
+    assert STICKY_PRIMARY_COOKIE not in read.cookies
+    assert STICKY_PRIMARY_COOKIE not in fail.cookies
+
+
+def test_no_sticky_cookie_without_replicas():
+    read, write, fail = _requests(_sticky_app())
+
+    assert all(STICKY_PRIMARY_COOKIE not in r.cookies for r in (read, write, fail))
+    # Без DB_REPLICA_URLS middleware в приложение не добавляется вовсе
+    assert all(m.cls is not ReadYourWritesMiddleware for m in main.app.user_middleware)
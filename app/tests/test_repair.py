@@ -0,0 +1,164 @@
+from sqlalchemy import event, func, insert, select
+
+import utils.repair as repair
+from database.engine import engine, session_maker
+from database.models import Course, Homework, HomeworkSubmission, Theme, User
+from repositories.homework_repository import HomeworkRepository
+from utils.time import get_moscow_time
+
+
+def test_build_homework_attaches_empty_submission():
+    homework = HomeworkRepository.build_homework(
+        {"student_id": 7, "theme_id": 3, "title": "ДЗ", "text": "Ответ"}
+    )
+
+    assert homework.submission is not None
+    assert homework.submission.user_id == 7
+    assert homework.submission.score == 0
+
+
+async def _seed_legacy_homeworks(count: int) -> None:
+    """ДЗ без submission — как до того, как она создавалась вместе с ДЗ"""
+    now = get_moscow_time()
+    stamps = {"created": now, "updated": now}
+    async with session_maker() as session:
+        await session.execute(
+            insert(User),
+            [
+                dict(
+                    id=1,
+                    full_name="Преподаватель",
+                    email="t@example.com",
+                    hashed_password="x",
+                    is_teacher=True,
+                    **stamps,
+                ),
+                dict(
+                    id=2,
+                    full_name="Студент",
+                    email="s@example.com",
+                    hashed_password="x",
+                    is_teacher=False,
+                    **stamps,
+                ),
+            ],
+        )
+        await session.execute(
+            insert(Course).values(id=1, owner_id=1, name="Курс", **stamps)
+        )
+        await session.execute(
+            insert(Theme).values(id=1, course_id=1, name="Тема", text="", **stamps)
+        )
+        if count:
+            await session.execute(
+                insert(Homework),
+                [
+                    dict(
+                        student_id=2,
+                        theme_id=1,
+                        title=f"ДЗ {i}",
+                        text="",
+                        status="pending",
+                        **stamps,
+                    )
+                    for i in range(count)
+                ],
+            )
+        await session.commit()
+
+
+async def _missing_submissions() -> int:
+    async with session_maker() as session:
+        homeworks = await session.scalar(select(func.count(Homework.id)))
+        submissions = await session.scalar(select(func.count(HomeworkSubmission.id)))
+    return homeworks - submissions
+
+
+def test_homework_listing_does_not_write(postgres):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def scenario():
+        await _seed_legacy_homeworks(3)
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with session_maker() as session:
+                page = await HomeworkRepository.get_homeworks_with_filters(
+                    session, student_id=2
+                )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        return page, await _missing_submissions()
+
+    page, missing = postgres.run(scenario())
+
+    # Листинг отдаёт ДЗ без submission как есть, а не дописывает их на лету
+    assert [item["submission"] for item in page["items"]] == [None] * 3
+    assert missing == 3
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+def test_create_homework_stores_submission(postgres):
+    async def scenario():
+        await _seed_legacy_homeworks(0)
+        async with session_maker() as session:
+            homework = await HomeworkRepository.create_homework(
+                session, {"student_id": 2, "theme_id": 1, "title": "ДЗ", "text": ""}
+            )
+            page = await HomeworkRepository.get_homeworks_with_filters(session)
+        return homework.id, page
+
+    homework_id, page = postgres.run(scenario())
+
+    assert page["items"][0]["submission"]["homework_id"] == homework_id
+
+
+def test_repair_continues_past_short_batches(postgres, monkeypatch):
+    backfill = HomeworkRepository.backfill_missing_submissions
+    calls = []
+
+    async def short_first_batch(session, batch_size):
+        # Первая пачка неполная, как если бы часть строк вставил другой воркер
+        calls.append(batch_size)
+        size = batch_size - 1 if len(calls) == 1 else batch_size
+        return await backfill(session, size)
+
+    monkeypatch.setattr(
+        HomeworkRepository, "backfill_missing_submissions", short_first_batch
+    )
+
+    async def scenario():
+        await _seed_legacy_homeworks(7)
+        created = await repair.repair_homework_submissions(batch_size=3)
+        return created, await _missing_submissions()
+
+    created, missing = postgres.run(scenario())
+
+    assert (created, missing) == (7, 0)
+    assert len(calls) == 3
+
+
+def test_repair_is_idempotent(postgres):
+    async def scenario():
+        await _seed_legacy_homeworks(5)
+        first = await repair.repair_homework_submissions(batch_size=2)
+        second = await repair.repair_homework_submissions(batch_size=2)
+        return first, second, await _missing_submissions()
+
+    assert postgres.run(scenario()) == (5, 0, 0)
+
+
+def test_repair_logs_failures(postgres, monkeypatch, capsys):
+    async def broken(session, batch_size):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(HomeworkRepository, "backfill_missing_submissions", broken)
+
+    async def scenario():
+        await _seed_legacy_homeworks(2)
+        return await repair.repair_homework_submissions(batch_size=10)
+
+    assert postgres.run(scenario()) == 0
+    assert "connection lost" in capsys.readouterr().out
@@ -0,0 +1,181 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import themes as themes_api
+from database.engine import get_read_session
+from utils.auth import get_current_principal
+from utils.response_cache import (
+    MemoryBackend,
+    RedisBackend,
+    ResponseCache,
+    themes_tag,
+)
+
+
+class FakeRedis:
+    """Минимальный redis.asyncio: get/set/mget/incr в общем словаре"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.commands.append(key)
+
+    async def execute(self):
+        for key in self.commands:
+            value = int(self.redis.data.get(key, 0)) + 1
+            # Как и Redis, храним числа строками байтов
+            self.redis.data[key] = str(value).encode()
+        self.commands = []
+
+
+def _redis_backend(redis: FakeRedis) -> RedisBackend:
+    backend = RedisBackend.__new__(RedisBackend)
+    backend._redis = redis
+    backend._prefix = "response-cache:"
+    return backend
+
+
+def test_redis_invalidation_is_shared_between_workers():
+    redis = FakeRedis()
+    # Два воркера с общим Redis
+    first = ResponseCache(_redis_backend(redis))
+    second = ResponseCache(_redis_backend(redis))
+    loads = []
+
+    def loader(value):
+        async def load():
+            loads.append(value)
+            return {"value": value}
+
+        return load
+
+    async def scenario():
+        tags = [themes_tag(1)]
+        assert await first.get_or_load("k", tags, 60, loader("v1")) == {"value": "v1"}
+        # Запись из первого воркера видна второму
+        assert await second.get_or_load("k", tags, 60, loader("v2")) == {"value": "v1"}
+
+        await second.invalidate(themes_tag(1))
+        assert await first.get_or_load("k", tags, 60, loader("v3")) == {"value": "v3"}
+
+        # Инвалидация чужого тега запись не трогает
+        await first.invalidate(themes_tag(2))
+        assert await second.get_or_load("k", tags, 60, loader("v4")) == {"value": "v3"}
+
+    asyncio.run(scenario())
+
+    assert loads == ["v1", "v3"]
+    assert first.hits + second.hits == 2
+    assert redis.data["response-cache:tag:themes:1"] == b"1"
+
+
+@pytest.fixture
+def themes_client(monkeypatch):
+    """GET /themes/{course_id} с подменённой выборкой из БД"""
+    state = {"count": 2, "loads": 0}
+
+    async def load_entry(session, course_id, page):
+        state["loads"] += 1
+        items = [
+            {
+                "id": theme_id,
+                "course_id": course_id,
+                "name": f"Тема {theme_id}",
+                "text": "",
+                "is_homework": False,
+            }
+            for theme_id in range(1, state["count"] + 1)
+        ]
+        version = (state["count"], "2026-10-18T12:00:00")
+        return {"version": version, "page": {"items": items, "next_cursor": None}}
+
+    cache = ResponseCache(MemoryBackend(16))
+    monkeypatch.setattr(themes_api, "response_cache", cache)
+    monkeypatch.setattr(themes_api, "_load_themes_entry", load_entry)
+
+    app = FastAPI()
+    app.include_router(themes_api.themes_router, prefix="/themes")
+    app.dependency_overrides[get_read_session] = lambda: None
+    app.dependency_overrides[get_current_principal] = lambda: SimpleNamespace(id=1)
+    return TestClient(app), cache, state
+
+
+def test_themes_etag_follows_the_cached_body(themes_client):
+    client, cache, state = themes_client
+
+    first = client.get("/themes/1")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    # Строка добавлена в БД, но кеш ещё не инвалидирован: тело из кеша
+    # старое, значит и ETag прежний
+    state["count"] = 3
+    stale = client.get("/themes/1", headers={"If-None-Match": etag})
+    assert stale.status_code == 304
+    assert state["loads"] == 1
+
+    asyncio.run(cache.invalidate(themes_tag(1)))
+    fresh = client.get("/themes/1", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert len(fresh.json()["items"]) == 3
+    assert fresh.headers["ETag"] != etag
+    assert state["loads"] == 2
+
+
+def test_primary_reads_do_not_get_replica_entries():
+    cache = ResponseCache(MemoryBackend(16))
+    tags = [themes_tag(1)]
+
+    def loader(value):
+        async def load():
+            return {"value": value}
+
+        return load
+
+    async def scenario():
+        # После записи инвалидация прошла, но реплика ещё отстаёт и успела
+        # закешировать старые данные под новыми версиями тегов
+        await cache.invalidate(themes_tag(1))
+        stale = await cache.get_or_load("k", tags, 60, loader("old"), "replica")
+        # Прилипший к primary запрос читает сам, а не берёт запись с реплики
+        fresh = await cache.get_or_load("k", tags, 60, loader("new"), "primary")
+        cached = await cache.get_or_load("k", tags, 60, loader("x"), "primary")
+        return stale, fresh, cached
+
+    stale, fresh, cached = asyncio.run(scenario())
+
+    assert stale == {"value": "old"}
+    assert fresh == cached == {"value": "new"}
+    assert cache.hits == 1
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import httpx
+
+from database.engine import session_maker
+from database.models import Course, User
+from main import app
+from schemas.common import Page
+from schemas.user import UserResponse
+from utils.auth import create_access_token
+from utils.response_cache import COURSES_TAG, response_cache
+
+PUBLIC_USER_FIELDS = {"id", "email", "full_name", "is_teacher"}
+
+
+def _user(**fields) -> User:
+    now = datetime(2026, 10, 18, 12, 0)
+    defaults = dict(
+        id=1,
+        email="teacher@example.com",
+        full_name="Преподаватель",
+        hashed_password="$argon2id$secret",
+        is_teacher=True,
+        created=now,
+        updated=now,
+    )
+    return User(**{**defaults, **fields})
+
+
+def _client(token: str = "") -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        cookies={"access_token": token} if token else None,
+    )
+
+
+def test_auth_responses_exclude_password_hash(postgres):
+    async def scenario():
+        async with _client() as client:
+            registered = await client.post(
+                "/auth/register",
+                json={
+                    "email": "teacher@example.com",
+                    "password": "secret",
+                    "full_name": "Преподаватель",
+                    "is_teacher": True,
+                },
+            )
+        token = await create_access_token({"user_id": registered.json()["id"]})
+        async with _client(token) as client:
+            me = await client.get("/auth/me")
+        return registered, me
+
+    registered, me = postgres.run(scenario())
+
+    for response in (registered, me):
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/json"
+        assert set(response.json()) == PUBLIC_USER_FIELDS
+    assert me.json() == registered.json()
+
+
+def test_course_catalog_owner_excludes_password_hash(postgres):
+    async def scenario():
+        async with session_maker() as session:
+            teacher = _user(id=None)
+            session.add(teacher)
+            await session.flush()
+            session.add(Course(owner_id=teacher.id, name="Курс", description=""))
+            await session.commit()
+            token = await create_access_token({"user_id": teacher.id})
+        # Курс добавлен мимо API — сбрасываем кеш каталога, как это делает API
+        await response_cache.invalidate(COURSES_TAG)
+        async with _client(token) as client:
+            return await client.get("/courses/all")
+
+    response = postgres.run(scenario())
+
+    assert response.status_code == 200
+    [course] = response.json()["items"]
+    assert set(course["owner"]) == PUBLIC_USER_FIELDS
+    assert "hashed_password" not in response.text
+
+
+def test_page_of_users_validates_orm_objects():
+    page = Page[UserResponse].model_validate(
+        {"items": [_user(id=2), _user(id=3)], "next_cursor": None}
+    )
+
+    dumped = page.model_dump()
+    assert [item["id"] for item in dumped["items"]] == [2, 3]
+    assert "hashed_password" not in dumped["items"][0]
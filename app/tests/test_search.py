@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from repositories import search_repository
+from repositories.search_repository import SearchRepository, prefix_tsquery
+
+
+def _compile(expression):
+    compiled = expression.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_prefix_tsquery_matches_each_word_by_prefix():
+    sql, params = _compile(prefix_tsquery("Пит, КУРС!"))
+
+    assert sql.startswith("to_tsquery('russian'::regconfig")
+    assert list(params.values()) == ["пит:* & курс:*"]
+
+
+def test_prefix_tsquery_without_words():
+    # Спецсимволы tsquery в запрос не попадают
+    assert prefix_tsquery(" &|!():* ") is None
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Подменённые выборки: сколько строк вернёт каждый режим и с каким курсором"""
+    state = {"fts": [], "trgm": [], "calls": []}
+
+    def fake(mode):
+        async def page(session, scope, query, cursor, limit):
+            state["calls"].append((mode, cursor))
+            return {"items": state[mode], "next_cursor": "next" if state[mode] else None}
+
+        return page
+
+    monkeypatch.setattr(search_repository, "_fts_page", fake("fts"))
+    monkeypatch.setattr(search_repository, "_trigram_page", fake("trgm"))
+    monkeypatch.setattr(search_repository, "_item", lambda row, scope: row)
+    return state
+
+
+def test_search_falls_back_to_trigram_when_fts_finds_nothing(pages):
+    pages["trgm"] = ["питон"]
+
+    result = asyncio.run(SearchRepository.search(None, "питн"))
+
+    assert pages["calls"] == [("fts", None), ("trgm", None)]
+    assert result == {"items": ["питон"], "next_cursor": "trgm.next", "mode": "trgm"}
+
+
+def test_search_cursor_keeps_its_mode(pages):
+    pages["fts"] = ["python"]
+
+    result = asyncio.run(SearchRepository.search(None, "python"))
+    assert result["next_cursor"] == "fts.next"
+
+    pages["calls"].clear()
+    pages["fts"] = []
+    asyncio.run(SearchRepository.search(None, "python", cursor="fts.abc"))
+    # Пустая следующая страница FTS не переключает поиск на триграммы
+    assert pages["calls"] == [("fts", "abc")]
+
+    pages["calls"].clear()
+    asyncio.run(SearchRepository.search(None, "python", cursor="trgm.abc"))
+    assert pages["calls"] == [("trgm", "abc")]
+
+
+def test_search_rejects_cursor_with_unknown_mode(pages):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(SearchRepository.search(None, "python", cursor="sql.abc"))
+    assert error.value.status_code == 400
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import utils.auth as auth
+
+
+class SharedDenylist:
+    """Общее хранилище, как таблица revoked_tokens или Redis"""
+
+    def __init__(self):
+        self.items = {}
+
+    async def add(self, digest, expires_at):
+        self.items[digest] = expires_at
+
+    async def contains(self, digest):
+        return digest in self.items
+
+
+def test_revoked_token_is_rejected_even_when_cached(monkeypatch):
+    denylist = SharedDenylist()
+    monkeypatch.setattr(auth, "token_denylist", denylist)
+
+    async def scenario():
+        token = await auth.create_access_token({"user_id": 7})
+        assert (await auth.verify_token(token))["user_id"] == 7
+
+        # Отзыв в другом воркере: запись попадает только в общий список,
+        # локальный token_cache этого процесса о ней не знает
+        await denylist.add(auth._token_digest(token), auth._token_exp(token))
+        assert auth.token_cache.get(auth._token_digest(token)) is not None
+
+        assert await auth.verify_token(token) is None
+
+    asyncio.run(scenario())
+
+
+def test_revoke_token_writes_to_shared_denylist(monkeypatch):
+    denylist = SharedDenylist()
+    monkeypatch.setattr(auth, "token_denylist", denylist)
+
+    async def scenario():
+        token = await auth.create_access_token({"user_id": 8})
+        await auth.verify_token(token)
+        await auth.revoke_token(token)
+
+        assert auth._token_digest(token) in denylist.items
+        assert auth.token_cache.get(auth._token_digest(token)) is None
+        assert await auth.verify_token(token) is None
+
+    asyncio.run(scenario())
+
+
+def _count_statements(engine):
+    from sqlalchemy import event
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    return statements
+
+
+def test_db_denylist_checks_without_queries(postgres):
+    from database.engine import engine
+    from utils.token_denylist import DbDenylist
+
+    async def scenario():
+        denylist = DbDenylist()
+        await denylist.add(b"a" * 32, time.time() + 60)
+
+        statements = _count_statements(engine)
+        assert await denylist.contains(b"a" * 32)
+        assert not await denylist.contains(b"b" * 32)
+        assert statements == []
+
+    postgres.run(scenario())
+
+
+def test_db_denylist_refresh_sees_other_workers(postgres):
+    from utils.token_denylist import DbDenylist
+
+    async def scenario():
+        worker_a, worker_b = DbDenylist(), DbDenylist()
+        await worker_b.refresh()
+        await worker_a.add(b"a" * 32, time.time() + 60)
+
+        # До обновления копии второй воркер отзыва не видит
+        assert not await worker_b.contains(b"a" * 32)
+        await worker_b.refresh()
+        assert await worker_b.contains(b"a" * 32)
+
+    postgres.run(scenario())
+
+
+def test_db_denylist_sweep_removes_expired_rows(postgres):
+    from sqlalchemy import func, select
+
+    from database.engine import session_maker
+    from database.models import RevokedToken
+    from utils.token_denylist import DbDenylist
+
+    async def rows():
+        async with session_maker() as session:
+            return await session.scalar(select(func.count(RevokedToken.token_hash)))
+
+    async def scenario():
+        denylist = DbDenylist()
+        await denylist.add(b"a" * 32, time.time() - 1)
+        await denylist.add(b"b" * 32, time.time() + 60)
+        # add() больше не чистит таблицу — это делает периодическая очистка
+        assert await rows() == 2
+
+        await denylist.refresh()
+        assert await rows() == 1
+        assert not await denylist.contains(b"a" * 32)
+        assert await denylist.contains(b"b" * 32)
+
+    postgres.run(scenario())
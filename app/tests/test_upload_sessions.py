@@ -0,0 +1,103 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api import files as files_api
+from config import settings
+from database.engine import get_session
+from utils import upload_sessions
+from schemas.user import PrincipalSchema
+from utils.auth import get_current_principal
+from utils.upload_sessions import create_upload_session, load_session, remove_session
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def sessions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "SESSIONS_DIR", tmp_path)
+    monkeypatch.setattr(settings, "RESUMABLE_MAX_SESSIONS_PER_USER", 2)
+    return tmp_path
+
+
+def _create(user_id: int) -> dict:
+    return asyncio.run(create_upload_session(user_id, 1, "video.mp4", MB, 10 * MB))
+
+
+def test_open_sessions_are_capped_per_user():
+    first = _create(1)
+    _create(1)
+
+    with pytest.raises(HTTPException) as error:
+        _create(1)
+    assert error.value.status_code == 429
+
+    # Лимит у каждого пользователя свой
+    _create(2)
+
+    # Отменённая загрузка освобождает место
+    session = asyncio.run(load_session(first["upload_id"], 1))
+    asyncio.run(remove_session(session))
+    _create(1)
+
+
+def test_expired_sessions_do_not_count():
+    stale = _create(1)
+    _create(1)
+
+    data = upload_sessions.SESSIONS_DIR / "1" / stale["upload_id"] / "data"
+    old = time.time() - settings.RESUMABLE_SESSION_TTL - 1
+    os.utime(data, (old, old))
+
+    _create(1)
+
+
+def test_sessions_are_not_visible_to_other_users():
+    created = _create(1)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(load_session(created["upload_id"], 2))
+    assert error.value.status_code == 404
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def create_as(monkeypatch):
+    async def upload_target(db, theme_id, current_user):
+        return None, None, not current_user.is_teacher
+
+    monkeypatch.setattr(files_api, "_upload_target", upload_target)
+
+    def create(is_teacher: bool, size: int):
+        app = FastAPI()
+        app.include_router(files_api.files_router, prefix="/files")
+        app.dependency_overrides[get_session] = FakeSession
+        app.dependency_overrides[get_current_principal] = lambda: PrincipalSchema(
+            id=7, email="user@example.com", full_name="User", is_teacher=is_teacher
+        )
+        return TestClient(app).post(
+            "/files/theme/1/uploads", json={"filename": "video.mp4", "size": size}
+        )
+
+    return create
+
+
+def test_students_keep_the_upload_files_size_limit(create_as):
+    too_big = files_api.MAX_FILE_SIZE + 1
+
+    assert create_as(is_teacher=False, size=too_big).status_code == 413
+    assert create_as(is_teacher=False, size=MB).status_code == 201
+    # Преподавателю — отдельный лимит RESUMABLE_MAX_SIZE
+    assert create_as(is_teacher=True, size=too_big).status_code == 201
+    assert (
+        create_as(is_teacher=True, size=settings.RESUMABLE_MAX_SIZE + 1).status_code
+        == 413
+    )
@@ -0,0 +1,84 @@
+import httpx
+
+from database.engine import session_maker
+from database.models import User
+from main import app
+from utils import auth
+from utils.auth import create_access_token, user_cache
+
+
+def _client(token: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        cookies={"access_token": token},
+    )
+
+
+async def _create_user() -> int:
+    async with session_maker() as session:
+        user = User(
+            email="student@example.com",
+            full_name="Студент",
+            hashed_password="$argon2id$secret",
+            is_teacher=False,
+        )
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+def test_principal_is_cached_without_password_hash(postgres, monkeypatch):
+    user_cache.clear()
+    loads = []
+    load_user = auth.UserRepository.get_user_by_id
+
+    async def counting_load(session, user_id):
+        loads.append(user_id)
+        return await load_user(session, user_id)
+
+    monkeypatch.setattr(auth.UserRepository, "get_user_by_id", counting_load)
+
+    async def scenario():
+        user_id = await _create_user()
+        token = await create_access_token({"user_id": user_id})
+        hits, misses = user_cache.hits, user_cache.misses
+        async with _client(token) as client:
+            for _ in range(3):
+                response = await client.get("/auth/me")
+                assert response.status_code == 201
+                assert "hashed_password" not in response.json()
+        return user_id, user_cache.hits - hits, user_cache.misses - misses
+
+    user_id, hits, misses = postgres.run(scenario())
+
+    assert loads == [user_id]
+    assert (hits, misses) == (2, 1)
+    cached = user_cache.get(user_id)
+    assert cached.full_name == "Студент"
+    assert not hasattr(cached, "hashed_password")
+
+
+def test_cached_principal_is_invalidated_on_update_and_delete(postgres):
+    user_cache.clear()
+
+    async def scenario():
+        user_id = await _create_user()
+        token = await create_access_token({"user_id": user_id})
+        async with _client(token) as client:
+            assert (await client.get("/auth/me")).json()["full_name"] == "Студент"
+
+            async with session_maker() as session:
+                user = await session.get(User, user_id)
+                user.full_name = "Студентка"
+                await session.commit()
+            assert user_cache.get(user_id) is None
+            assert (await client.get("/auth/me")).json()["full_name"] == "Студентка"
+
+            async with session_maker() as session:
+                await session.delete(await session.get(User, user_id))
+                await session.commit()
+            assert user_cache.get(user_id) is None
+            assert (await client.get("/auth/me")).status_code == 401
+
+    postgres.run(scenario())
@@ -1,21 +1,37 @@
+import hashlib
+import time
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status, Request, Response
 from jose import jwt, JWTError
 
-from schemas.user import UserSchema, TokenSchema
+from schemas.user import UserSchema, TokenSchema, PrincipalSchema
+from utils.cache import TTLCache
 from utils.hashing import Hasher
+from utils.token_denylist import token_denylist
 from utils.time import get_moscow_time
 from repositories.user_repository import UserRepository
 from database.models import User
 from database.engine import SessionDep
 from config import settings
-from database.engine import get_session
+from database.engine import get_session, session_maker
 
 security = HTTPBearer(auto_error=False)
 
+# user_id -> PrincipalSchema (без хеша пароля); позволяет не ходить в БД
+# на каждый запрос
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+# sha256(token) -> payload; ttl каждой записи выставляется по exp токена
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
 
 async def create_access_token(data: Dict[str, Any]) -> str:
     expire = get_moscow_time() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -25,13 +41,44 @@ async def create_access_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _token_exp(token: str) -> float:
+    try:
+        return float(jwt.get_unverified_claims(token)["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+async def revoke_token(token: str) -> None:
+    digest = _token_digest(token)
+    await token_denylist.add(digest, _token_exp(token))
+    token_cache.pop(digest)
+
+
 async def verify_token(token: str) -> Optional[dict]:
+    digest = _token_digest(token)
+    # Отзыв проверяем раньше кеша, иначе разлогиненный токен продолжит работать.
+    # Список общий для воркеров; для "db" проверка идёт по копии в памяти
+    if await token_denylist.contains(digest):
+        return None
+
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
-        return payload
     except JWTError:
         return None
 
+    ttl = float(payload.get("exp", 0)) - time.time()
+    if ttl > 0:
+        token_cache.set(digest, payload, ttl=ttl)
+    return payload
+
 
 async def auth_user(
     email: str,
@@ -70,17 +117,38 @@ async def set_access_token_cookie(
     print("✅ Кука должна быть установлена")
 
 
-async def delete_access_token_cookie(response: Response) -> None:
+async def delete_access_token_cookie(
+    response: Response, token: Optional[str] = None
+) -> None:
+    if token:
+        await revoke_token(token)
+
     response.delete_cookie(
         key="access_token",
         path="/",
     )
 
 
-async def get_current_user(
-    request: Request,
-    session: AsyncSession = Depends(get_session),
-) -> User:
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_on_change(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
+def _principal(user: User) -> PrincipalSchema:
+    return PrincipalSchema.model_validate(user)
+
+
+async def _get_user_id_from_request(request: Request) -> int:
+    # Подзапрос /batch: пользователь уже определён родительским запросом
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal.id
+
     token = None
 
     token_from_cookie = await get_token_from_cookie(request)
@@ -111,6 +179,10 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
+    return user_id
+
+
+async def _load_user(session: AsyncSession, user_id: int) -> User:
     user: User = await UserRepository.get_user_by_id(session, user_id)
     if user is None:
         print("❌ Пользователь не найден")
@@ -119,5 +191,37 @@ async def get_current_user(
             detail="User not found",
         )
 
+    user_cache.set(user_id, _principal(user))
+    return user
+
+
+async def get_current_user(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """
+    ORM-объект пользователя, привязанный к сессии запроса, — только для роутов,
+    которые меняют пользователя или его связи. Всегда читается из БД.
+    """
+    user_id = await _get_user_id_from_request(request)
+    user = await _load_user(session, user_id)
+
     print(f"✅ Пользователь аутентифицирован: {user.email}")
     return user
+
+
+async def get_current_principal(request: Request) -> PrincipalSchema:
+    """Текущий пользователь без ORM-объекта — для роутов, которым нужны только id/is_teacher"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    user_id = await _get_user_id_from_request(request)
+
+    principal = user_cache.get(user_id)
+    if principal is None:
+        # Сессия нужна только на промахе кеша — на попадании соединение не берём
+        async with session_maker() as session:
+            principal = _principal(await _load_user(session, user_id))
+
+    return principal
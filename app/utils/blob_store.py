@@ -0,0 +1,76 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from repositories.blob_repository import BlobRepository
+from utils.disk_io import DiskIO
+from utils.multipart_upload import StoredFile
+
+# Содержимое загрузок хранится один раз на sha256:
+# uploads/blobs/ab/cd/abcd…, две ступени каталогов по 256 штук
+BLOB_DIR = Path("uploads") / "blobs"
+# Сюда пишутся принимаемые файлы; та же ФС, что и у BLOB_DIR, — os.replace атомарен
+STAGING_DIR = BLOB_DIR / "staging"
+STAGING_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def blob_path(sha256: str) -> Path:
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / sha256
+
+
+def hash_file(path: Path) -> Tuple[str, int]:
+    """(sha256, размер) файла; читает весь файл — вызывать через DiskIO"""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(settings.UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def _place(staged: Path, target: Path) -> None:
+    """Перенести принятый файл в хранилище или выбросить его, если blob уже есть"""
+    if target.exists():
+        staged.unlink(missing_ok=True)
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged, target)
+
+
+async def store_blobs(session: AsyncSession, stored_files: List[StoredFile]) -> None:
+    """
+    Положить принятые в STAGING_DIR файлы в хранилище и взять на них ссылки.
+    Одинаковое содержимое хранится один раз. Транзакцию фиксирует вызывающий;
+    если она откатится, новые файлы blob останутся без строк — их удаляет
+    сборка мусора (python -m utils.migrate_blobs).
+    """
+    await BlobRepository.lock(session, (stored.sha256 for stored in stored_files))
+    for stored in stored_files:
+        await BlobRepository.acquire(session, stored.sha256, stored.size)
+        await DiskIO.run(_place, stored.path, blob_path(stored.sha256))
+
+
+async def purge_blobs(session: AsyncSession, hashes: Iterable[str]) -> int:
+    """
+    Удалить blob без ссылок (строку и файл). Вызывается после commit
+    транзакции, снявшей ссылки (BlobRepository.release): если за это время
+    тот же файл загрузили снова, строка снова нужна и остаётся.
+    """
+    removed = 0
+    for sha256 in hashes:
+        try:
+            await BlobRepository.lock(session, [sha256])
+            if await BlobRepository.delete_if_unused(session, sha256):
+                await DiskIO.unlink(blob_path(sha256))
+                removed += 1
+            await session.commit()
+        except Exception as e:
+            # Ссылки уже сняты — blob дочистит сборка мусора
+            await session.rollback()
+            print(f"⚠️ Не удалось удалить blob {sha256}: {e}")
+    return removed
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional, Tuple
+
+import pytz
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MOSCOW_TZ = pytz.timezone("Europe/Moscow")
+
+
+async def table_version(
+    session: AsyncSession, model, *criteria
+) -> Tuple[int, Optional[datetime]]:
+    """
+    Версия выборки: (число строк, max(updated)).
+    Удаление меняет count, вставка и изменение — max(updated).
+    """
+    result = await session.execute(
+        select(func.count(), func.max(model.updated))
+        .select_from(model)
+        .where(*criteria)
+    )
+    count, last_updated = result.one()
+    return count, last_updated
+
+
+def make_etag(*parts: Any) -> str:
+    """Слабый ETag из версии данных"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    # Время в БД хранится наивным московским
+    if value.tzinfo is None:
+        value = MOSCOW_TZ.localize(value)
+    # usegmt требует именно datetime.timezone.utc, pytz.utc не подходит
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Слабое сравнение (RFC 9110): префикс W/ не учитывается
+    weak = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == weak for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    version: tuple,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Проставить ETag/Last-Modified и вернуть готовый 304, если копия клиента
+    актуальна — тогда тело ответа можно не строить.
+
+    В ETag входят путь и query (курсор, limit, флаги), поэтому страницы и
+    варианты ответа версионируются отдельно. Решение принимается только по
+    If-None-Match: max(updated) не меняется при удалении строк, так что
+    If-Modified-Since для списков ненадёжен.
+    """
+    etag = make_etag(request.url.path, request.url.query, *version)
+    headers = {
+        "ETag": etag,
+        # Ответы зависят от пользователя (cookie), хранить можно только в браузере
+        "Cache-Control": "private, no-cache",
+        "Vary": "Cookie",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
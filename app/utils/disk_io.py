@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from config import settings
+
+
+class DiskIO:
+    # Файловые операции загрузок выполняются в отдельном пуле потоков, чтобы
+    # не блокировать event loop. Размер пула ограничивает параллельную запись.
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_IO_WORKERS, thread_name_prefix="upload-io"
+            )
+        return cls._executor
+
+    @classmethod
+    async def run(cls, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            cls._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    @classmethod
+    async def makedirs(cls, path: Path) -> None:
+        await cls.run(path.mkdir, parents=True, exist_ok=True)
+
+    @classmethod
+    async def unlink(cls, path: Path) -> None:
+        await cls.run(path.unlink, missing_ok=True)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+
+
+def _write(file: BinaryIO, data: bytes, fsync: bool, hasher=None) -> None:
+    file.write(data)
+    # hashlib отпускает GIL на больших буферах — хешируем в том же потоке
+    if hasher is not None:
+        hasher.update(data)
+    if fsync:
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _close(file: BinaryIO, fsync: bool) -> None:
+    try:
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    finally:
+        file.close()
+
+
+class AsyncFileWriter:
+    """
+    Запись файла через пул DiskIO.
+    При выходе из блока с исключением недописанный файл удаляется.
+
+    atomic=True: данные пишутся во временный файл рядом с целевым и
+    переименовываются в path только после успешного закрытия.
+    hasher (например, hashlib.sha256()) обновляется в том же проходе.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: str = settings.UPLOAD_FSYNC,
+        atomic: bool = False,
+        hasher=None,
+    ):
+        self.path = path
+        self.fsync = fsync
+        self.hasher = hasher
+        self.size = 0
+        self._write_path = path.with_name(f".{path.name}.part") if atomic else path
+        self._file: Optional[BinaryIO] = None
+
+    async def __aenter__(self) -> "AsyncFileWriter":
+        self._file = await DiskIO.run(open, self._write_path, "wb")
+        return self
+
+    async def write(self, data: bytes) -> None:
+        await DiskIO.run(_write, self._file, data, self.fsync == "chunk", self.hasher)
+        self.size += len(data)
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            await DiskIO.run(
+                _close, self._file, exc_type is None and self.fsync == "close"
+            )
+        except BaseException:
+            await DiskIO.unlink(self._write_path)
+            raise
+
+        if exc_type is not None:
+            await DiskIO.unlink(self._write_path)
+        elif self._write_path != self.path:
+            await DiskIO.run(os.replace, self._write_path, self.path)
@@ -1,14 +1,65 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
+from config import settings
+
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 
+class HasherBusyError(Exception):
+    """Очередь на хеширование заполнена — запрос нужно отклонить сразу"""
+
+
+def _verify(input_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(input_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
 class Hasher:
-    @staticmethod
-    async def verify_password(input_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(input_password, hashed_password)
-    
-    @staticmethod
-    async def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
-    
\ No newline at end of file
+    # Argon2 выполняется в отдельном пуле, чтобы не блокировать event loop.
+    # Число одновременно принятых задач ограничено: workers + queue_size.
+    _executor: Optional[Executor] = None
+    _in_flight: int = 0
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        if cls._executor is None:
+            if settings.HASH_EXECUTOR == "process":
+                cls._executor = ProcessPoolExecutor(max_workers=settings.HASH_WORKERS)
+            else:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.HASH_WORKERS, thread_name_prefix="hasher"
+                )
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, func, *args):
+        if cls._in_flight >= settings.HASH_WORKERS + settings.HASH_QUEUE_SIZE:
+            raise HasherBusyError()
+
+        cls._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(cls._get_executor(), func, *args)
+        finally:
+            cls._in_flight -= 1
+
+    @classmethod
+    async def verify_password(cls, input_password: str, hashed_password: str) -> bool:
+        return await cls._run(_verify, input_password, hashed_password)
+
+    @classmethod
+    async def get_password_hash(cls, password: str) -> str:
+        return await cls._run(_hash, password)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import select, update
+
+from config import settings
+from database.engine import session_maker
+from database.models import File as ThemeFile
+from repositories.blob_repository import BlobRepository
+from utils.blob_store import (
+    BLOB_DIR,
+    STAGING_DIR,
+    blob_path,
+    hash_file,
+    purge_blobs,
+)
+from utils.disk_io import DiskIO
+from utils.upload_sessions import expire_sessions
+
+# Старые файлы назывались "<uuid4.hex>_<исходное имя>"
+LEGACY_PREFIX = re.compile(r"^[0-9a-f]{32}_")
+# Недописанные файлы из STAGING_DIR старше этого возраста считаются брошенными
+STAGING_MAX_AGE = 24 * 60 * 60
+
+
+def _link_into_store(source: Path, target: Path) -> None:
+    """Положить копию старого файла в хранилище, сам файл не трогая"""
+    if target.exists():
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staged = STAGING_DIR / f"{uuid.uuid4().hex}.part"
+    try:
+        # Жёсткая ссылка не копирует данные; если ФС не умеет — копируем
+        os.link(source, staged)
+    except OSError:
+        shutil.copyfile(source, staged)
+    os.replace(staged, target)
+
+
+async def migrate_files_to_blobs(
+    batch_size: int = settings.REPAIR_BATCH_SIZE,
+) -> dict:
+    """
+    Перенести файлы, загруженные до появления хранилища blobs: посчитать
+    sha256, положить содержимое в хранилище (одинаковые файлы — один раз)
+    и привязать к нему строку theme_files. Адреса скачивания не меняются.
+    Старые файлы удаляются только после commit своей пачки, поэтому прерванный
+    перенос можно просто запустить снова.
+    """
+    migrated = missing = 0
+    last_id = 0
+    while True:
+        async with session_maker() as session:
+            result = await session.execute(
+                select(ThemeFile.id, ThemeFile.file_path)
+                .where(ThemeFile.blob_sha256.is_(None), ThemeFile.id > last_id)
+                .order_by(ThemeFile.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            moved = []
+            for file_id, file_path in rows:
+                source = Path(file_path)
+                try:
+                    sha256, size = await DiskIO.run(hash_file, source)
+                except FileNotFoundError:
+                    missing += 1
+                    print(f"⚠️ Файл {file_path} (id={file_id}) не найден на диске")
+                    continue
+
+                await BlobRepository.lock(session, [sha256])
+                await BlobRepository.acquire(session, sha256, size)
+                await DiskIO.run(_link_into_store, source, blob_path(sha256))
+                await session.execute(
+                    update(ThemeFile)
+                    .where(ThemeFile.id == file_id)
+                    .values(
+                        blob_sha256=sha256,
+                        original_filename=LEGACY_PREFIX.sub("", source.name),
+                    )
+                )
+                moved.append(source)
+
+            await session.commit()
+
+        for source in moved:
+            await DiskIO.unlink(source)
+        migrated += len(moved)
+
+    if migrated or missing:
+        print(f"📦 Перенесено в хранилище blobs: {migrated}, не найдено: {missing}")
+    return {"migrated": migrated, "missing": missing}
+
+
+def _blob_files():
+    for path in BLOB_DIR.glob("??/??/*"):
+        if path.is_file():
+            yield path
+
+
+def _stale_staging_files():
+    deadline = time.time() - STAGING_MAX_AGE
+    for path in STAGING_DIR.iterdir():
+        if path.is_file() and path.stat().st_mtime < deadline:
+            yield path
+
+
+async def collect_garbage() -> dict:
+    """
+    Удалить blob без ссылок, файлы хранилища без строки в blobs (остаются
+    после откаченных загрузок), брошенные файлы в STAGING_DIR
+    и просроченные сессии докачиваемых загрузок.
+    """
+    await expire_sessions()
+    async with session_maker() as session:
+        purged = await purge_blobs(session, await BlobRepository.get_unused(session))
+
+        orphans = 0
+        for path in await DiskIO.run(lambda: list(_blob_files())):
+            if await BlobRepository.get_existing(session, [path.name]):
+                continue
+            # Под блокировкой: загрузка могла как раз положить этот файл
+            await BlobRepository.lock(session, [path.name])
+            if not await BlobRepository.get_existing(session, [path.name]):
+                await DiskIO.unlink(path)
+                orphans += 1
+            await session.commit()
+
+    stale = await DiskIO.run(lambda: list(_stale_staging_files()))
+    for path in stale:
+        await DiskIO.unlink(path)
+
+    if purged or orphans or stale:
+        print(
+            f"🧹 Удалено blob без ссылок: {purged}, файлов без строки: {orphans}, "
+            f"брошенных загрузок: {len(stale)}"
+        )
+    return {"purged": purged, "orphans": orphans, "stale": len(stale)}
+
+
+async def main() -> None:
+    await migrate_files_to_blobs()
+    await collect_garbage()
+    DiskIO.shutdown()
+
+
+if __name__ == "__main__":
+    # Ручной запуск: python -m utils.migrate_blobs
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from config import settings
+from utils.disk_io import AsyncFileWriter, DiskIO
+
+# Запас на заголовки частей и границы multipart сверх размера самих файлов
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+@dataclass
+class StoredFile:
+    filename: str
+    path: Path
+    size: int
+    sha256: str
+
+
+class _Events:
+    """Колбэки парсера складывают события в список, разбираем их асинхронно"""
+
+    def __init__(self):
+        self.items: List[Tuple[str, bytes]] = []
+
+    def callbacks(self) -> dict:
+        def data_event(name):
+            def callback(data: bytes, start: int, end: int) -> None:
+                self.items.append((name, data[start:end]))
+
+            return callback
+
+        def empty_event(name):
+            def callback() -> None:
+                self.items.append((name, b""))
+
+            return callback
+
+        return {
+            "on_part_begin": empty_event("part_begin"),
+            "on_header_field": data_event("header_field"),
+            "on_header_value": data_event("header_value"),
+            "on_header_end": empty_event("header_end"),
+            "on_headers_finished": empty_event("headers_finished"),
+            "on_part_data": data_event("part_data"),
+            "on_part_end": empty_event("part_end"),
+        }
+
+    def drain(self) -> List[Tuple[str, bytes]]:
+        items, self.items = self.items, []
+        return items
+
+
+def _boundary(request: Request) -> bytes:
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected multipart/form-data",
+        )
+    return boundary
+
+
+def check_content_length(request: Request, max_body_size: int) -> None:
+    """Отклонить заведомо слишком большое тело до чтения"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_body_size + MULTIPART_OVERHEAD:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Request body is too large",
+            )
+
+
+async def receive_files(
+    request: Request,
+    dest_dir: Path,
+    field_name: str = "files",
+    max_file_size: int = 100 * 1024 * 1024,
+    max_files: int = 10,
+) -> List[StoredFile]:
+    """
+    Разобрать multipart-тело потоком и записать файлы поля field_name сразу
+    в dest_dir (временное имя + атомарное переименование), считая размер и
+    sha256 в том же проходе. Без промежуточного SpooledTemporaryFile.
+    Данные части копятся до UPLOAD_CHUNK_SIZE и пишутся крупными кусками,
+    а не по одному вызову пула на каждый фрагмент сети.
+
+    При любой ошибке уже записанные файлы этого запроса удаляются.
+    """
+    events = _Events()
+    parser = MultipartParser(_boundary(request), events.callbacks())
+
+    stored: List[StoredFile] = []
+    header_field = b""
+    headers = {}
+    writer: Optional[AsyncFileWriter] = None
+    buffer = bytearray()
+    filename = None
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Malformed multipart body")
+
+            for event, data in events.drain():
+                if event == "part_begin":
+                    headers = {}
+                    header_field = b""
+                elif event == "header_field":
+                    header_field += data
+                elif event == "header_value":
+                    name = header_field.lower()
+                    headers[name] = headers.get(name, b"") + data
+                elif event == "header_end":
+                    header_field = b""
+                elif event == "headers_finished":
+                    _, disposition = parse_options_header(
+                        headers.get(b"content-disposition")
+                    )
+                    part_name = disposition.get(b"name", b"").decode()
+                    part_filename = disposition.get(b"filename")
+                    # Прочие поля формы не нужны — их данные пропускаем
+                    if part_name != field_name or part_filename is None:
+                        continue
+                    if len(stored) >= max_files:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Too many files (max {max_files})",
+                        )
+                    # Только имя, без каталогов из клиента
+                    filename = Path(part_filename.decode(errors="replace")).name
+                    new_writer = AsyncFileWriter(
+                        dest_dir / f"{uuid.uuid4().hex}_{filename}",
+                        atomic=True,
+                        hasher=hashlib.sha256(),
+                    )
+                    await new_writer.__aenter__()
+                    writer = new_writer
+                    buffer = bytearray()
+                elif event == "part_data" and writer is not None:
+                    if writer.size + len(buffer) + len(data) > max_file_size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File {filename} exceeds "
+                            f"{max_file_size // (1024 * 1024)} MB limit",
+                        )
+                    buffer += data
+                    if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                        await writer.write(buffer)
+                        buffer = bytearray()
+                elif event == "part_end" and writer is not None:
+                    if buffer:
+                        await writer.write(buffer)
+                        buffer = bytearray()
+                    current, writer = writer, None
+                    await current.__aexit__(None, None, None)
+                    stored.append(
+                        StoredFile(
+                            filename=filename,
+                            path=current.path,
+                            size=current.size,
+                            sha256=current.hasher.hexdigest(),
+                        )
+                    )
+        parser.finalize()
+    except BaseException as e:
+        if writer is not None:
+            await writer.__aexit__(type(e), e, e.__traceback__)
+        for stored_file in stored:
+            await DiskIO.unlink(stored_file.path)
+        raise
+
+    if writer is not None:
+        # Тело оборвалось посреди файла
+        await writer.__aexit__(HTTPException, None, None)
+        for stored_file in stored:
+            await DiskIO.unlink(stored_file.path)
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+
+    return stored
@@ -0,0 +1,83 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from config import settings
+
+
+class PageParams:
+    """Параметры keyset-пагинации: непрозрачный курсор и размер страницы"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None),
+        limit: int = Query(
+            settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(sort_value: Any, last_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, last_id], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column: InstrumentedAttribute) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, last_id = json.loads(raw)
+        if sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def keyset(
+    query: Select,
+    id_column: InstrumentedAttribute,
+    cursor: Optional[str],
+    limit: int,
+    sort_column: Optional[InstrumentedAttribute] = None,
+) -> Select:
+    """
+    Добавить к запросу условие (sort_key, id) > курсора, сортировку и limit.
+    Берётся на одну строку больше, чтобы понять, есть ли следующая страница.
+    """
+    sort_column = sort_column if sort_column is not None else id_column
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_column)
+        if sort_column is id_column:
+            query = query.where(id_column > last_id)
+        else:
+            query = query.where(
+                tuple_(sort_column, id_column) > tuple_(sort_value, last_id)
+            )
+
+    if sort_column is id_column:
+        query = query.order_by(id_column)
+    else:
+        query = query.order_by(sort_column, id_column)
+    return query.limit(limit + 1)
+
+
+def build_page(
+    items: Sequence[Any], limit: int, key: Callable[[Any], Tuple[Any, int]]
+) -> dict:
+    """Конверт страницы: items и next_cursor (None на последней странице)"""
+    has_more = len(items) > limit
+    items = list(items[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from database.engine import session_maker
+from repositories.progress_repository import ProgressRepository
+
+
+class ProgressBuffer:
+    """
+    Буфер событий "тема пройдена" с отложенной пакетной записью в theme_progress.
+    События дедуплицируются по (user_id, theme_id) и сбрасываются upsert'ом
+    раз в flush_interval или при накоплении max_events.
+    """
+
+    def __init__(self, flush_interval: float, max_events: int, spill_path: Path):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.spill_path = spill_path
+
+        self._events: Dict[Tuple[int, int], datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.accepted = 0
+        self.deduplicated = 0
+        self.flushed = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def add(self, user_id: int, theme_id: int) -> None:
+        key = (user_id, theme_id)
+        if key in self._events:
+            self.deduplicated += 1
+        self._events[key] = datetime.now()
+        self.accepted += 1
+
+        if len(self._events) >= self.max_events:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._load_spill()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, attempts: int = 3) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for _ in range(attempts):
+            if not self._events:
+                return
+            await self.flush()
+
+        # БД недоступна: сохраняем события на диск, они применятся при следующем старте
+        self._write_spill()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._events:
+                batch = dict(list(self._events.items())[: self.max_events])
+                for key in batch:
+                    del self._events[key]
+
+                start = time.perf_counter()
+                try:
+                    async with session_maker() as session:
+                        await ProgressRepository.mark_completed_batch(session, batch)
+                        await session.commit()
+                except Exception as e:
+                    self.flush_errors += 1
+                    print(f"❌ Не удалось записать прогресс ({len(batch)} событий): {e}")
+                    # Возвращаем события в буфер, не затирая более свежие
+                    for key, completed_at in batch.items():
+                        self._events.setdefault(key, completed_at)
+                    return
+
+                latency = time.perf_counter() - start
+                self.flushed += len(batch)
+                self.flush_count += 1
+                self.last_flush_latency = latency
+                self.total_flush_latency += latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+
+    def _write_spill(self) -> None:
+        with self.spill_path.open("a", encoding="utf-8") as out:
+            for (user_id, theme_id), completed_at in self._events.items():
+                out.write(
+                    json.dumps(
+                        {
+                            "user_id": user_id,
+                            "theme_id": theme_id,
+                            "completed_at": completed_at.isoformat(),
+                        }
+                    )
+                    + "\n"
+                )
+        print(f"⚠️ {len(self._events)} событий прогресса сохранены в {self.spill_path}")
+        self._events.clear()
+
+    def _load_spill(self) -> None:
+        if not self.spill_path.exists():
+            return
+
+        with self.spill_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                key = (event["user_id"], event["theme_id"])
+                self._events.setdefault(
+                    key, datetime.fromisoformat(event["completed_at"])
+                )
+        self.spill_path.unlink()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.PROGRESS_WRITE_BEHIND,
+            "depth": len(self._events),
+            "accepted": self.accepted,
+            "deduplicated": self.deduplicated,
+            "flushed": self.flushed,
+            "flush_count": self.flush_count,
+            "flush_errors": self.flush_errors,
+            "last_flush_latency": self.last_flush_latency,
+            "avg_flush_latency": (
+                self.total_flush_latency / self.flush_count if self.flush_count else 0.0
+            ),
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+
+progress_buffer = ProgressBuffer(
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_MS / 1000,
+    max_events=settings.PROGRESS_FLUSH_MAX_EVENTS,
+    spill_path=Path(settings.PROGRESS_SPILL_PATH),
+)
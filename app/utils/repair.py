@@ -0,0 +1,37 @@
+import asyncio
+
+from config import settings
+from database.engine import session_maker
+from repositories.homework_repository import HomeworkRepository
+
+
+async def repair_homework_submissions(
+    batch_size: int = settings.REPAIR_BATCH_SIZE,
+) -> int:
+    """
+    Дозаполнить homework_submissions для ДЗ, созданных до того, как submission
+    стала создаваться вместе с ДЗ. Каждая пачка — отдельная короткая транзакция.
+    """
+    total = 0
+    try:
+        while True:
+            async with session_maker() as session:
+                # Идём до конца, а не до неполной пачки: параллельный воркер
+                # может вставить часть строк, и пачка выйдет меньше batch_size
+                if not await HomeworkRepository.has_missing_submissions(session):
+                    break
+                total += await HomeworkRepository.backfill_missing_submissions(
+                    session, batch_size
+                )
+    except Exception as e:
+        # Задача запущена в фоне: без этого ошибка пропала бы молча
+        print(f"❌ Не удалось дозаполнить submission (создано {total}): {e}")
+        return total
+
+    if total:
+        print(f"🔧 Создано недостающих submission: {total}")
+    return total
+
+if __name__ == "__main__":
+    # Ручной запуск: python -m utils.repair
+    asyncio.run(repair_homework_submissions())
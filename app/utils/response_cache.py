@@ -0,0 +1,213 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import orjson
+
+from utils.cache import TTLCache
+from utils.single_flight import single_flight
+from config import settings
+
+
+class MemoryBackend:
+    """
+    LRU в памяти процесса. У каждого воркера свои записи и версии тегов,
+    поэтому годится только при одном воркере — иначе нужен RedisBackend.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=60)
+        self._tag_versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def tag_versions(self, tags: List[str]) -> List[int]:
+        return [self._tag_versions.get(tag, 0) for tag in tags]
+
+    async def bump_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "tags": len(self._tag_versions)}
+
+
+class RedisBackend:
+    """Общий для всех воркеров кеш в Redis (или любом сервере с его протоколом)"""
+
+    def __init__(self, url: str, prefix: str = "response-cache:"):
+        # Необязательная зависимость: нужна только при RESPONSE_CACHE_BACKEND=redis
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(self._prefix + key, value, px=int(ttl * 1000))
+
+    async def tag_versions(self, tags: List[str]) -> List[int]:
+        keys = [self._prefix + "tag:" + tag for tag in tags]
+        values = await self._redis.mget(keys)
+        return [int(value or 0) for value in values]
+
+    async def bump_tags(self, tags: Iterable[str]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(self._prefix + "tag:" + tag)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class ResponseCache:
+    """
+    Кеш готовых к сериализации ответов с инвалидацией по тегам.
+
+    Ключ записи включает текущие версии её тегов, а инвалидация просто
+    увеличивает версию тега: старые записи больше не находятся и вытесняются
+    по LRU/TTL. Чтение, начавшееся до инвалидации, сохранит результат под
+    старыми версиями — устаревший ответ в кеш не попадёт. Чтение с отстающей
+    реплики после инвалидации всё же может закешировать старые данные —
+    это окно ограничено TTL маршрута, а запросы, прилипшие к primary,
+    его не видят: их записи хранятся отдельно.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def _versioned_key(self, key: str, tags: List[str], read_target: str) -> str:
+        versions = await self.backend.tag_versions(tags)
+        return f"{key}|{read_target}|" + ",".join(
+            f"{tag}={version}" for tag, version in zip(tags, versions)
+        )
+
+    async def _load(self, loader: Callable[[], Awaitable[Any]]) -> bytes:
+        return orjson.dumps(await loader())
+
+    async def _load_and_store(
+        self, key: str, ttl: float, loader: Callable[[], Awaitable[Any]]
+    ) -> bytes:
+        data = await self._load(loader)
+        try:
+            await self.backend.set(key, data, ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Не удалось записать в кеш ответов: {e}")
+        return data
+
+    async def get_or_load(
+        self,
+        key: str,
+        tags: List[str],
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        read_target: str = "primary",
+    ) -> Any:
+        """
+        Вернуть закешированное значение или вызвать loader и сохранить результат.
+        Одновременные промахи по одному ключу склеиваются в один вызов loader.
+        Значение хранится в JSON, поэтому datetime возвращается строкой ISO 8601.
+        Исключения loader'а (например, 404) не кешируются.
+
+        read_target — откуда читает loader ("replica"/"primary"). Он входит
+        в ключ записи: запрос, прилипший к primary после записи, не получит
+        ни закешированный, ни ещё загружаемый ответ, прочитанный с реплики.
+        """
+        if self.backend is None:
+            data = await single_flight.do(
+                (read_target, key), lambda: self._load(loader)
+            )
+            return orjson.loads(data)
+
+        try:
+            versioned_key = await self._versioned_key(key, tags, read_target)
+            cached = await self.backend.get(versioned_key)
+        except Exception as e:
+            # Недоступный кеш не должен ломать чтение — идём в БД
+            self.errors += 1
+            print(f"⚠️ Кеш ответов недоступен: {e}")
+            data = await single_flight.do(
+                (read_target, key), lambda: self._load(loader)
+            )
+            return orjson.loads(data)
+
+        if cached is not None:
+            self.hits += 1
+            return orjson.loads(cached)
+
+        self.misses += 1
+        # В кеш пишет только ведущий запрос; значение общее, но каждому — своя копия
+        data = await single_flight.do(
+            (read_target, versioned_key),
+            lambda: self._load_and_store(versioned_key, ttl, loader),
+        )
+        return orjson.loads(data)
+
+    async def invalidate(self, *tags: str) -> None:
+        if self.backend is None or not tags:
+            return
+        try:
+            await self.backend.bump_tags(tags)
+        except Exception as e:
+            # Записи доживут до своего TTL
+            self.errors += 1
+            print(f"❌ Не удалось инвалидировать кеш ответов {tags}: {e}")
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.backend is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            **(self.backend.stats() if self.backend is not None else {}),
+        }
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_SIZE)
+    return None
+
+
+response_cache = ResponseCache(_create_backend())
+
+
+def cache_key(request, scope: str = "public") -> str:
+    """
+    Ключ ответа: область видимости + путь + query.
+    scope="public" — ответ одинаков для всех пользователей.
+    """
+    return f"{scope}:{request.url.path}?{request.url.query}"
+
+
+# Теги
+COURSES_TAG = "courses"
+
+
+def course_tag(course_id: int) -> str:
+    return f"course:{course_id}"
+
+
+def themes_tag(course_id: int) -> str:
+    return f"themes:{course_id}"
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    """
+    Склейка одинаковых конкурентных чтений: пока запрос с ключом выполняется,
+    остальные вызовы с тем же ключом ждут его результат (или исключение).
+
+    Ключ должен включать маршрут, параметры и область видимости ответа —
+    результат делится между всеми, кто пришёл с этим ключом.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                # shield: отмена ожидающего не должна отменять общий результат
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # Ведущий запрос отменён (клиент ушёл) — выполняем сами
+                return await fn()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+            # Исключение без ожидающих не должно попадать в лог asyncio
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,48 @@
+import orjson
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def get_stream_format(
+    request: Request,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+) -> Optional[str]:
+    """
+    Режим стриминга ответа: ?stream=ndjson|json или Accept: application/x-ndjson.
+    None — обычный (постраничный) ответ.
+    """
+    if stream:
+        return stream
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    return None
+
+
+def _dumps(item: Any) -> bytes:
+    # orjson сам сериализует datetime и отдаёт UTF-8 байты
+    return orjson.dumps(item)
+
+
+async def _ndjson(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    async for item in items:
+        yield _dumps(item) + b"\n"
+
+
+async def _json_array(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    yield b"["
+    first = True
+    async for item in items:
+        yield _dumps(item) if first else b"," + _dumps(item)
+        first = False
+    yield b"]"
+
+
+def stream_response(items: AsyncIterator[Any], stream_format: str) -> StreamingResponse:
+    """Отдать элементы клиенту по мере чтения из БД, не собирая список в памяти"""
+    if stream_format == "ndjson":
+        return StreamingResponse(_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_json_array(items), media_type="application/json")
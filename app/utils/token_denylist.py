@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from config import settings
+from database.engine import session_maker
+from database.models import RevokedToken
+from utils.time import get_moscow_time
+
+
+class DbDenylist:
+    """
+    Отозванные токены в таблице revoked_tokens — общей для всех воркеров.
+
+    Проверка идёт по копии в памяти процесса, без запроса в БД на каждый
+    запрос: отзыв в своём воркере виден сразу, в остальных — после очередного
+    обновления копии (TOKEN_DENYLIST_REFRESH_SECONDS). Копия небольшая:
+    строки живут только до exp своих токенов.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[bytes, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_sweep = 0.0
+
+    async def add(self, digest: bytes, expires_at: float) -> None:
+        self._revoked[digest] = expires_at
+        now = get_moscow_time()
+        async with session_maker() as session:
+            await session.execute(
+                insert(RevokedToken)
+                .values(
+                    token_hash=digest, expires_at=expires_at, created=now, updated=now
+                )
+                .on_conflict_do_nothing(index_elements=["token_hash"])
+            )
+            await session.commit()
+
+    async def contains(self, digest: bytes) -> bool:
+        expires_at = self._revoked.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    async def refresh(self) -> None:
+        """Перечитать действующие отзывы из БД; изредка — удалить истёкшие"""
+        now = time.time()
+        async with session_maker() as session:
+            if now - self._last_sweep > settings.TOKEN_DENYLIST_SWEEP_SECONDS:
+                await session.execute(
+                    delete(RevokedToken).where(RevokedToken.expires_at <= now)
+                )
+                await session.commit()
+                self._last_sweep = now
+            result = await session.execute(
+                select(RevokedToken.token_hash, RevokedToken.expires_at).where(
+                    RevokedToken.expires_at > now
+                )
+            )
+            revoked = {bytes(digest): exp for digest, exp in result.all()}
+        # Отзывы этого воркера, сделанные во время чтения, не теряем
+        for digest, exp in self._revoked.items():
+            if exp > now:
+                revoked.setdefault(digest, exp)
+        self._revoked = revoked
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TOKEN_DENYLIST_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Остаётся прежняя копия; следующая попытка — через интервал
+                print(f"❌ Не удалось обновить список отозванных токенов: {e}")
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class RedisDenylist:
+    """Отозванные токены в Redis: ключ живёт до exp токена"""
+
+    def __init__(self, url: str, prefix: str = "revoked-token:"):
+        # Необязательная зависимость: нужна только при TOKEN_DENYLIST_BACKEND=redis
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    async def add(self, digest: bytes, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms > 0:
+            await self._redis.set(self._prefix + digest.hex(), b"1", px=ttl_ms)
+
+    async def contains(self, digest: bytes) -> bool:
+        return bool(await self._redis.exists(self._prefix + digest.hex()))
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _create_denylist():
+    if settings.TOKEN_DENYLIST_BACKEND == "redis":
+        return RedisDenylist(settings.REDIS_URL)
+    return DbDenylist()
+
+
+token_denylist = _create_denylist()
@@ -0,0 +1,321 @@
+import fcntl
+import os
+import re
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
+
+import orjson
+from fastapi import HTTPException, Request, status
+
+from config import settings
+from utils.blob_store import BLOB_DIR, STAGING_DIR, hash_file
+from utils.disk_io import DiskIO
+from utils.multipart_upload import StoredFile
+from utils.time import get_moscow_time
+
+# Незавершённые докачиваемые загрузки: uploads/blobs/sessions/<user_id>/<upload_id>/
+#   meta.json — кто, куда и что загружает
+#   data      — файл полного размера, куски пишутся в него по своим смещениям
+#   ranges/   — по пустому файлу "<начало>-<конец>" на каждый записанный кусок
+# Всё состояние на диске, поэтому куски одной загрузки можно слать параллельно
+# и в разные воркеры (при общем каталоге uploads). Файл <user_id>/.lock
+# сериализует подсчёт и создание сессий пользователя между воркерами.
+SESSIONS_DIR = BLOB_DIR / "sessions"
+SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+# Просроченные сессии чистятся попутно при создании новых, не чаще раза в столько
+SWEEP_INTERVAL = 10 * 60
+_last_sweep = 0.0
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    user_id: int
+    theme_id: int
+    filename: str
+    size: int
+
+    @property
+    def dir(self) -> Path:
+        return SESSIONS_DIR / str(self.user_id) / self.upload_id
+
+    @property
+    def data_path(self) -> Path:
+        return self.dir / "data"
+
+    @property
+    def ranges_dir(self) -> Path:
+        return self.dir / "ranges"
+
+
+def _create(session: UploadSession) -> None:
+    session.ranges_dir.mkdir(parents=True)
+    with open(session.data_path, "wb") as file:
+        # Разреженный файл: место на диске занимают только записанные куски
+        file.truncate(session.size)
+    # meta.json последним — без него сессия считается несуществующей
+    (session.dir / "meta.json").write_bytes(orjson.dumps(asdict(session)))
+
+
+def _create_limited(session: UploadSession, limit: int) -> bool:
+    """Создать сессию, если у пользователя меньше limit активных; иначе False"""
+    user_dir = session.dir.parent
+    user_dir.mkdir(parents=True, exist_ok=True)
+    with open(user_dir / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if _count_active(user_dir) >= limit:
+            return False
+        _create(session)
+        return True
+
+
+def _load(user_id: int, upload_id: str) -> Optional[UploadSession]:
+    try:
+        meta = (SESSIONS_DIR / str(user_id) / upload_id / "meta.json").read_bytes()
+    except FileNotFoundError:
+        return None
+    return UploadSession(**orjson.loads(meta))
+
+
+def _last_activity(path: Path) -> float:
+    # mtime файла data меняется с каждым записанным куском
+    try:
+        return (path / "data").stat().st_mtime
+    except FileNotFoundError:
+        return path.stat().st_mtime
+
+
+def _is_expired(path: Path) -> bool:
+    return time.time() - _last_activity(path) > settings.RESUMABLE_SESSION_TTL
+
+
+def _count_active(user_dir: Path) -> int:
+    active = 0
+    for path in user_dir.iterdir():
+        try:
+            if path.is_dir() and not _is_expired(path):
+                active += 1
+        except FileNotFoundError:
+            continue
+    return active
+
+
+def _received_ranges(session: UploadSession) -> List[List[int]]:
+    """Записанные диапазоны [начало, конец), слитые и отсортированные"""
+    ranges = sorted(
+        [int(start), int(end)]
+        for start, end in (
+            marker.name.split("-") for marker in session.ranges_dir.iterdir()
+        )
+    )
+    merged: List[List[int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _status(session: UploadSession) -> dict:
+    ranges = _received_ranges(session)
+    remaining = _last_activity(session.dir) + settings.RESUMABLE_SESSION_TTL
+    return {
+        "upload_id": session.upload_id,
+        "theme_id": session.theme_id,
+        "filename": session.filename,
+        "size": session.size,
+        # Докачка продолжается с offset; при параллельной отправке пропуски
+        # дальше offset видны по ranges
+        "offset": ranges[0][1] if ranges and ranges[0][0] == 0 else 0,
+        "ranges": ranges,
+        "expires_at": get_moscow_time() + timedelta(seconds=remaining - time.time()),
+    }
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _close(fd: int, fsync: bool) -> None:
+    try:
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sweep_expired() -> int:
+    removed = 0
+    for user_dir in SESSIONS_DIR.iterdir():
+        if not user_dir.is_dir():
+            continue
+        for path in user_dir.iterdir():
+            try:
+                if path.is_dir() and _is_expired(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                # Сессию только что завершили или удалили
+                continue
+    return removed
+
+
+async def expire_sessions() -> int:
+    """Удалить сессии без новых кусков дольше RESUMABLE_SESSION_TTL"""
+    global _last_sweep
+    _last_sweep = time.time()
+    removed = await DiskIO.run(_sweep_expired)
+    if removed:
+        print(f"🧹 Удалено просроченных сессий загрузки: {removed}")
+    return removed
+
+
+async def create_upload_session(
+    user_id: int, theme_id: int, filename: str, size: int, max_size: int
+) -> dict:
+    if size > max_size:
+        limit_mb = max_size // (1024 * 1024)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {limit_mb} MB limit",
+        )
+    # Только имя, без каталогов из клиента
+    filename = Path(filename).name
+    if not filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+
+    if time.time() - _last_sweep > SWEEP_INTERVAL:
+        await expire_sessions()
+
+    session = UploadSession(
+        upload_id=uuid.uuid4().hex,
+        user_id=user_id,
+        theme_id=theme_id,
+        filename=filename,
+        size=size,
+    )
+    created = await DiskIO.run(
+        _create_limited, session, settings.RESUMABLE_MAX_SESSIONS_PER_USER
+    )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many unfinished uploads; complete or abort one first",
+        )
+    return await DiskIO.run(_status, session)
+
+
+async def load_session(upload_id: str, user_id: int) -> UploadSession:
+    """Сессия текущего пользователя или 404 (чужие не отличить от отсутствующих)"""
+    session = None
+    if _UPLOAD_ID.match(upload_id):
+        session = await DiskIO.run(_load, user_id, upload_id)
+    if (
+        session is None
+        or session.user_id != user_id
+        or await DiskIO.run(_is_expired, session.dir)
+    ):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+async def get_status(session: UploadSession) -> dict:
+    try:
+        return await DiskIO.run(_status, session)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+
+async def write_chunk(session: UploadSession, offset: int, request: Request) -> dict:
+    """
+    Записать тело запроса в файл сессии начиная с offset. Куски могут идти
+    параллельно и в любом порядке; повторная отправка куска безопасна.
+    Если соединение оборвалось, записанная часть куска засчитывается.
+    """
+    content_length = request.headers.get("content-length")
+    length = int(content_length) if content_length and content_length.isdigit() else 0
+    if offset < 0 or offset + length > session.size:
+        raise HTTPException(
+            status_code=416,
+            detail="Chunk is outside of the file",
+        )
+    if length > settings.RESUMABLE_CHUNK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk is too large",
+        )
+
+    try:
+        fd = await DiskIO.run(os.open, session.data_path, os.O_WRONLY)
+    except FileNotFoundError:
+        # Сессию завершили или удалили параллельно
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    position = offset
+    try:
+        async for data in request.stream():
+            if not data:
+                continue
+            if (
+                position + len(data) > session.size
+                or position + len(data) - offset > settings.RESUMABLE_CHUNK_MAX_SIZE
+            ):
+                raise HTTPException(
+                    status_code=416,
+                    detail="Chunk is outside of the file",
+                )
+            await DiskIO.run(_pwrite_all, fd, data, position)
+            position += len(data)
+    finally:
+        await DiskIO.run(_close, fd, settings.UPLOAD_FSYNC != "none")
+        if position > offset:
+            marker = session.ranges_dir / f"{offset}-{position}"
+            try:
+                await DiskIO.run(marker.touch)
+            except FileNotFoundError:
+                pass
+
+    return await get_status(session)
+
+
+async def claim_completed(session: UploadSession) -> StoredFile:
+    """
+    Забрать полностью загруженный файл из сессии в STAGING_DIR и удалить
+    сессию. Из параллельных завершений одной загрузки файл получит одно.
+    """
+    progress = await get_status(session)
+    if progress["ranges"] != [[0, session.size]]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is incomplete",
+        )
+
+    staged = STAGING_DIR / f"{uuid.uuid4().hex}.part"
+    try:
+        await DiskIO.run(os.replace, session.data_path, staged)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    await remove_session(session)
+
+    try:
+        sha256, size = await DiskIO.run(hash_file, staged)
+    except BaseException:
+        await DiskIO.unlink(staged)
+        raise
+    return StoredFile(filename=session.filename, path=staged, size=size, sha256=sha256)
+
+
+async def remove_session(session: UploadSession) -> None:
+    await DiskIO.run(shutil.rmtree, session.dir, ignore_errors=True)
@@ -30,6 +30,20 @@ async function apiFetch(path, options = {}) {
     return data;
 }
 
+// Загрузить все страницы списка ({ items, next_cursor })
+async function apiFetchAll(path) {
+    const items = [];
+    let cursor = null;
+    do {
+        const sep = path.includes("?") ? "&" : "?";
+        const url = cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path;
+        const page = await apiFetch(url);
+        items.push(...(page.items || []));
+        cursor = page.next_cursor;
+    } while (cursor);
+    return items;
+}
+
 // Инициализация после загрузки DOM
 document.addEventListener("DOMContentLoaded", () => {
     init();
@@ -162,7 +176,7 @@ async function init() {
 
         try {
             // Получаем все курсы
-            allCoursesList = await apiFetch("/courses/all");
+            allCoursesList = await apiFetchAll("/courses/all");
             
             // Фильтруем по поисковому запросу
             let filteredCourses = allCoursesList;
@@ -223,7 +237,9 @@ async function init() {
         elMyCoursesMsg.className = "message-box";
 
         try {
-            myCoursesList = await apiFetch("/courses/my");
+            // Курсы сразу с прогрессом и числом тем — один запрос вместо запроса на курс
+            const dashboard = await apiFetch("/dashboard/student");
+            myCoursesList = dashboard.courses;
 
             elMyCoursesList.innerHTML = "";
 
@@ -232,24 +248,7 @@ async function init() {
                 return;
             }
 
-            // Загружаем прогресс для каждого курса
-            const coursesWithProgress = await Promise.all(
-                myCoursesList.map(async (course) => {
-                    try {
-                        const progress = await loadCourseProgress(course.id);
-                        return {
-                            ...course,
-                            progress_percentage: progress ? progress.progress_percentage : 0
-                        };
-                    } catch (e) {
-                        console.error(`Ошибка загрузки прогресса для курса ${course.id}:`, e);
-                        return {
-                            ...course,
-                            progress_percentage: 0
-                        };
-                    }
-                })
-            );
+            const coursesWithProgress = myCoursesList;
 
             coursesWithProgress.forEach(course => {
                 const percentage = course.progress_percentage || 0;
@@ -296,7 +295,7 @@ async function init() {
             currentCourse = await apiFetch(`/courses/${courseId}`);
             
             // Загружаем темы курса
-            const themes = await apiFetch(`/themes/${courseId}`);
+            const themes = await apiFetchAll(`/themes/${courseId}`);
             
             // Показываем страницу курса
             await showCourseDetail(currentCourse, themes);
@@ -312,8 +311,8 @@ async function init() {
         elCourseTitle.textContent = course.name || "Курс без названия";
         elCourseMeta.textContent = course.description || "Описание отсутствует";
 
-        // Загружаем прогресс по курсу
-        const progress = await loadCourseProgress(course.id);
+        // Загружаем прогресс по курсу вместе с разбивкой по темам
+        const progress = await loadCourseProgress(course.id, true);
         
         // Подготовим карту прогресса
         let progressMap = {};
@@ -461,7 +460,8 @@ async function init() {
                 // Используем правильный URL для скачивания файлов преподавателя
                 const filename = file.filename || getFileNameFromPath(file.url);
                 const link = document.createElement("a");
-                link.href = BASE_URL + `/uploads/themes/${themeId}/${filename}`;
+                // filename — исходное имя для показа, адрес файла — только в url
+                link.href = BASE_URL + file.url;
                 link.target = "_blank";
                 link.rel = "noopener noreferrer";
                 link.className = "file-link";
@@ -627,7 +627,7 @@ async function init() {
 
     async function loadTeacherFeedback(themeId) {
         try {
-            const homeworks = await apiFetch(`/homeworks/my?theme_id=${themeId}`);
+            const homeworks = (await apiFetch(`/homeworks/my?theme_id=${themeId}`)).items;
             if (Array.isArray(homeworks) && homeworks.length > 0) {
                 const homework = homeworks[0];
                 
@@ -694,7 +694,7 @@ async function init() {
     // Загрузка существующего домашнего задания
     async function loadExistingHomework(themeId) {
         try {
-            const homeworks = await apiFetch(`/homeworks/my?theme_id=${themeId}`);
+            const homeworks = (await apiFetch(`/homeworks/my?theme_id=${themeId}`)).items;
             return Array.isArray(homeworks) && homeworks.length > 0 ? homeworks[0] : null;
         } catch (e) {
             console.error('Ошибка загрузки существующего ДЗ:', e);
@@ -815,9 +815,10 @@ async function markThemeAsCompleted(themeId) {
 }
 
 // Загрузить прогресс по курсу
-async function loadCourseProgress(courseId) {
+async function loadCourseProgress(courseId, details = false) {
     try {
-        const progress = await apiFetch(`/courses/${courseId}/progress`);
+        const query = details ? "?details=true" : "";
+        const progress = await apiFetch(`/courses/${courseId}/progress${query}`);
         return progress;
     } catch (e) {
         console.error('Ошибка загрузки прогресса:', e);
@@ -37,6 +37,78 @@ async function apiFetch(path, options = {}) {
     return data;
 }
 
+// Загрузить все страницы списка ({ items, next_cursor })
+async function apiFetchAll(path) {
+    const items = [];
+    let cursor = null;
+    do {
+        const sep = path.includes("?") ? "&" : "?";
+        const url = cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path;
+        const page = await apiFetch(url);
+        items.push(...(page.items || []));
+        cursor = page.next_cursor;
+    } while (cursor);
+    return items;
+}
+
+// Несколько GET-запросов одним round trip; ответы в том же порядке
+async function apiBatch(paths) {
+    const data = await apiFetch("/batch", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ requests: paths.map(path => ({ method: "GET", path })) })
+    });
+    return data.responses;
+}
+
+// Докачиваемая загрузка большого файла: куски уходят параллельно,
+// оборвавшийся кусок отправляется заново, а не весь файл
+const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024;
+const RESUMABLE_PARALLEL = 4;
+const RESUMABLE_RETRIES = 3;
+
+async function uploadResumable(themeId, file) {
+    const upload = await apiFetch(`/files/theme/${themeId}/uploads`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ filename: file.name, size: file.size })
+    });
+    const path = `/files/uploads/${upload.upload_id}`;
+
+    const offsets = [];
+    for (let offset = 0; offset < file.size; offset += RESUMABLE_CHUNK_SIZE) {
+        offsets.push(offset);
+    }
+
+    async function sendChunk(offset) {
+        for (let attempt = 1; ; attempt++) {
+            try {
+                return await apiFetch(`${path}?offset=${offset}`, {
+                    method: "PUT",
+                    headers: { "Content-Type": "application/octet-stream" },
+                    body: file.slice(offset, offset + RESUMABLE_CHUNK_SIZE)
+                });
+            } catch (e) {
+                if (attempt >= RESUMABLE_RETRIES) throw e;
+            }
+        }
+    }
+
+    async function worker() {
+        while (offsets.length) {
+            await sendChunk(offsets.shift());
+        }
+    }
+
+    try {
+        await Promise.all(Array.from({ length: RESUMABLE_PARALLEL }, worker));
+        return await apiFetch(`${path}/complete`, { method: "POST" });
+    } catch (e) {
+        apiFetch(path, { method: "DELETE" }).catch(() => {});
+        throw e;
+    }
+}
+
 document.addEventListener("DOMContentLoaded", () => {
     init();
 });
@@ -496,9 +568,16 @@ async function init() {
         elFilterCourse.innerHTML = '<option value="">Курс: все</option>';
         elFilterTheme.innerHTML = '<option value="">Тема: все</option>';
         themesByCourse = {};
+        studentsByCourse = {};
 
         try {
-            coursesList = await apiFetch("/courses/my");
+            // Курсы вместе с темами и студентами — один запрос вместо запросов на курс
+            const dashboard = await apiFetch("/dashboard/teacher");
+            coursesList = dashboard.courses;
+            coursesList.forEach(course => {
+                themesByCourse[course.id] = course.themes;
+                studentsByCourse[course.id] = course.students;
+            });
 
             if (!Array.isArray(coursesList) || coursesList.length === 0) {
                 elCoursesList.innerHTML = '<span class="muted-text">У вас пока нет курсов.</span>';
@@ -544,7 +623,7 @@ async function init() {
     }
 
     async function loadStudents() {
-        studentsByCourse = {};
+        // Студенты по курсам уже пришли в /dashboard/teacher (см. loadCourses)
         studentsList = [];
 
         elStudentsMsg.textContent = "Загрузка студентов...";
@@ -553,28 +632,18 @@ async function init() {
         elFilterStudent.innerHTML = '<option value="">Студент: все</option>';
 
         try {
-            const courses = await apiFetch("/courses/my");
-
-            if (!Array.isArray(courses) || courses.length === 0) {
+            if (!Array.isArray(coursesList) || coursesList.length === 0) {
                 elStudentsMsg.textContent = "У вас пока нет курсов.";
                 elStudentsMsg.className = "message-box";
                 return;
             }
 
-            for (const course of courses) {
-                try {
-                    const courseStudents = await apiFetch(`/courses/${course.id}/students`);
-                    studentsByCourse[course.id] = Array.isArray(courseStudents) ? courseStudents : [];
-
-                    studentsByCourse[course.id].forEach(student => {
-                        if (!studentsList.find(s => s.id === student.id)) {
-                            studentsList.push(student);
-                        }
-                    });
-                } catch (err) {
-                    console.error(`Ошибка загрузки студентов курса ${course.id}:`, err);
-                    studentsByCourse[course.id] = [];
-                }
+            for (const course of coursesList) {
+                (studentsByCourse[course.id] || []).forEach(student => {
+                    if (!studentsList.find(s => s.id === student.id)) {
+                        studentsList.push(student);
+                    }
+                });
             }
 
             const selectedCourseId = getSelectedCourseIdFromFilter();
@@ -601,7 +670,7 @@ async function init() {
         elThemesMsg.className = "message-box";
 
         try {
-            const themes = await apiFetch(`/themes/${courseId}`);
+            const themes = await apiFetchAll(`/themes/${courseId}`);
             themesByCourse[courseId] = themes;
 
             if (!Array.isArray(themes) || themes.length === 0) {
@@ -658,11 +727,10 @@ async function init() {
         if (elFilterTheme.value) params.append("theme_id", elFilterTheme.value);
         if (elFilterStatus.value) params.append("status", elFilterStatus.value);
         if (elFilterStudent.value) params.append("student_id", elFilterStudent.value);
-        params.append("skip", "0");
         params.append("limit", "20");
 
         try {
-            const homeworks = await apiFetch(`/homeworks?${params.toString()}`);
+            const homeworks = (await apiFetch(`/homeworks?${params.toString()}`)).items;
             lastLoadedHomeworks = Array.isArray(homeworks) ? homeworks : [];
 
             if (!Array.isArray(homeworks) || homeworks.length === 0) {
@@ -795,7 +863,7 @@ async function init() {
         if (courseId) {
             if (!themesByCourse[courseId]) {
                 try {
-                    const th = await apiFetch(`/themes/${courseId}`);
+                    const th = await apiFetchAll(`/themes/${courseId}`);
                     themesByCourse[courseId] = th;
                 } catch (e) {
                     console.error("Ошибка загрузки тем курса:", e);
@@ -814,19 +882,26 @@ async function init() {
 
         if (!coursesList || coursesList.length === 0) return;
 
-        const promises = [];
-        for (const course of coursesList) {
-            if (!themesByCourse[course.id]) {
-                promises.push(
-                    apiFetch(`/themes/${course.id}`)
-                        .then(th => { themesByCourse[course.id] = th; })
-                        .catch(e => console.error(`Ошибка загрузки тем курса ${course.id}:`, e))
-                );
+        // Темы обычно уже пришли в /dashboard/teacher; недостающие — одним batch
+        const missing = coursesList.filter(course => !themesByCourse[course.id]);
+        if (missing.length) {
+            try {
+                const responses = await apiBatch(missing.map(course => `/themes/${course.id}`));
+                await Promise.all(missing.map(async (course, i) => {
+                    const res = responses[i];
+                    if (res.status !== 200) {
+                        console.error(`Ошибка загрузки тем курса ${course.id}:`, res.body);
+                        return;
+                    }
+                    // Длинные списки догружаем постранично
+                    themesByCourse[course.id] = res.body.next_cursor
+                        ? await apiFetchAll(`/themes/${course.id}`)
+                        : res.body.items;
+                }));
+            } catch (e) {
+                console.error("Ошибка загрузки тем курсов:", e);
             }
         }
-        if (promises.length) {
-            await Promise.all(promises);
-        }
 
         const addedIds = new Set();
         Object.values(themesByCourse).forEach(arr => {
@@ -991,26 +1066,30 @@ async function init() {
 
         const formData = new FormData();
         let hasFiles = false;
+        const largeFiles = [];
 
         for (const file of files) {
             if (file.size > 100 * 1024 * 1024) {
-                if (msgEl) {
-                    msgEl.textContent = `Файл "${file.name}" больше 100 МБ и не будет загружен.`;
-                    msgEl.className = "message-box message-error";
-                }
+                // Большие файлы — докачиваемой загрузкой по кускам
+                largeFiles.push(file);
                 continue;
             }
             formData.append("files", file);
             hasFiles = true;
         }
 
-        if (!hasFiles) return;
+        if (!hasFiles && !largeFiles.length) return;
 
         try {
-            await apiFetch(`/files/theme/${themeId}/uploadfiles`, {
-                method: "POST",
-                body: formData
-            });
+            if (hasFiles) {
+                await apiFetch(`/files/theme/${themeId}/uploadfiles`, {
+                    method: "POST",
+                    body: formData
+                });
+            }
+            for (const file of largeFiles) {
+                await uploadResumable(themeId, file);
+            }
             if (msgEl) {
                 msgEl.textContent = "Файлы загружены.";
                 msgEl.className = "message-box message-success";